@@ -0,0 +1,236 @@
+# Aggregate cube over the quality combinations.
+#
+# The cube holds the count, sum and sum of squares of price and carat for every
+# (cut, color, clarity) cell. Each axis has one extra slot for missing or unknown
+# categories, so totals and per-category marginals match the full dataset. Cubes of
+# two parts of a dataset can be added, which makes them cheap to update with new rows.
+#
+# The cube also answers the interactive analysis (section 11) while its range sliders
+# are at their full range: that selects exactly the rows with all RANGE_COLS known, so
+# the cube keeps their count, sums and fine histograms per cell, and any combination of
+# the cut, color and clarity selections is the sum of the selected cells.
+
+# Import required libraries
+import numpy as np  # For the cube arrays
+import pandas as pd  # For mapping categories to codes
+import diamond_analysis as da  # Category orders shared with the app
+
+# Axes of the cube, in order
+AXES = ['cut', 'color', 'clarity']
+# Values aggregated per cell
+VALUE_COLS = ['price', 'carat']
+# Columns of the range sliders in section 11
+RANGE_COLS = ['price', 'carat', 'depth', 'table']
+# Cells per axis: the known categories plus one slot for missing or unknown values
+SHAPE = tuple(len(da.CATEGORY_ORDERS[axis]) + 1 for axis in AXES)
+# Fixed bin edges of the histogram sketches. The bins are the same for every part of
+# a dataset, so sketches can be added; values outside the edges are counted in an
+# underflow and an overflow bin.
+SKETCH_EDGES = {
+    'price': np.arange(0, 20000 + 25, 25),
+    # Rounded so the edges equal the values as parsed from the CSV
+    'carat': np.round(np.arange(0, 6 + 0.01, 0.01), 2),
+    'depth': np.round(np.arange(40, 80 + 0.1, 0.1), 1),
+    'table': np.round(np.arange(40, 100 + 0.1, 0.1), 1),
+    'x': np.round(np.arange(0, 12 + 0.01, 0.01), 2),
+    'y': np.round(np.arange(0, 12 + 0.01, 0.01), 2),
+    'z': np.round(np.arange(0, 12 + 0.01, 0.01), 2),
+}
+
+
+# Columns whose values are recorded at the precision of their sketch edges
+GRID_COLS = ['carat', 'depth', 'table', 'x', 'y', 'z']
+
+
+def cell_codes(df):
+    """
+    Cube cell of every diamond, flattened to one integer.
+    Returns:
+        numpy.ndarray: Cell index per row
+    """
+    codes = []
+    for axis in AXES:
+        code = pd.Categorical(df[axis], categories=da.CATEGORY_ORDERS[axis]).codes.astype(np.int64)
+        # Missing and unknown categories get code -1 and go to the last slot
+        codes.append(np.where(code < 0, len(da.CATEGORY_ORDERS[axis]), code))
+    return np.ravel_multi_index(codes, SHAPE)
+
+
+def build_cube(df):
+    """
+    Aggregate a dataset into a cube.
+    Returns:
+        dict: Arrays of shape SHAPE named count, <col>_count, <col>_sum and <col>_sumsq,
+            and the same for the complete rows (see RANGE_COLS) named complete_count,
+            complete_<col>_sum and complete_<col>_hist, the last with the bins of
+            SKETCH_EDGES as an extra axis
+    """
+    cell = cell_codes(df)
+    size = int(np.prod(SHAPE))
+    cube = {'count': np.bincount(cell, minlength=size).reshape(SHAPE)}
+    for col in VALUE_COLS:
+        values = df[col].to_numpy(dtype=float)
+        known = ~np.isnan(values)
+        cube[f'{col}_count'] = np.bincount(cell[known], minlength=size).reshape(SHAPE)
+        cube[f'{col}_sum'] = np.bincount(cell[known], weights=values[known], minlength=size).reshape(SHAPE)
+        cube[f'{col}_sumsq'] = np.bincount(cell[known], weights=values[known] ** 2, minlength=size).reshape(SHAPE)
+
+    complete = df[RANGE_COLS].notna().all(axis=1).to_numpy()
+    cell = cell[complete]
+    cube['complete_count'] = np.bincount(cell, minlength=size).reshape(SHAPE)
+    for col in VALUE_COLS:
+        values = df[col].to_numpy(dtype=float)[complete]
+        cube[f'complete_{col}_sum'] = np.bincount(cell, weights=values, minlength=size).reshape(SHAPE)
+        # One histogram per cell: the bin index is added as the fastest-varying part of the cell index
+        edges = SKETCH_EDGES[col]
+        bins = np.searchsorted(edges, values, side='right')
+        cube[f'complete_{col}_hist'] = np.bincount(cell * (len(edges) + 1) + bins,
+                                                   minlength=size * (len(edges) + 1)).reshape(SHAPE + (len(edges) + 1,))
+    return cube
+
+
+def build_sketches(df):
+    """
+    Histogram sketches of the numerical columns, see SKETCH_EDGES.
+    Returns:
+        dict: Bin counts named <col>_hist, with the underflow bin first and the overflow bin last
+    """
+    sketches = {}
+    for col, edges in SKETCH_EDGES.items():
+        values = df[col].to_numpy(dtype=float)
+        values = values[~np.isnan(values)]
+        sketches[f'{col}_hist'] = np.bincount(np.searchsorted(edges, values, side='right'),
+                                              minlength=len(edges) + 1)
+    return sketches
+
+
+def sketch_quantiles(sketches, col, qs):
+    """
+    Approximate quantiles of a column from its sketch, interpolated between order
+    statistics like pandas' quantile(). In the columns recorded at the precision of
+    their edges (GRID_COLS) every value is the lower edge of its bin, which is exact;
+    in the others the values of a bin are spread evenly over it, with an error of at
+    most one bin width. Values outside the edges are clamped to them.
+    Args:
+        sketches (dict): Output of build_sketches(), possibly merged
+        col (str): Numerical column
+        qs (list): Quantiles between 0 and 1
+    Returns:
+        numpy.ndarray: The approximate quantiles, NaN if the sketch is empty
+    """
+    edges = SKETCH_EDGES[col]
+    counts = sketches[f'{col}_hist']
+    cumulative = np.cumsum(counts)
+    total = cumulative[-1]
+    if total == 0:
+        return np.full(len(qs), np.nan)
+    # Lower edge and width of each bin; under- and overflow have no width
+    starts = np.concatenate([edges[:1], edges])
+    widths = np.concatenate([[0], np.diff(edges), [0]]) if col not in GRID_COLS else np.zeros(len(starts))
+
+    def order_statistic(k):
+        # The k-th smallest value (from 0) is in the first bin with more than k values up to it
+        i = np.searchsorted(cumulative, k, side='right')
+        within = (k - (cumulative[i] - counts[i]) + 0.5) / counts[i]
+        return starts[i] + within * widths[i]
+
+    positions = np.asarray(qs, dtype=float) * (total - 1)
+    lower = np.floor(positions)
+    low, high = order_statistic(lower), order_statistic(np.minimum(lower + 1, total - 1))
+    return low + (positions - lower) * (high - low)
+
+
+def sketch_fences(sketches, cols=da.NUMERICAL_COLS):
+    """
+    Approximate IQR fences, like da.outlier_fences(), from the sketches.
+    Returns:
+        pandas.DataFrame: Columns 'low' and 'high' indexed by column name
+    """
+    rows = {}
+    for col in cols:
+        q1, q3 = sketch_quantiles(sketches, col, [0.25, 0.75])
+        rows[col] = {'low': q1 - 1.5 * (q3 - q1), 'high': q3 + 1.5 * (q3 - q1)}
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+def select(cube, cuts=None, colors=None, clarities=None):
+    """
+    Answer the interactive analysis with full slider ranges from the cube, like
+    da.filter_diamonds() with the selections and the full ranges of RANGE_COLS.
+    Args:
+        cube (dict): Output of build_cube(), possibly merged
+        cuts, colors, clarities (list): Selected categories, an empty selection means all
+    Returns:
+        dict: Number of diamonds, mean price and mean carat (NaN if there are none),
+            and the histograms of price and carat with the bins of SKETCH_EDGES
+    """
+    index = []
+    for axis, size, selected in zip(AXES, SHAPE, [cuts, colors, clarities]):
+        if selected:
+            index.append([da.CATEGORY_ORDERS[axis].index(value) for value in selected])
+        else:
+            # Includes the slot of missing values, which only an empty selection keeps
+            index.append(list(range(size)))
+    cells = np.ix_(*index)
+    count = int(cube['complete_count'][cells].sum())
+    result = {'count': count}
+    for col in VALUE_COLS:
+        result[f'mean_{col}'] = float(cube[f'complete_{col}_sum'][cells].sum() / count) if count else float('nan')
+        result[f'{col}_hist'] = cube[f'complete_{col}_hist'][cells].sum(axis=(0, 1, 2))
+    return result
+
+
+def rebin(col, counts, nbins):
+    """
+    Merge the fine bins of a histogram into about nbins bins of a round width,
+    covering the range of the data. Under- and overflow are put in the outer bins.
+    Args:
+        col (str): Numerical column, whose bins are SKETCH_EDGES[col]
+        counts (numpy.ndarray): Bin counts as produced by build_sketches() or select()
+        nbins (int): Wanted number of bins
+    Returns:
+        tuple: Left edges, counts and the width of the bins
+    """
+    edges = SKETCH_EDGES[col]
+    width = edges[1] - edges[0]
+    # Bin i covers [edges[i], edges[i + 1])
+    inner = counts[1:-1].copy()
+    inner[0] += counts[0]
+    inner[-1] += counts[-1]
+    nonzero = np.flatnonzero(inner)
+    if len(nonzero) == 0:
+        return np.empty(0), np.empty(0, dtype=inner.dtype), width
+    first, last = nonzero[0], nonzero[-1] + 1
+    # Smallest width of 1, 2 or 5 times a power of ten that is a multiple of the fine
+    # width and gives at most nbins bins
+    target = (last - first) / nbins
+    factors = (step * 10.0 ** power / width for power in range(-3, 10) for step in (1, 2, 5))
+    factor = next(round(f) for f in factors if f >= max(target, 1) - 1e-9 and np.isclose(f, round(f)))
+    start = first // factor * factor
+    groups = -(-(last - start) // factor)
+    padded = np.zeros(groups * factor, dtype=inner.dtype)
+    padded[:last - start] = inner[start:last]
+    return edges[start] + np.arange(groups) * factor * width, padded.reshape(groups, factor).sum(axis=1), factor * width
+
+
+def merge_cubes(a, b):
+    """
+    Combine the cubes, or the sketches, of two disjoint parts of a dataset.
+    Returns:
+        dict: The aggregates of both parts together
+    """
+    return {name: a[name] + b[name] for name in a}
+
+
+def totals(cube):
+    """
+    Overall size and averages of the dataset, like da.basic_stats().
+    Returns:
+        dict: Number of diamonds, mean price and mean carat
+    """
+    return {
+        'count': int(cube['count'].sum()),
+        'mean_price': float(cube['price_sum'].sum() / cube['price_count'].sum()),
+        'mean_carat': float(cube['carat_sum'].sum() / cube['carat_count'].sum()),
+    }
+
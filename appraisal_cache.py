@@ -0,0 +1,113 @@
+# Memoization of the appraisals of the decision form (section 12).
+#
+# Buyers often submit the same diamond again. Appraisals are kept in one bounded LRU
+# cache shared by all sessions of the server process, keyed on the normalized form
+# inputs and the data snapshot they were made with, so new data never returns an old
+# appraisal. Each session also keeps a short history of the inputs it appraised, which
+# the app shows as a list of recent appraisals that can be recalled with one click.
+
+# Import required libraries
+import os  # For reading the environment
+import threading  # For sharing the cache between sessions
+import weakref  # For recognising the snapshot an appraisal was made with
+from collections import OrderedDict  # For the least-recently-used order
+
+# Environment variable with the number of appraisals kept
+SIZE_ENV_VAR = 'DIAMONDS_APPRAISAL_CACHE_SIZE'
+DEFAULT_SIZE = 1024
+# Appraisals kept in the history of a session
+HISTORY_LENGTH = 10
+# Form inputs in the order of the cache key, with the decimals the form steps in (None for text)
+INPUT_DECIMALS = {'carat': 2, 'cut': None, 'color': None, 'clarity': None, 'price': 0,
+                  'depth': 1, 'table': 1, 'x': 2, 'y': 2, 'z': 2}
+
+
+def size_from_env():
+    """
+    Cache size from DIAMONDS_APPRAISAL_CACHE_SIZE.
+    Returns:
+        int: Number of appraisals kept, 0 turns the cache off
+    """
+    return int(os.environ.get(SIZE_ENV_VAR, DEFAULT_SIZE))
+
+
+def normalize(inputs):
+    """
+    Cache key of the form inputs: the values in INPUT_DECIMALS order, numbers rounded
+    to the precision of the form, so e.g. 0.5 and 0.5000001 carat are the same diamond.
+    Whole numbers (price) are kept as integers, like the form gives them.
+    Args:
+        inputs (dict): The form values by name
+    Returns:
+        tuple: The normalized inputs
+    """
+    return tuple(str(inputs[name]) if decimals is None else
+                 int(round(float(inputs[name]))) if decimals == 0 else round(float(inputs[name]), decimals)
+                 for name, decimals in INPUT_DECIMALS.items())
+
+
+def as_inputs(key):
+    """
+    The form values of a cache key, the inverse of normalize().
+    Returns:
+        dict: The form values by name
+    """
+    return dict(zip(INPUT_DECIMALS, key))
+
+
+class AppraisalCache:
+    """
+    Bounded least-recently-used cache of appraisals, safe to share between sessions.
+    """
+
+    def __init__(self, size=DEFAULT_SIZE):
+        """
+        Args:
+            size (int): Number of appraisals kept, 0 to keep none
+        """
+        self.size = size
+        self._lock = threading.Lock()
+        # (id(snapshot), key) -> (weak reference to the snapshot, appraisal)
+        self._entries = OrderedDict()
+
+    def get(self, snapshot, key, appraise):
+        """
+        The appraisal of the inputs with the data of a snapshot, computed only if it is
+        not cached. Two sessions asking for the same new appraisal may both compute it.
+        Args:
+            snapshot: The data snapshot (warmup.TaskGraph) the appraisal uses
+            key (tuple): Output of normalize()
+            appraise (callable): Computes the appraisal, called without arguments
+        Returns:
+            tuple: The appraisal, and True if it came from the cache
+        """
+        entry_key = (id(snapshot), key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            # An id can be reused once the snapshot is gone, so check it is the same snapshot
+            if entry is not None and entry[0]() is snapshot:
+                self._entries.move_to_end(entry_key)
+                return entry[1], True
+        appraisal = appraise()
+        if self.size > 0:
+            with self._lock:
+                self._entries[entry_key] = (weakref.ref(snapshot), appraisal)
+                self._entries.move_to_end(entry_key)
+                while len(self._entries) > self.size:
+                    self._entries.popitem(last=False)
+        return appraisal, False
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def remember(history, key, decision, length=HISTORY_LENGTH):
+    """
+    Put an appraisal first in a session's history, without duplicates.
+    Args:
+        history (list): The session's history of (key, decision), most recent first, changed in place
+        key (tuple): Output of normalize()
+        decision (str): The decision of the appraisal, shown in the history
+        length (int): Most appraisals kept
+    """
+    history[:] = [(key, decision)] + [entry for entry in history if entry[0] != key][:length - 1]
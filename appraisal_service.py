@@ -0,0 +1,326 @@
+# HTTP service for appraising candidate diamonds from other systems.
+#
+# The service answers the same question as the decision form (section 12) over JSON:
+#
+#   POST /appraise        one candidate            -> {"decision": ..., "motivation": ...}
+#   POST /appraise/batch  {"candidates": [...]}    -> {"appraisals": [...]}
+#   GET  /health          data version and size
+#
+# The market data, price-per-carat curves and outlier fences come from the same warm-up
+# tasks as the dashboard and are kept current by the same data watcher. Single
+# appraisals that arrive at about the same time are collected into one batch and
+# evaluated together with the vectorized da.appraise_batch(), in a worker thread so
+# the event loop keeps accepting requests meanwhile.
+#
+# Usage:
+#   python appraisal_service.py --port 8000
+#   uvicorn appraisal_service:app --port 8000
+
+# Import required libraries
+import argparse  # For parsing command-line arguments
+import asyncio  # For collecting concurrent requests into batches
+import contextlib  # For the application lifespan
+import json  # For parsing request bodies
+import logging  # For reporting failed batches
+import math  # For rejecting non-finite numbers
+
+import pandas as pd  # For the candidate batches
+from starlette.applications import Starlette  # For the HTTP application
+from starlette.responses import JSONResponse  # For JSON responses
+from starlette.routing import Route  # For the endpoints
+
+import columnar_store  # Optional store of ingested inventory deltas
+import data_watcher  # Reloads the data when the source changes
+import diamond_analysis as da  # Shared analysis logic
+import warmup  # Background computation of the reference values
+
+# Fields of a candidate and their types
+CANDIDATE_FIELDS = {'carat': float, 'cut': str, 'color': str, 'clarity': str, 'price': float,
+                    'depth': float, 'table': float, 'x': float, 'y': float, 'z': float}
+# Most single appraisals evaluated together, and how long the first one waits for others
+MAX_BATCH = 256
+MAX_WAIT = 0.002
+# Most candidates in one request to the batch endpoint
+MAX_CANDIDATES = 100000
+# Warm-up results the appraisals use
+APPRAISAL_TASKS = ['dataset', 'reference_stats', 'fences', 'price_curves']
+
+logger = logging.getLogger('diamonds.service')
+
+
+def _finite(value):
+    """
+    Whether a number from a request is finite as a float; JSON integers can be too large for one.
+    """
+    try:
+        return math.isfinite(float(value))
+    except OverflowError:
+        return False
+
+
+def parse_candidate(data):
+    """
+    Check and convert one candidate from a request.
+    Args:
+        data (dict): The candidate as sent
+    Returns:
+        dict: The candidate with CANDIDATE_FIELDS, numbers kept as sent like the form gives them
+    Raises:
+        ValueError: If a field is missing or has the wrong type
+    """
+    if not isinstance(data, dict):
+        raise ValueError("A candidate must be a JSON object")
+    missing = [field for field in CANDIDATE_FIELDS if field not in data]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+    candidate = {}
+    for field, kind in CANDIDATE_FIELDS.items():
+        value = data[field]
+        if kind is float and (isinstance(value, bool) or not isinstance(value, (int, float))
+                              or not _finite(value)):
+            raise ValueError(f"{field} must be a finite number")
+        if kind is str and not isinstance(value, str):
+            raise ValueError(f"{field} must be a string")
+        candidate[field] = value
+    return candidate
+
+
+def start_snapshot(precomputed):
+    """
+    Start computing the data the appraisals need, see data_watcher.SnapshotWatcher.
+    Returns:
+        warmup.TaskGraph: The running task graph
+    """
+    graph = warmup.TaskGraph()
+    warmup.add_data_tasks(graph, da.load_data, precomputed)
+    return graph.start()
+
+
+def start_watcher(interval=None):
+    """
+    Load the market data, from the columnar store if DIAMONDS_STORE is set, and watch it.
+    Args:
+        interval (float): Seconds between checks, by default DIAMONDS_RELOAD_INTERVAL
+    Returns:
+        data_watcher.SnapshotWatcher: The watcher
+    """
+    interval = data_watcher.interval_from_env() if interval is None else interval
+    store = columnar_store.from_env()
+    if store is not None:
+        return data_watcher.StoreWatcher(store, start_snapshot, interval)
+    return data_watcher.DataWatcher(da.DATA_PATH, start_snapshot, interval)
+
+
+def appraise_frame(snapshot, candidates):
+    """
+    Appraise candidates with the data of a snapshot.
+    Args:
+        snapshot (warmup.TaskGraph): The data snapshot
+        candidates (list): Candidates as returned by parse_candidate()
+    Returns:
+        list: {'decision', 'motivation'} per candidate, in order
+    """
+    if len(candidates) == 1:
+        # The vectorized version has a fixed cost of about 10 ms; alone a candidate is
+        # quicker to appraise directly, with the same result
+        decision, motivation = da.should_buy_diamond(**candidates[0], df=snapshot.result('dataset'),
+                                                     reference_stats=snapshot.result('reference_stats'),
+                                                     fences=snapshot.result('fences'),
+                                                     price_curves=snapshot.result('price_curves'))
+        return [{'decision': decision, 'motivation': motivation}]
+    frame = pd.DataFrame(candidates, columns=list(CANDIDATE_FIELDS))
+    result = da.appraise_batch(frame, snapshot.result('dataset'), snapshot.result('reference_stats'),
+                               fences=snapshot.result('fences'), price_curves=snapshot.result('price_curves'))
+    return result.to_dict(orient='records')
+
+
+class MicroBatcher:
+    """
+    Collects single appraisals that arrive close together and evaluates them as one batch.
+
+    The first request of a batch waits at most MAX_WAIT seconds for more requests;
+    a full batch is evaluated at once. While a batch is evaluated in a worker thread,
+    new requests queue up for the next one.
+    """
+
+    def __init__(self, watcher, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        """
+        Args:
+            watcher (data_watcher.SnapshotWatcher): Source of the current data
+            max_batch (int): Most candidates per batch
+            max_wait (float): Seconds the first candidate waits for others
+        """
+        self.watcher = watcher
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.appraised = 0
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        """
+        Start evaluating batches on the running event loop.
+        """
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop evaluating batches.
+        """
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+
+    async def appraise(self, candidate):
+        """
+        Appraise one candidate as part of the next batch.
+        Returns:
+            dict: The decision and motivation
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((candidate, future))
+        return await future
+
+    async def _run(self):
+        """
+        Collect and evaluate batches until stopped.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            candidates = [candidate for candidate, _ in batch]
+            try:
+                # One snapshot for the whole batch
+                results = await asyncio.to_thread(appraise_frame, self.watcher.current, candidates)
+            except Exception as error:
+                logger.exception("Appraising a batch of %d candidates failed", len(batch))
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            self.batches += 1
+            self.appraised += len(batch)
+            for (_, future), result in zip(batch, results):
+                # The client may have disconnected
+                if not future.done():
+                    future.set_result(result)
+
+
+def _reject_constant(name):
+    """
+    Refuse the NaN and Infinity literals that Python's JSON parser accepts by default.
+    """
+    raise ValueError(f"{name} is not valid JSON")
+
+
+async def _read_json(request):
+    """
+    The JSON body of a request, or an error response.
+    """
+    try:
+        return json.loads(await request.body(), parse_constant=_reject_constant), None
+    except ValueError:
+        return None, JSONResponse({'error': "The body must be JSON"}, status_code=400)
+
+
+async def appraise_one(request):
+    """
+    POST /appraise: appraise one candidate.
+    """
+    data, error = await _read_json(request)
+    if error is not None:
+        return error
+    try:
+        candidate = parse_candidate(data)
+    except ValueError as problem:
+        return JSONResponse({'error': str(problem)}, status_code=400)
+    return JSONResponse(await request.app.state.batcher.appraise(candidate))
+
+
+async def appraise_many(request):
+    """
+    POST /appraise/batch: appraise a list of candidates, given as {"candidates": [...]}.
+    """
+    data, error = await _read_json(request)
+    if error is not None:
+        return error
+    items = data.get('candidates') if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        return JSONResponse({'error': "The body must be an object with a list of candidates"}, status_code=400)
+    if len(items) > MAX_CANDIDATES:
+        return JSONResponse({'error': f"At most {MAX_CANDIDATES} candidates per request"}, status_code=413)
+    try:
+        candidates = [parse_candidate(item) for item in items]
+    except ValueError as problem:
+        return JSONResponse({'error': str(problem)}, status_code=400)
+    # Already a batch, so it is evaluated on its own
+    results = await asyncio.to_thread(appraise_frame, request.app.state.watcher.current, candidates)
+    return JSONResponse({'appraisals': results})
+
+
+async def health(request):
+    """
+    GET /health: the version and size of the data in use.
+    """
+    state = request.app.state
+    snapshot = state.watcher.current
+    return JSONResponse({'status': 'ok', 'data_version': state.watcher.version,
+                         'diamonds': len(snapshot.result('dataset')),
+                         'batches': state.batcher.batches, 'batched_appraisals': state.batcher.appraised})
+
+
+def create_app(watcher=None):
+    """
+    Create the service.
+    Args:
+        watcher (data_watcher.SnapshotWatcher): Source of the data, started on startup if not given
+    Returns:
+        starlette.applications.Starlette: The application
+    """
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        app.state.watcher = watcher or start_watcher()
+        # Wait for the data the appraisals use before accepting requests
+        for name in APPRAISAL_TASKS:
+            await asyncio.to_thread(app.state.watcher.current.result, name)
+        app.state.batcher = MicroBatcher(app.state.watcher)
+        app.state.batcher.start()
+        yield
+        await app.state.batcher.stop()
+        app.state.watcher.stop()
+
+    return Starlette(routes=[
+        Route('/appraise', appraise_one, methods=['POST']),
+        Route('/appraise/batch', appraise_many, methods=['POST']),
+        Route('/health', health, methods=['GET']),
+    ], lifespan=lifespan)
+
+
+app = create_app()
+
+
+def main(argv=None):
+    """
+    Run the service with uvicorn.
+    """
+    parser = argparse.ArgumentParser(description="HTTP service for appraising candidate diamonds.")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to listen on")
+    parser.add_argument('--port', type=int, default=8000, help="Port to listen on")
+    args = parser.parse_args(argv)
+
+    import uvicorn  # Only needed to run the service from the command line
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == "__main__":
+    main()
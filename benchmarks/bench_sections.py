@@ -0,0 +1,349 @@
+# Benchmark harness for the dashboard sections.
+#
+# Runs the app's own code behind each section of render_dashboard() headlessly (without
+# a Streamlit server) against the bundled dataset and against larger datasets. The
+# warm-up of a data snapshot (part2_data_analysis.start_snapshot(), i.e. the tasks of
+# warmup.add_data_tasks() and the static figures) runs once per snapshot and is timed
+# separately, per task. Each section is then timed as one page render of the warmed-up
+# snapshot: its figures go through the payload budget like draw_figure(), section 11
+# runs select_diamonds() on the cube, the dataset and a columnar store, and section 12
+# runs appraisal() with the warm-up's indexes. Reported are wall time, peak memory and
+# the figure payload the app sends per section.
+#
+# Usage:
+#   python benchmarks/bench_sections.py                         # bundled data, 10x
+#   python benchmarks/bench_sections.py --scales 1 10 100 1000
+#   python benchmarks/bench_sections.py --save-baseline benchmarks/baseline.json
+#   python benchmarks/bench_sections.py --compare benchmarks/baseline.json
+#
+# Sections 1, 2 and 13 are static text and have nothing to measure.
+
+# Import required libraries
+import argparse  # For parsing command-line arguments
+import json  # For reading and writing baselines
+import platform  # For recording where a baseline was measured
+import sys  # For the exit status and module path
+import tempfile  # For the columnar store of section 11
+import time  # For measuring wall time
+import tracemalloc  # For measuring peak memory
+from pathlib import Path  # For handling file paths
+
+import numpy as np  # For recording library versions
+import pandas as pd  # For data manipulation and analysis
+
+# Make the application modules importable when running from the benchmarks folder
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import streamlit.logger  # noqa: E402
+
+# The app is imported outside a Streamlit server, which Streamlit warns about on every call
+streamlit.logger.set_log_level('error')
+
+import aggregates  # noqa: E402
+import columnar_store  # noqa: E402
+import diamond_analysis as da  # noqa: E402
+import part2_data_analysis as app  # noqa: E402
+import payload_budget  # noqa: E402
+
+# Name of the warm-up in the results
+WARMUP = 'Uppvärmning'
+# Candidate of the decision support section: the form's start values and first choices
+FORM_INPUTS = dict(app.FORM_DEFAULTS, cut=da.CUT_ORDER[0], color=da.COLOR_ORDER[0], clarity=da.CLARITY_ORDER[0])
+# A typical interactive selection in section 11: two cuts, three colors and moved sliders
+SELECTION = (['Ideal', 'Premium'], ['E', 'F', 'G'], [])
+RANGES = {'price': (500, 10000), 'carat': (0.3, 2.0), 'depth': (55.0, 68.0), 'table': (50.0, 65.0)}
+# Compared metrics, with the smallest increase that counts as a regression, so that the
+# microseconds of drawing a warmed-up figure do not fail a comparison
+METRIC_FLOORS = {'wall_s': 0.01, 'peak_mb': 1.0, 'payload_bytes': 1000}
+# Sections are rendered at least this many seconds in total, so the best time of the
+# quick ones is taken over enough runs to be stable
+MIN_SECONDS = 1.0
+MAX_RUNS = 100
+
+
+def full_ranges(df):
+    """
+    Ranges of the sliders of section 11 when none is moved, as the app sets them.
+    """
+    return {'price': (int(df['price'].min()), int(df['price'].max())),
+            'carat': (float(df['carat'].min()), float(df['carat'].max())),
+            'depth': (float(df['depth'].min()), float(df['depth'].max())),
+            'table': (float(df['table'].min()), float(df['table'].max()))}
+
+
+def draw(budget, section, figs):
+    """
+    The figures a section sends, within its payload budget like draw_figure().
+    """
+    return [budget.fit(fig, section) for fig in figs]
+
+
+def static_figures(warm, names):
+    """
+    Figures of STATIC_FIGURES built by the warm-up.
+    """
+    return [warm.result(name) for name in names]
+
+
+def section_3(snapshot, budget, name):
+    aggregates.totals(snapshot['warm'].result('cube'))
+    return []
+
+
+def section_4(snapshot, budget, name):
+    return draw(budget, name, static_figures(snapshot['warm'], ['price_hist']))
+
+
+def section_5(snapshot, budget, name):
+    return draw(budget, name, static_figures(snapshot['warm'], ['cut_pie', 'color_pie', 'clarity_pie', 'carat_hist']))
+
+
+def section_6(snapshot, budget, name):
+    return draw(budget, name, static_figures(snapshot['warm'], [
+        'price_by_cut', 'price_by_color', 'price_by_clarity', 'carat_by_cut', 'carat_by_color', 'carat_by_clarity']))
+
+
+def section_7(snapshot, budget, name):
+    return draw(budget, name, static_figures(snapshot['warm'], ['scatter_cut', 'scatter_color', 'scatter_clarity']))
+
+
+def section_8(snapshot, budget, name):
+    return draw(budget, name, static_figures(snapshot['warm'], ['heatmap', 'carat_price', 'carat_x', 'x_y', 'x_z']))
+
+
+def section_9(snapshot, budget, name):
+    warm = snapshot['warm']
+    figs = draw(budget, name, static_figures(warm, ['outliers', 'missing']))
+    # The geometry checks and the table of the flagged diamonds
+    geometry = warm.result('geometry_flags')
+    da.geometry_counts(geometry)
+    warm.result('dataset')[geometry > 0][['carat', 'depth', 'x', 'y', 'z', 'price']]
+    return figs
+
+
+def section_10(snapshot, budget, name):
+    return draw(budget, name, static_figures(snapshot['warm'], ['price_std_bar']))
+
+
+def section_11_cube(snapshot, budget, name):
+    # No slider moved: answered from the cube
+    _, figs = app.select_diamonds(snapshot['warm'], *SELECTION, snapshot['full_ranges'], snapshot['full_ranges'])
+    return draw(budget, name, figs)
+
+
+def section_11_filter(snapshot, budget, name):
+    _, figs = app.select_diamonds(snapshot['warm'], *SELECTION, RANGES, snapshot['full_ranges'])
+    return draw(budget, name, figs)
+
+
+def section_11_store(snapshot, budget, name):
+    store = snapshot['store']
+    _, figs = app.select_diamonds(snapshot['warm'], *SELECTION, RANGES, snapshot['full_ranges'],
+                                  store, snapshot['manifest'])
+    return draw(budget, name, figs)
+
+
+def section_12(snapshot, budget, name):
+    # One uncached appraisal; the reference values, fences and indexes come from the warm-up
+    app.appraisal(snapshot['warm'], FORM_INPUTS)
+    return []
+
+
+SECTIONS = {
+    '3. Grundläggande statistik': section_3,
+    '4. Prisanalys': section_4,
+    '5. Kvalitetsattribut': section_5,
+    '6. Prisfördelning per kvalitetsattribut': section_6,
+    '7. Samband mellan vikt och pris': section_7,
+    '8. Korrelationer': section_8,
+    '9. Extremvärden och saknade värden': section_9,
+    '10. Hypotesprövningar': section_10,
+    '11. Interaktiv analys (kuben)': section_11_cube,
+    '11. Interaktiv analys (reglage)': section_11_filter,
+    '11. Interaktiv analys (kolumnlager)': section_11_store,
+    '12. Beslutsstöd': section_12,
+}
+
+
+def scale_dataset(df, factor, seed=0):
+    """
+    Build a synthetic dataset `factor` times larger than the bundled one, drawn from
+    a model fitted on the bundled data.
+    Returns:
+        pandas.DataFrame: The larger dataset
+    """
+    if factor == 1:
+        return df
+    from synthetic_data import generate
+    return generate(df, factor * len(df), seed=seed)
+
+
+def warm_up(df):
+    """
+    Run the app's warm-up of a snapshot of the dataset to the end.
+    Returns:
+        warmup.TaskGraph: The finished task graph
+    """
+    warm = app.start_snapshot({'dataset': df})
+    warm.wait()
+    return warm
+
+
+def measure_warmup(df, repeat):
+    """
+    Measure the warm-up of a snapshot.
+    Returns:
+        tuple: The warm-up of the last run, and a dict with the best wall time in seconds,
+            the peak traced memory in MB and the best time of each task (the tasks run
+            in parallel, so these add up to more than the wall time)
+    """
+    wall, tasks = [], {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        warm = warm_up(df)
+        wall.append(time.perf_counter() - start)
+        for task, state in warm.status().items():
+            tasks[task] = min(tasks.get(task, float('inf')), state['seconds'])
+
+    tracemalloc.start()
+    warm_up(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {'wall_s': min(wall), 'first_s': wall[0], 'peak_mb': peak / 1e6, 'payload_bytes': 0,
+              'binned': 0, 'serialize_s': 0.0, 'tasks': tasks}
+    return warm, result
+
+
+def measure(section, name, snapshot, repeat):
+    """
+    Measure one section as rendered from a warmed-up snapshot.
+    Returns:
+        dict: Wall time of the first render (which measures and bins the warm-up's
+            figures for the payload budget) and the best of the others (at least `repeat`,
+            see MIN_SECONDS) in seconds, peak
+            traced memory in MB, figure payload in bytes, the number of figures replaced
+            by their binned variant and the time to serialize the figures to JSON
+    """
+    wall = []
+    while len(wall) <= repeat or (sum(wall[1:]) < MIN_SECONDS and len(wall) <= MAX_RUNS):
+        budget = payload_budget.PayloadBudget(payload_budget.budget_from_env())
+        start = time.perf_counter()
+        figs = section(snapshot, budget, name)
+        wall.append(time.perf_counter() - start)
+
+    # Figure payload: the JSON that Streamlit sends to the browser
+    used = budget.sections.get(name, {'bytes': 0, 'binned': 0})
+    start = time.perf_counter()
+    for fig in figs:
+        fig.to_json(validate=False)
+    serialize = time.perf_counter() - start
+
+    # Peak memory of a separate run
+    tracemalloc.start()
+    section(snapshot, payload_budget.PayloadBudget(payload_budget.budget_from_env()), name)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'wall_s': min(wall[1:]), 'first_s': wall[0], 'peak_mb': peak / 1e6, 'payload_bytes': used['bytes'],
+            'binned': used['binned'], 'serialize_s': serialize}
+
+
+def print_row(name, result):
+    print(f"{name:<42} {result['wall_s']:>9.3f} {result['first_s']:>9.3f} {result['peak_mb']:>11.1f} "
+          f"{result['payload_bytes'] / 1000:>13.1f} {result['binned']:>7} {result['serialize_s']:>9.3f}")
+
+
+def run(scales, repeat, sections):
+    """
+    Run the benchmark for every scale and section.
+    Returns:
+        dict: Results keyed by scale ('x1', 'x10', ...) and section name, with the
+            warm-up under WARMUP
+    """
+    base = da.load_data()
+    results = {}
+    for factor in scales:
+        df = scale_dataset(base, factor)
+        results[f'x{factor}'] = {}
+        print(f"\n== {len(df):,} rows (x{factor}) ==")
+        warm, result = measure_warmup(df, repeat)
+        results[f'x{factor}'][WARMUP] = result
+        print(f"{'Warm-up task':<42} {'time (s)':>9}")
+        for task, seconds in sorted(result['tasks'].items(), key=lambda item: -item[1]):
+            print(f"{task:<42} {seconds:>9.3f}")
+
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot = {'warm': warm, 'full_ranges': full_ranges(df), 'store': None, 'manifest': None}
+            if any(SECTIONS[name] is section_11_store for name in sections):
+                snapshot['store'] = columnar_store.ColumnarStore(directory)
+                snapshot['store'].ingest(df, source='benchmark')
+                snapshot['manifest'] = snapshot['store'].manifest()
+            print(f"\n{'Section':<42} {'time (s)':>9} {'first (s)':>9} {'peak (MB)':>11} {'payload (kB)':>13} "
+                  f"{'binned':>7} {'json (s)':>9}")
+            print_row(WARMUP, result)
+            for name in sections:
+                result = measure(SECTIONS[name], name, snapshot, repeat)
+                results[f'x{factor}'][name] = result
+                print_row(name, result)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results with a stored baseline.
+    Returns:
+        list: Descriptions of the measurements that regressed by more than `tolerance`
+            and by more than their floor in METRIC_FLOORS
+    """
+    regressions = []
+    for scale, sections in results.items():
+        for name, result in sections.items():
+            reference = baseline.get('results', {}).get(scale, {}).get(name)
+            if reference is None:
+                continue
+            for metric, floor in METRIC_FLOORS.items():
+                if result[metric] > reference[metric] * (1 + tolerance) and result[metric] - reference[metric] > floor:
+                    regressions.append(f"{scale} {name} {metric}: {reference[metric]:.4g} -> {result[metric]:.4g}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard sections.")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10],
+                        help="Dataset sizes as multiples of the bundled dataset")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Least number of runs of the warm-up and each section, the best time is kept")
+    parser.add_argument('--sections', nargs='+', help="Only run sections whose name starts with these numbers")
+    parser.add_argument('--save-baseline', metavar='PATH', help="Store the results as a baseline")
+    parser.add_argument('--compare', metavar='PATH', help="Compare the results with a baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args(argv)
+
+    sections = [name for name in SECTIONS
+                if not args.sections or name.split('.')[0] in args.sections]
+    results = run(args.scales, args.repeat, sections)
+
+    if args.save_baseline:
+        baseline = {'meta': {'python': platform.python_version(), 'machine': platform.platform(),
+                             'pandas': pd.__version__, 'numpy': np.__version__,
+                             'payload_budget_kb': payload_budget.budget_from_env() / 1000},
+                    'results': results}
+        Path(args.save_baseline).write_text(json.dumps(baseline, indent=2, ensure_ascii=False) + '\n',
+                                            encoding='utf-8')
+        print(f"\nBaseline saved: {args.save_baseline}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
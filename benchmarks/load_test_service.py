@@ -0,0 +1,124 @@
+# Load test for the appraisal service (appraisal_service.py).
+#
+# Concurrent clients send appraisals to a running service, each client over one
+# persistent HTTP connection that is reused for all its requests, like a purchasing
+# system with a connection pool. Candidates are drawn from the market data with their
+# price varied, so the decisions differ. Reports throughput and p50/p95/p99 latency
+# per request, and how many batches the service evaluated.
+#
+# Usage:
+#   python appraisal_service.py --port 8000 &
+#   python benchmarks/load_test_service.py --clients 32 --requests 200
+#   python benchmarks/load_test_service.py --clients 4 --requests 50 --batch-size 100
+#
+# The clients run in threads of one process: they mostly wait on the network, and
+# with the service on the same host a process per client would compete with it for CPU.
+
+# Import required libraries
+import argparse  # For parsing command-line arguments
+import http.client  # For persistent HTTP connections
+import json  # For the request and response bodies
+import sys  # For the module path
+import time  # For measuring latency
+from concurrent.futures import ThreadPoolExecutor  # For concurrent clients
+from pathlib import Path  # For handling file paths
+from urllib.parse import urlsplit  # For the service address
+
+import numpy as np  # For sampling candidates and percentiles
+
+# Make the application modules importable when running from the benchmarks folder
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import diamond_analysis as da  # noqa: E402
+
+
+def sample_candidates(count, seed=0):
+    """
+    Candidates drawn from the market data, with the price varied by up to +-40 %.
+    Returns:
+        list: Candidates as JSON-ready dicts
+    """
+    rng = np.random.default_rng(seed)
+    market = da.load_data()[da.APPRAISAL_COLS + ['cut', 'color', 'clarity']].dropna()
+    rows = market.iloc[rng.integers(0, len(market), count)].copy()
+    rows['price'] = (rows['price'] * rng.uniform(0.6, 1.4, count)).round()
+    return rows.to_dict(orient='records')
+
+
+def run_client(url, candidates, batch_size):
+    """
+    Send the candidates over one connection, one request per batch_size candidates.
+    Args:
+        url (str): Base URL of the service
+        candidates (list): Candidates for this client
+        batch_size (int): 1 to use the single endpoint, otherwise candidates per batch request
+    Returns:
+        list: Latency of every request in seconds
+    """
+    address = urlsplit(url)
+    connection = http.client.HTTPConnection(address.hostname, address.port or 80, timeout=60)
+    headers = {'Content-Type': 'application/json'}
+    latencies = []
+    try:
+        for start in range(0, len(candidates), batch_size):
+            if batch_size == 1:
+                path, body = '/appraise', candidates[start]
+            else:
+                path, body = '/appraise/batch', {'candidates': candidates[start:start + batch_size]}
+            began = time.perf_counter()
+            connection.request('POST', path, json.dumps(body), headers)
+            response = connection.getresponse()
+            payload = response.read()
+            latencies.append(time.perf_counter() - began)
+            if response.status != 200:
+                raise RuntimeError(f"{path}: HTTP {response.status} {payload[:200]!r}")
+    finally:
+        connection.close()
+    return latencies
+
+
+def get_json(url, path):
+    """
+    GET a JSON document from the service.
+    """
+    address = urlsplit(url)
+    connection = http.client.HTTPConnection(address.hostname, address.port or 80, timeout=60)
+    try:
+        connection.request('GET', path)
+        return json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the appraisal service.")
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help="Base URL of the running service")
+    parser.add_argument('--clients', type=int, default=16, help="Number of concurrent clients")
+    parser.add_argument('--requests', type=int, default=100, help="Requests per client")
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help="Candidates per request; above 1 the batch endpoint is used")
+    args = parser.parse_args(argv)
+
+    per_client = args.requests * args.batch_size
+    candidates = sample_candidates(args.clients * per_client)
+    before = get_json(args.url, '/health')
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        futures = [pool.submit(run_client, args.url, candidates[i * per_client:(i + 1) * per_client],
+                               args.batch_size) for i in range(args.clients)]
+        latencies = [latency for future in futures for latency in future.result()]
+    wall = time.perf_counter() - start
+    after = get_json(args.url, '/health')
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    print(f"{len(latencies)} requests ({len(candidates):,} appraisals) from {args.clients} clients in {wall:.1f} s")
+    print(f"Throughput: {len(latencies) / wall:,.0f} requests/s, {len(candidates) / wall:,.0f} appraisals/s")
+    print(f"Latency: p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms")
+    batches = after['batches'] - before['batches']
+    if batches:
+        batched = after['batched_appraisals'] - before['batched_appraisals']
+        print(f"Micro-batches: {batches}, {batched / batches:.1f} appraisals per batch on average")
+
+
+if __name__ == "__main__":
+    main()
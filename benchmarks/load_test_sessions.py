@@ -0,0 +1,210 @@
+# Load test that simulates concurrent Streamlit sessions.
+#
+# Each simulated visitor drives a headless session of part2_data_analysis.py with
+# Streamlit's AppTest through a realistic visit: the first page load, filter changes
+# in section 11 (multiselects and slider moves) and appraisals in section 12 (form
+# submits). Every interaction is a full script rerun, exactly like in the server.
+# Scrolling does not trigger reruns in Streamlit, so it is modelled as think time
+# between interactions.
+#
+# Usage:
+#   python benchmarks/load_test_sessions.py --sessions 8 --interactions 10
+#
+# All sessions run as threads of one process, like the sessions of one Streamlit
+# server: they share st.cache_resource, so the warm-up, the data watcher and the
+# appraisal cache are built once and used by every session. One page load before the
+# sessions start warms the server and is reported as the cold start; the sessions then
+# measure a warm server. CPU time and peak memory are those of the whole server
+# process, since the sessions share it.
+#
+# AppTest installs a mock runtime and patches the config for each run and removes
+# them afterwards, which breaks concurrent runs in one process, and it compiles the
+# script anew for every run, which Python 3.11 cannot do safely in parallel threads.
+# share_test_runtime() keeps the first mock runtime, the config patch and one script
+# cache for the whole process instead, like a server has.
+
+# Import required libraries
+import argparse  # For parsing command-line arguments
+import contextlib  # For keeping AppTest's config patch for the whole process
+import logging  # For silencing Streamlit's bare-mode warnings
+import random  # For varying the simulated interactions
+import resource  # For the peak memory of the server process
+import threading  # For the shared test runtime
+import time  # For measuring latency
+import warnings  # For silencing deprecation warnings
+from concurrent.futures import ThreadPoolExecutor  # For concurrent sessions in one server process
+from pathlib import Path  # For handling file paths
+
+import numpy as np  # For percentiles
+
+APP_PATH = Path(__file__).resolve().parent.parent / 'part2_data_analysis.py'
+
+CUTS = ["Ideal", "Premium", "Very Good", "Good", "Fair"]
+COLORS = ["D", "E", "F", "G", "H", "I", "J"]
+CLARITIES = ["IF", "VVS1", "VVS2", "VS1", "VS2", "SI1", "SI2", "I1"]
+
+
+def _quiet():
+    """
+    Silence the log output that AppTest produces for every rerun.
+    """
+    logging.disable(logging.WARNING)
+    warnings.filterwarnings('ignore')
+
+
+@contextlib.contextmanager
+def share_test_runtime():
+    """
+    Let AppTest sessions run concurrently in threads of this process while the context
+    is active. The mock runtime of the first run is kept for all runs, and the test
+    config patch stays in place, so one run finishing no longer removes them from the
+    runs still going. The script is compiled once, into a script cache shared by all runs.
+    """
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner, util
+
+    lock = threading.Lock()
+
+    class KeepFirst(type(Runtime)):
+        def __setattr__(cls, name, value):
+            if name != '_instance':
+                super().__setattr__(name, value)
+                return
+            # AppTest sets its mock before a run and None after it; only the first mock is kept
+            with lock:
+                if value is not None and not Runtime.exists():
+                    Runtime._instance = value
+
+    class SharedRuntime(Runtime, metaclass=KeepFirst):
+        pass
+
+    per_run_patch = app_test.patch_config_options
+    script_cache = ScriptCache()
+    app_test.Runtime = SharedRuntime
+    app_test.patch_config_options = lambda overrides: contextlib.nullcontext()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+    try:
+        with util.patch_config_options({'global.appTest': True}):
+            yield
+    finally:
+        app_test.Runtime = Runtime
+        app_test.patch_config_options = per_run_patch
+        app_test.ScriptCache = local_script_runner.ScriptCache = ScriptCache
+
+
+def _timed(latencies, action, step):
+    """
+    Run one rerun and record its latency.
+    """
+    start = time.perf_counter()
+    at = step()
+    latencies.append((action, time.perf_counter() - start))
+    if at.exception:
+        raise RuntimeError(f"{action}: {at.exception[0].message}")
+    return at
+
+
+def run_session(session_id, interactions, think_time, timeout):
+    """
+    Simulate one visitor.
+    Args:
+        session_id (int): Seed for this visitor's choices
+        interactions (int): Number of interactions after the first page load
+        think_time (float): Maximum pause between interactions in seconds (reading/scrolling)
+        timeout (float): Maximum time for one rerun
+    Returns:
+        list: (action, seconds) of every rerun
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(session_id)
+    latencies = []
+
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+    at = _timed(latencies, 'page_load', at.run)
+
+    for _ in range(interactions):
+        time.sleep(rng.uniform(0, think_time))
+        action = rng.choices(['multiselect', 'slider', 'form_submit', 'reload'], weights=[3, 4, 2, 1])[0]
+        if action == 'multiselect':
+            widget = rng.randrange(3)
+            options = [CUTS, COLORS, CLARITIES][widget]
+            at = _timed(latencies, action,
+                        at.multiselect[widget].set_value(rng.sample(options, rng.randint(0, 3))).run)
+        elif action == 'slider':
+            # Move the price slider or one of the keyed sliders within its own range
+            slider = rng.choice(at.slider)
+            low, high = slider.min, slider.max
+            a, b = sorted(rng.uniform(low, high) for _ in range(2))
+            if isinstance(low, int):
+                a, b = int(a), int(b)
+            at = _timed(latencies, action, slider.set_range(a, b).run)
+        elif action == 'form_submit':
+            at.number_input[0].set_value(round(rng.uniform(0.3, 2.0), 2))
+            at.number_input[1].set_value(rng.randint(500, 15000))
+            at.selectbox[0].set_value(rng.choice(CUTS))
+            at.selectbox[1].set_value(rng.choice(COLORS))
+            at.selectbox[2].set_value(rng.choice(CLARITIES))
+            at = _timed(latencies, action, at.button[0].click().run)
+        else:
+            at = _timed(latencies, action, at.run)
+
+    return latencies
+
+
+def summarize(results, wall, cpu, cold_start):
+    """
+    Print latency percentiles per action and the resource use of the server.
+    Args:
+        results (list): Output of run_session() per session
+        wall (float): Seconds the sessions ran
+        cpu (float): CPU seconds of the server process while the sessions ran
+        cold_start (float): Seconds of the first page load
+    """
+    print(f"Cold start (first page load of the server): {cold_start:.1f} s\n")
+    latencies = [item for result in results for item in result]
+    print(f"{'action':<14} {'reruns':>7} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9}")
+    for action in ['page_load', 'multiselect', 'slider', 'form_submit', 'reload', 'all']:
+        values = [t for a, t in latencies if action in (a, 'all')]
+        if not values:
+            continue
+        p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+        print(f"{action:<14} {len(values):>7} {p50:>9.0f} {p95:>9.0f} {p99:>9.0f}")
+
+    sessions = len(results)
+    print(f"\n{sessions} sessions, {len(latencies)} reruns in {wall:.1f} s "
+          f"({len(latencies) / wall:.1f} reruns/s)")
+    print(f"CPU of the server process: {cpu:.1f} s while the sessions ran, "
+          f"{cpu / len(latencies) * 1000:.0f} ms per rerun")
+    print(f"Peak memory of the server process: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent Streamlit sessions.")
+    parser.add_argument('--sessions', type=int, default=4, help="Number of concurrent sessions")
+    parser.add_argument('--interactions', type=int, default=10, help="Interactions per session after the page load")
+    parser.add_argument('--think-time', type=float, default=0.5, help="Maximum pause between interactions (s)")
+    parser.add_argument('--timeout', type=float, default=120.0, help="Maximum time for one rerun (s)")
+    args = parser.parse_args(argv)
+
+    _quiet()
+    from streamlit.testing.v1 import AppTest
+
+    with share_test_runtime():
+        # The first page load starts the warm-up that all sessions share
+        start = time.perf_counter()
+        AppTest.from_file(str(APP_PATH), default_timeout=args.timeout).run()
+        cold_start = time.perf_counter() - start
+
+        start, cpu_start = time.perf_counter(), time.process_time()
+        with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+            futures = [pool.submit(run_session, i, args.interactions, args.think_time, args.timeout)
+                       for i in range(args.sessions)]
+            results = [future.result() for future in futures]
+        wall, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+    summarize(results, wall, cpu, cold_start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+# Append-only columnar store for the growing inventory.
+#
+# Every ingested delta file becomes a new batch: one .npy file per column, with the
+# text columns stored as integer codes. The rows of a batch are ordered by
+# (cut, color, clarity), so each combination is one partition, a contiguous range of
+# rows. Within a partition the rows are ordered by carat, the main driver of price,
+# and split into blocks of BLOCK_ROWS rows. The manifest records the row range of
+# every partition and block and the min, max and number of missing values of each
+# numerical column in them (zone maps). A query reads only the blocks of the selected
+# combinations whose value ranges overlap the filters; since carat is sorted, a carat
+# range touches only the blocks around its bounds that are not fully covered. The
+# files are memory-mapped, so only the parts that are read are loaded from disk. The
+# store also keeps the aggregate cube and the histogram sketches of all partitions
+# together (see aggregates.py). An ingestion only computes the aggregates of the delta
+# and adds them to the stored totals, so its cost grows with the size of the delta,
+# not with the whole history.
+#
+# Layout:
+#   store/manifest.json           Columns, categories, batches, partitions and the aggregates file
+#   store/batch-00001/<col>.npy   One batch per ingested delta
+#   store/aggregates-00001.npz    Cube and sketches of all batches up to that version
+#
+# Partitions and aggregates are written first and the manifest is replaced last, so
+# readers always see a complete version of the store. There must be only one writer
+# at a time.
+
+# Import required libraries
+import json  # For the manifest
+import os  # For atomic renames
+import shutil  # For removing unfinished partitions
+import tempfile  # For writing partitions before they are renamed into place
+from pathlib import Path  # For handling file paths
+
+import numpy as np  # For the column files
+import pandas as pd  # For reading deltas and rebuilding DataFrames
+import aggregates  # Cube and sketches merged at ingestion
+import diamond_analysis as da  # Cleaning and category orders
+
+# Directory of a store the app should read instead of the bundled CSV
+ENV_VAR = 'DIAMONDS_STORE'
+# Columns the partitions are split by
+PARTITION_KEYS = ['cut', 'color', 'clarity']
+# Column the rows are ordered by within a partition
+CLUSTER_KEY = 'carat'
+# Rows per block of a partition, the unit of range pruning
+BLOCK_ROWS = 1024
+
+
+def from_env():
+    """
+    The store named by DIAMONDS_STORE.
+    Returns:
+        ColumnarStore or None: The store, or None if the app should read the CSV
+    """
+    directory = os.environ.get(ENV_VAR)
+    return ColumnarStore(directory) if directory else None
+
+
+class ColumnarStore:
+    """
+    A directory of column files, partitioned by ingested delta and quality combination.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.manifest_path = self.directory / 'manifest.json'
+
+    def exists(self):
+        """
+        Check whether anything has been ingested yet.
+        """
+        return self.manifest_path.exists()
+
+    def manifest(self):
+        """
+        The current manifest.
+        Returns:
+            dict: Version, columns, dtypes, categories, batches, partitions and aggregates file
+        """
+        return json.loads(self.manifest_path.read_text(encoding='utf-8'))
+
+    def _write_manifest(self, manifest):
+        """
+        Replace the manifest atomically.
+        """
+        tmp_path = self.manifest_path.with_suffix('.json.tmp')
+        tmp_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding='utf-8')
+        os.replace(tmp_path, self.manifest_path)
+
+    def ingest(self, delta, source=None):
+        """
+        Append a delta as a new batch of partitions and merge its aggregates into the totals.
+        Args:
+            delta (pandas.DataFrame): Raw rows with the dataset's columns, cleaned here
+            source (str): Where the rows came from, recorded in the manifest
+        Returns:
+            dict: The new batch's manifest entry
+        """
+        delta = da.clean_data(delta).reset_index(drop=True)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self.exists():
+            manifest = self.manifest()
+            missing = set(manifest['columns']) - set(delta.columns)
+            if missing:
+                raise ValueError(f"Delta is missing columns: {', '.join(sorted(missing))}")
+        else:
+            manifest = {'version': 0, 'columns': list(delta.columns), 'dtypes': {}, 'categories': {},
+                        'batches': [], 'partitions': [], 'aggregates': None}
+            for col in delta.columns:
+                if pd.api.types.is_numeric_dtype(delta[col]):
+                    manifest['dtypes'][col] = str(delta[col].dtype)
+                else:
+                    manifest['categories'][col] = list(da.CATEGORY_ORDERS.get(col, []))
+
+        # Encode every column once, then split the rows by quality combination
+        encoded = {}
+        for col in manifest['columns']:
+            if col in manifest['categories']:
+                encoded[col] = self._encode(delta[col], manifest['categories'][col])
+            else:
+                values = delta[col]
+                if values.isna().any() and np.issubdtype(np.dtype(manifest['dtypes'][col]), np.integer):
+                    raise ValueError(f"Column {col} has missing values but is stored as {manifest['dtypes'][col]}")
+                encoded[col] = values.to_numpy(dtype=manifest['dtypes'][col])
+        cells, cell_of_row = np.unique(np.stack([encoded[key] for key in PARTITION_KEYS], axis=1),
+                                       axis=0, return_inverse=True)
+        # By combination, then by carat with missing values last
+        order = np.lexsort((encoded[CLUSTER_KEY], cell_of_row.ravel()))
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(cell_of_row.ravel(), minlength=len(cells)))])
+
+        version = manifest['version'] + 1
+        batch = f'batch-{version:05d}'
+        partitions = []
+        tmp = Path(tempfile.mkdtemp(prefix=f'.{batch}-', dir=self.directory))
+        try:
+            for col, values in encoded.items():
+                np.save(tmp / f'{col}.npy', values[order])
+            for i, cell in enumerate(cells):
+                start, stop = int(bounds[i]), int(bounds[i + 1])
+                blocks = []
+                for block_start in range(start, stop, BLOCK_ROWS):
+                    block_stop = min(block_start + BLOCK_ROWS, stop)
+                    blocks.append({'start': block_start, 'stop': block_stop,
+                                   'stats': self._stats(encoded, order[block_start:block_stop], manifest)})
+                # Named by the cut, color and clarity codes, 'na' for missing values
+                cell_name = '-'.join('na' if code < 0 else str(code) for code in cell)
+                partitions.append({'name': f'{batch}/{cell_name}', 'batch': batch, 'start': start, 'stop': stop,
+                                   'cell': [int(code) for code in cell],
+                                   'stats': self._stats(encoded, order[start:stop], manifest), 'blocks': blocks})
+            os.rename(tmp, self.directory / batch)
+        finally:
+            if tmp.exists():
+                shutil.rmtree(tmp, ignore_errors=True)
+
+        # Only the delta is aggregated; the totals of the earlier batches are reused
+        delta_aggregates = {**aggregates.build_cube(delta), **aggregates.build_sketches(delta)}
+        if manifest['aggregates']:
+            totals = aggregates.merge_cubes(self._load_aggregates(manifest['aggregates']), delta_aggregates)
+        else:
+            totals = delta_aggregates
+        aggregates_name = f'aggregates-{version:05d}.npz'
+        np.savez(self.directory / aggregates_name, **totals)
+
+        previous = manifest['aggregates']
+        entry = {'name': batch, 'rows': int(len(delta)), 'partitions': len(partitions),
+                 'source': str(source) if source else None}
+        manifest.update(version=version, aggregates=aggregates_name)
+        manifest['batches'].append(entry)
+        manifest['partitions'].extend(partitions)
+        self._write_manifest(manifest)
+        # Readers of the previous version may still open its aggregates, so only older ones are removed
+        for path in self.directory.glob('aggregates-*.npz'):
+            if path.name not in (aggregates_name, previous):
+                path.unlink()
+        return entry
+
+    def _stats(self, encoded, rows, manifest):
+        """
+        Zone map of some rows: the stats of every numerical column.
+        """
+        return {col: self._column_stats(values[rows])
+                for col, values in encoded.items() if col not in manifest['categories']}
+
+    @staticmethod
+    def _column_stats(values):
+        """
+        Min, max and number of missing values of a column in a partition, None if it has no values.
+        """
+        missing = np.isnan(values) if values.dtype.kind == 'f' else np.zeros(len(values), dtype=bool)
+        values = values[~missing]
+        if len(values) == 0:
+            return None
+        return [values.min().item(), values.max().item(), int(missing.sum())]
+
+    def ingest_csv(self, path):
+        """
+        Ingest a delta CSV file with the same columns as the bundled dataset.
+        Returns:
+            dict: The new batch's manifest entry
+        """
+        return self.ingest(pd.read_csv(path), source=Path(path).name)
+
+    @staticmethod
+    def _encode(values, categories):
+        """
+        Integer codes of a text column, -1 for missing values. New categories are
+        appended to the list, so the codes of earlier partitions stay valid.
+        """
+        for value in pd.unique(values.dropna()):
+            if value not in categories:
+                categories.append(str(value))
+        return pd.Categorical(values, categories=categories).codes.astype(np.int16)
+
+    def _load_aggregates(self, name):
+        """
+        Read an aggregates file into a dict of arrays.
+        """
+        with np.load(self.directory / name) as data:
+            return {key: data[key] for key in data.files}
+
+    def aggregates(self, manifest=None):
+        """
+        The cube and sketches of all partitions, without reading any partition.
+        Returns:
+            dict: Arrays as produced by aggregates.build_cube() and aggregates.build_sketches()
+        """
+        manifest = manifest or self.manifest()
+        return self._load_aggregates(manifest['aggregates'])
+
+    @staticmethod
+    def _match(stats, ranges):
+        """
+        Compare a zone map with the range filters.
+        Returns:
+            tuple: Whether any row can match, and the columns that must be filtered
+                row by row because their range does not cover all rows
+        """
+        partial = set()
+        for col, (low, high) in (ranges or {}).items():
+            col_stats = stats[col]
+            # Missing values never match a range
+            if col_stats is None or col_stats[1] < low or col_stats[0] > high:
+                return False, set()
+            if col_stats[0] < low or col_stats[1] > high or col_stats[2]:
+                partial.add(col)
+        return True, partial
+
+    def prune(self, cuts=None, colors=None, clarities=None, ranges=None, manifest=None):
+        """
+        Find the rows that can hold diamonds matching the filters, using the quality
+        combination of each partition and the zone maps of the partitions and blocks.
+        Args:
+            cuts, colors, clarities (list): Selected categories, an empty selection means all
+            ranges (dict): Inclusive (min, max) range per numerical column
+        Returns:
+            tuple: Row ranges to read as (batch, start, stop), and the columns whose
+                range only partly covers at least one of them and so must be filtered row by row
+        """
+        manifest = manifest or self.manifest()
+        selected_codes = []
+        for key, selected in zip(PARTITION_KEYS, [cuts, colors, clarities]):
+            categories = manifest['categories'][key]
+            selected_codes.append({categories.index(value) for value in selected if value in categories}
+                                  if selected else None)
+        row_ranges, partial = [], set()
+        for partition in manifest['partitions']:
+            if any(codes is not None and code not in codes for codes, code in zip(selected_codes, partition['cell'])):
+                continue
+            overlaps, partition_partial = self._match(partition['stats'], ranges)
+            if not overlaps:
+                continue
+            if not partition_partial:
+                row_ranges.append((partition['batch'], partition['start'], partition['stop']))
+                continue
+            for block in partition['blocks']:
+                overlaps, block_partial = self._match(block['stats'], ranges)
+                if not overlaps:
+                    continue
+                partial |= block_partial
+                # Adjacent blocks are read as one range
+                if row_ranges and row_ranges[-1][0] == partition['batch'] and row_ranges[-1][2] == block['start']:
+                    row_ranges[-1] = (partition['batch'], row_ranges[-1][1], block['stop'])
+                else:
+                    row_ranges.append((partition['batch'], block['start'], block['stop']))
+        return row_ranges, sorted(partial)
+
+    def query(self, cuts=None, colors=None, clarities=None, ranges=None, columns=None, manifest=None):
+        """
+        Diamonds matching the filters, like da.filter_diamonds() on the whole store,
+        reading only the blocks that can match and the columns that are needed.
+        Args:
+            cuts, colors, clarities (list): Selected categories, an empty selection means all
+            ranges (dict): Inclusive (min, max) range per numerical column
+            columns (list): Columns to return, defaults to all
+        Returns:
+            pandas.DataFrame: The matching diamonds
+        """
+        manifest = manifest or self.manifest()
+        columns = columns or manifest['columns']
+        row_ranges, partial = self.prune(cuts, colors, clarities, ranges, manifest)
+        df = self.read_ranges(row_ranges, manifest, columns=list(dict.fromkeys(columns + partial)))
+        mask = np.ones(len(df), dtype=bool)
+        for col in partial:
+            low, high = ranges[col]
+            values = df[col].to_numpy()
+            mask &= (values >= low) & (values <= high)
+        return df.loc[mask, columns].reset_index(drop=True)
+
+    def read_partitions(self, names, manifest=None, columns=None):
+        """
+        Read some partitions as one DataFrame.
+        Args:
+            names (list): Partition names from the manifest
+            columns (list): Columns to read, defaults to all
+        Returns:
+            pandas.DataFrame: The rows, with text columns as categoricals
+        """
+        manifest = manifest or self.manifest()
+        by_name = {partition['name']: partition for partition in manifest['partitions']}
+        row_ranges = [(by_name[name]['batch'], by_name[name]['start'], by_name[name]['stop']) for name in names]
+        return self.read_ranges(row_ranges, manifest, columns)
+
+    def read_ranges(self, row_ranges, manifest=None, columns=None):
+        """
+        Read row ranges of the batches as one DataFrame.
+        Args:
+            row_ranges (list): (batch, start, stop) tuples, e.g. from prune()
+            columns (list): Columns to read, defaults to all
+        Returns:
+            pandas.DataFrame: The rows, with text columns as categoricals
+        """
+        manifest = manifest or self.manifest()
+        columns = columns or manifest['columns']
+        # Concatenate the row ranges first and build the DataFrame once
+        data = {}
+        for col in columns:
+            files = {}
+            parts = []
+            for batch, start, stop in row_ranges:
+                if batch not in files:
+                    files[batch] = np.load(self.directory / batch / f'{col}.npy', mmap_mode='r')
+                parts.append(files[batch][start:stop])
+            dtype = np.int16 if col in manifest['categories'] else manifest['dtypes'][col]
+            values = np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+            if col in manifest['categories']:
+                data[col] = pd.Categorical.from_codes(values, categories=manifest['categories'][col])
+            else:
+                data[col] = values
+        return pd.DataFrame(data, columns=columns)
+
+    def read_frame(self, manifest=None):
+        """
+        Read the whole store.
+        Returns:
+            pandas.DataFrame: All rows, with text columns as categoricals
+        """
+        manifest = manifest or self.manifest()
+        return self.read_partitions([p['name'] for p in manifest['partitions']], manifest)
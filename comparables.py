@@ -0,0 +1,148 @@
+# Import required libraries
+import numpy as np  # For numerical operations
+import pandas as pd  # For data manipulation and analysis
+from sklearn.neighbors import KDTree  # For fast nearest-neighbour lookups
+
+# Numerical properties used to measure how similar two diamonds are
+FEATURE_COLS = ['carat', 'depth', 'table', 'x', 'y', 'z']
+# Quality attributes that split the market into separate search partitions
+CATEGORY_COLS = ['cut', 'color', 'clarity']
+# Columns returned for every comparable market diamond
+RESULT_COLS = ['carat', 'cut', 'color', 'clarity', 'depth', 'table', 'price', 'x', 'y', 'z']
+
+
+class ComparablesIndex:
+    """
+    Nearest-neighbour index over the market data for finding comparable diamonds.
+
+    The numerical properties are standardized (z-scores) so that carat, depth,
+    table and the dimensions contribute equally to the distance. One KD-tree is
+    built per (cut, color, clarity) combination, so a query only searches among
+    diamonds of the same quality. If a combination has fewer than k diamonds the
+    search falls back to a tree over the whole market.
+    """
+
+    def __init__(self, df, leaf_size=40):
+        """
+        Build the index.
+        Args:
+            df (pandas.DataFrame): Market diamonds with FEATURE_COLS, CATEGORY_COLS and price
+            leaf_size (int): Leaf size passed to the KD-trees
+        """
+        # Keep a positional copy of the market data, skipping diamonds with missing values
+        self.market = df[RESULT_COLS].dropna().reset_index(drop=True)
+        self._columns = {col: self.market[col].to_numpy() for col in RESULT_COLS}
+
+        # Standardize the numerical properties
+        features = self.market[FEATURE_COLS].to_numpy(dtype=float)
+        self.mean = features.mean(axis=0)
+        self.std = features.std(axis=0)
+        self.std[self.std == 0] = 1.0
+        scaled = (features - self.mean) / self.std
+
+        # Translate each quality attribute to integer codes
+        self._categories = {}
+        codes = []
+        for col in CATEGORY_COLS:
+            col_codes, uniques = pd.factorize(self.market[col])
+            self._categories[col] = {value: code for code, value in enumerate(uniques)}
+            codes.append(col_codes)
+        self._codes = np.column_stack(codes)
+
+        # One tree per quality combination, stored with the market positions it covers
+        self._partitions = {}
+        groups = pd.DataFrame(self._codes).groupby(list(range(len(CATEGORY_COLS)))).indices
+        for key, positions in groups.items():
+            self._partitions[key] = (KDTree(scaled[positions], leaf_size=leaf_size), positions)
+
+        # Tree over the whole market, used when a partition is too small
+        self._market_tree = (KDTree(scaled, leaf_size=leaf_size), np.arange(len(self.market)))
+
+    def _partition_key(self, cut, color, clarity):
+        """
+        Look up the partition key for a quality combination.
+        Returns:
+            tuple or None: The category codes, or None if the combination is unknown
+        """
+        try:
+            return (self._categories['cut'][cut],
+                    self._categories['color'][color],
+                    self._categories['clarity'][clarity])
+        except KeyError:
+            return None
+
+    def _search(self, scaled, keys, k):
+        """
+        Run the tree searches for a batch of standardized candidates.
+        Returns:
+            tuple: Market positions (n x k), distances (n x k), a same-quality flag per
+            candidate and a mask of candidates that could be searched
+        """
+        rows = np.zeros((len(keys), k), dtype=np.intp)
+        distances = np.zeros((len(keys), k))
+        same_quality = np.zeros(len(keys), dtype=bool)
+        valid = ~np.isnan(scaled).any(axis=1)
+
+        # Group the candidates per partition so each tree is queried once per batch
+        batches = {}
+        for position, key in enumerate(keys):
+            if not valid[position]:
+                continue
+            if key not in self._partitions or len(self._partitions[key][1]) < k:
+                key = None
+            batches.setdefault(key, []).append(position)
+
+        for key, positions in batches.items():
+            tree, market_positions = self._market_tree if key is None else self._partitions[key]
+            batch_distances, neighbours = tree.query(scaled[positions], k=k)
+            rows[positions] = market_positions[neighbours]
+            distances[positions] = batch_distances
+            same_quality[positions] = key is not None
+        return rows, distances, same_quality, valid
+
+    def _to_frame(self, labels, rows, distances, same_quality, valid):
+        """
+        Collect search results into one DataFrame without per-row pandas work.
+        Returns:
+            pandas.DataFrame: The comparables, see query()
+        """
+        k = rows.shape[1]
+        flat_rows = rows[valid].ravel()
+        data = {
+            'candidate': np.repeat(np.asarray(labels)[valid], k),
+            'rank': np.tile(np.arange(1, k + 1), int(valid.sum())),
+            'distance': distances[valid].ravel(),
+            'same_quality': np.repeat(same_quality[valid], k),
+        }
+        for col in RESULT_COLS:
+            data[col] = self._columns[col][flat_rows]
+        return pd.DataFrame(data)
+
+    def query(self, candidates, k=20):
+        """
+        Find the k most similar market diamonds for one or more candidates.
+        Args:
+            candidates (pandas.DataFrame): Candidate diamonds with FEATURE_COLS and CATEGORY_COLS
+            k (int): Number of comparables to return per candidate
+        Returns:
+            pandas.DataFrame: One row per comparable with the columns 'candidate' (index label
+            of the candidate), 'rank', 'distance', 'same_quality' and RESULT_COLS.
+            Candidates with missing numerical values get no comparables.
+        """
+        k = min(k, len(self.market))
+        scaled = (candidates[FEATURE_COLS].to_numpy(dtype=float) - self.mean) / self.std
+        keys = [self._partition_key(cut, color, clarity)
+                for cut, color, clarity in candidates[CATEGORY_COLS].itertuples(index=False)]
+        return self._to_frame(candidates.index, *self._search(scaled, keys, k))
+
+    def query_one(self, carat, cut, color, clarity, depth, table, x, y, z, k=20):
+        """
+        Find the k most similar market diamonds for a single candidate.
+        Returns:
+            pandas.DataFrame: The comparables, see query()
+        """
+        k = min(k, len(self.market))
+        features = np.array([[carat, depth, table, x, y, z]], dtype=float)
+        scaled = (features - self.mean) / self.std
+        keys = [self._partition_key(cut, color, clarity)]
+        return self._to_frame([0], *self._search(scaled, keys, k))
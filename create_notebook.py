@@ -1,1230 +1,1230 @@
-# Import required library for JSON handling
-import json
-from ipywidgets import widgets, Layout, VBox
-import pandas as pd
-from IPython.display import display
-
-# Create the notebook structure with cells
-notebook = {
-    "cells": [
-        # Title and table of contents
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "# Kunskapskontroll - Python och Dataanalys\n",
-                "\n",
-                "## Innehåll\n",
-                "1. [Del 1 - Teoretiska frågor och Python-övningar](#del-1)\n",
-                "2. [Del 2 - Dataanalys av Diamonds Dataset](#del-2)\n",
-                "3. [Självutvärdering](#självutvärdering)"
-            ]
-        },
-        # Part 1 header
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "## Del 1 - Teoretiska frågor och Python-övningar <a name=\"del-1\"></a>"
-            ]
-        },
-        # Table of contents for Del 1
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### Innehåll Del 1\n",
-                "1. [Tuple vs List](#tuple-vs-list)\n",
-                "2. [Funktioner](#funktioner)\n",
-                "3. [Klasser](#klasser)\n",
-                "4. [Streamlit](#streamlit)\n",
-                "5. [BankAccount klass](#bankaccount-klass)\n",
-                "6. [Vokalräknare](#vokalr%C3%A4knare)\n",
-                "7. [Gemensamma element](#gemensamma-element)\n",
-                "8. [Storkar och barnafödsel](#storkar-och-barnaf%C3%B6dsel)\n",
-                "9. [Medelvärde vs Median](#medelv%C3%A4rde-vs-median)\n",
-                "10. [Cirkeldiagram](#cirkeldiagram)\n",
-                "11. [Linjediagram](#linjediagram)\n",
-                "12. [Lådagram](#l%C3%A5dagram)\n"
-            ]
-        },
-        # Tuple vs List explanation
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 1. Tuple vs List\n",
-                "\n",
-                "Skillnaden mellan tuple och list:\n",
-                "- Tuple är oföränderlig (immutable), list är föränderlig (mutable)\n",
-                "- Tuple används för data som inte ska ändras, list för data som kan ändras\n",
-                "- Tuple är snabbare och tar mindre minne\n",
-                "- List har fler inbyggda metoder för manipulation\n",
-                "\n",
-                "Ingen är \"bättre\" - de har olika användningsområden:\n",
-                "- Tuple: När data inte ska ändras (t.ex. koordinater, konstanter)\n",
-                "- List: När data behöver manipuleras (t.ex. dynamiska samlingar)"
-            ]
-        },
-        # Functions explanation
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 2. Funktioner\n",
-                "\n",
-                "Funktioner är återanvändbara kodblock som:\n",
-                "- Ökar kodens läsbarhet\n",
-                "- Minskar duplicering\n",
-                "- Gör koden mer underhållbar\n",
-                "- Möjliggör återanvändning av kod"
-            ]
-        },
-        # Classes explanation
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 3. Klasser\n",
-                "\n",
-                "a) Instans: Ett konkret objekt skapat från en klass\n",
-                "b) Attribut: Egenskaper/variabler som tillhör en klass\n",
-                "c) Metod: Funktioner som tillhör en klass"
-            ]
-        },
-        # Streamlit explanation
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 4. Streamlit\n",
-                "\n",
-                "Streamlit är ett Python-bibliotek för att skapa webbapplikationer för dataanalys.\n",
-                "Det gör det enkelt att:\n",
-                "- Skapa interaktiva visualiseringar\n",
-                "- Bygga dashboards\n",
-                "- Presentera dataanalys\n",
-                "- Skapa interaktiva datamodeller"
-            ]
-        },
-        # BankAccount class implementation
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 5. BankAccount klass"
-            ]
-        },
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Define the BankAccount class with basic banking operations\n",
-                "class BankAccount:\n",
-                "    def __init__(self, account_holder, balance=0):\n",
-                "        self.account_holder = account_holder  # Store account holder name\n",
-                "        self.balance = balance  # Initialize balance\n",
-                "    \n",
-                "    def deposit(self, amount):\n",
-                "        # Add money to account if amount is positive\n",
-                "        if amount > 0:\n",
-                "            self.balance += amount\n",
-                "            return f\"Deposited {amount}. New balance: {self.balance}\"\n",
-                "        return \"Invalid amount\"\n",
-                "    \n",
-                "    def withdraw(self, amount):\n",
-                "        # Remove money from account if sufficient balance\n",
-                "        if amount > 0:\n",
-                "            if amount <= self.balance:\n",
-                "                self.balance -= amount\n",
-                "                return f\"Withdrawn {amount}. New balance: {self.balance}\"\n",
-                "            return \"Too low balance\"\n",
-                "        return \"Invalid amount\"\n",
-                "\n",
-                "# Test the BankAccount class with example operations\n",
-                "account = BankAccount(\"John Doe\", 1000)\n",
-                "print(f\"Account holder: {account.account_holder}\")\n",
-                "print(f\"Initial balance: {account.balance}\")\n",
-                "print(account.deposit(500))\n",
-                "print(account.withdraw(200))\n",
-                "print(account.withdraw(2000))  # Should show \"Too low balance\""
-            ]
-        },
-        # Vowel counter implementation
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 6. Vokalräknare"
-            ]
-        },
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Function to count vowels in a text string\n",
-                "def vowel_checker(text):\n",
-                "    vowels = \"AEIOUYÅÄÖ\"  # Define vowels including Swedish characters\n",
-                "    return sum(1 for char in text.upper() if char in vowels)  # Count vowels\n",
-                "\n",
-                "# Test the function with a Swedish word\n",
-                "print(vowel_checker(\"hjärna\"))  # Should return 2"
-            ]
-        },
-        # Common elements implementation
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 7. Gemensamma element"
-            ]
-        },
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Function to find common elements between two lists\n",
-                "def common_elements(list1, list2):\n",
-                "    return [x for x in list1 if x in list2]  # List comprehension for common elements\n",
-                "\n",
-                "# Test the function with example lists\n",
-                "list1 = [4, 'apple', 10, 'hi', 3]\n",
-                "list2 = [23, 'apple', 5, 9, 3]\n",
-                "print(common_elements(list1, list2))  # Should return ['apple', 3]"
-            ]
-        },
-        # Storks and birth rates analysis
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 8. Storkar och barnafödsel\n",
-                "\n",
-                "Bilden visar ett spridningsdiagram med rubriken 'The Relationship Between Stork Populations and Human Birth Rates'. På x-axeln visas antalet storkpar ('Number of stork breeding pairs') och på y-axeln antalet födslar per år i tusental ('Birth rate (thousands per year)'). Varje punkt i grafen representerar en observation där både antalet storkpar och födelsetal har mätts. Det framgår dock inte exakt om en observation motsvarar en region, ett land, en stad eller något annat geografiskt område – men i liknande exempel brukar det ofta handla om olika regioner eller länder. Det finns en positiv trendlinje, vilket innebär att högre antal storkpar ofta sammanfaller med högre födelsetal.\n",
-                "\n",
-                "Slutsats:\n",
-                "\n",
-                "Trots att grafen visar en korrelation mellan antalet storkpar och födelsetal, innebär det inte att det finns ett orsakssamband mellan dessa två variabler. Detta är ett klassiskt exempel på en falsk korrelation (spurious correlation). Det är troligt att en tredje faktor, som till exempel regionens storlek eller befolkning, påverkar både antalet storkpar och antalet födslar. Grafen illustrerar tydligt att korrelation inte är detsamma som kausalitet, och att man måste vara försiktig med att dra slutsatser om orsakssamband enbart baserat på samband i data."
-            ]
-        },
-        # Mean vs Median explanation
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 9. Medelvärde vs Median\n",
-                "\n",
-                "Nej, jag håller inte med Kim. Båda måtten har sina användningsområden:\n",
-                "- Medelvärde: Bra för normalfördelad data utan extremvärden\n",
-                "- Median: Bättre när det finns extremvärden eller skev fördelning"
-            ]
-        },
-        # Pie chart explanation
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 10. Cirkeldiagram\n",
-                "\n",
-                "Cirkeldiagram används för att visa andelar av en helhet.\n",
-                "Spotify-exempel: Visa fördelningen av musikgenrer bland användarna"
-            ]
-        },
-        # Line chart explanation
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 11. Linjediagram\n",
-                "\n",
-                "Linjediagram används för att visa trender över tid.\n",
-                "Spotify-exempel: Visa antalet dagliga lyssnare över ett år"
-            ]
-        },
-        # Box plot explanation
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 12. Lådagram\n",
-                "\n",
-                "Lådagram (boxplot) används för att visa:\n",
-                "- Median\n",
-                "- Kvartiler\n",
-                "- Extremvärden\n",
-                "- Fördelning av data\n",
-                "- Identifiera avvikelser"
-            ]
-        },
-        # --- Del 2: Dataanalys av Diamonds Dataset ---
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "## Del 2 - Dataanalys av Diamonds Dataset <a name=\"del-2\"></a>"
-            ]
-        },
-        # Table of contents for Del 2
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### Innehåll Del 2\n",
-                "1. [Bakgrund](#bakgrund)\n",
-                "2. [Om Diamanter](#om-diamanter)\n",
-                "3. [Förberedelser](#f%C3%B6rberedelser)\n",
-                "4. [Grundläggande Statistik](#1-grundl%C3%A4ggande-statistik)\n",
-                "5. [Prisanalys](#2-prisanalys)\n",
-                "6. [Kvalitetsattribut (Cut, Color, Clarity)](#3-kvalitetsattribut-cut-color-clarity)\n",
-                "7. [Prisfördelning per Kvalitetsattribut](#4-prisf%C3%B6rdelning-per-kvalitetsattribut)\n",
-                "8. [Samband mellan Vikt och Pris](#5-samband-mellan-vikt-och-pris)\n",
-                "9. [Korrelationer](#6-korrelationer)\n",
-                "10. [Extremvärden och Saknade Värden](#7-extremv%C3%A4rden-och-saknade-v%C3%A4rden)\n",
-                "11. [Hypotesprövningar](#8-hypotespr%C3%B6vningar)\n",
-                "12. [Beslutsstöd: Ska vi köpa diamanten?](#9-beslutsst%C3%B6d-ska-vi-k%C3%B6pa-diamanten)\n",
-                "13. [Executive Summary och Data Storytelling](#10-executive-summary-och-data-storytelling)\n"
-            ]
-        },
-        # Bakgrund
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### Bakgrund\n",
-                "\n",
-                "Guldfynd överväger att expandera sitt sortiment med diamanter. \n",
-                "Denna analys hjälper till att förstå diamanternas egenskaper och marknadsmöjligheter."
-            ]
-        },
-        # Om Diamanter
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### Om Diamanter\n",
-                "\n",
-                "Diamanter är en av världens mest värdefulla ädelstenar, bildade under extremt högt tryck och temperatur djupt under jordens yta. \n",
-                "De består av kolatomer i en kristallstruktur och är kända för sin exceptionella hårdhet och briljans.\n",
-                "\n",
-                "#### De 4 C:na - Diamantens Viktigaste Egenskaper\n",
-                "\n",
-                "1. **Cut (Slipning)**\n",
-                "   - Beskriver hur väl diamanten är slipad och formad\n",
-                "   - Påverkar hur ljuset reflekteras och diamantens briljans\n",
-                "   - Kvaliteter från bäst till sämst: Ideal, Premium, Very Good, Good, Fair\n",
-                "\n",
-                "2. **Color (Färg)**\n",
-                "   - Mäter färglösheten i diamanten\n",
-                "   - Skala från D (helt färglös) till Z (ljusgul)\n",
-                "   - D-F: Färglösa\n",
-                "   - G-J: Nästan färglösa\n",
-                "   - K-M: Svagt färgade\n",
-                "\n",
-                "3. **Clarity (Klarhet)**\n",
-                "   - Beskriver frånvaron av inre och yttre brister\n",
-                "   - IF (Internally Flawless): Perfekt\n",
-                "   - VVS1-VVS2 (Very Very Slightly Included): Mycket små inneslutningar\n",
-                "   - VS1-VS2 (Very Slightly Included): Små inneslutningar\n",
-                "   - SI1-SI2 (Slightly Included): Synliga inneslutningar\n",
-                "   - I1-I3 (Included): Tydliga inneslutningar\n",
-                "\n",
-                "4. **Carat (Vikt)**\n",
-                "   - Mäter diamantens vikt\n",
-                "   - 1 karat = 0.2 gram\n",
-                "   - Större diamanter är sällsyntare och därför värdefullare\n",
-                "\n",
-                "#### Andra Viktiga Egenskaper\n",
-                "\n",
-                "- **Depth (Djup)**: Förhållandet mellan diamantens höjd och diameter\n",
-                "- **Table (Tavla)**: Storleken på diamantens toppfasetter\n",
-                "- **Dimensions (x, y, z)**: Diamantens fysiska mått i millimeter\n",
-                "\n",
-                "#### Värdering och Prissättning\n",
-                "\n",
-                "Diamantens värde bestäms av en kombination av alla 4 C:na, där:\n",
-                "- Hög kvalitet på alla C:na ger högst värde\n",
-                "- Vikt (carat) har ofta störst påverkan på priset\n",
-                "- Perfekta diamanter (D-IF) är extremt sällsynta och värdefulla\n",
-                "- Mindre perfekta diamanter kan erbjuda bättre värde för pengarna\n",
-                "\n",
-                "Denna kunskap är viktig för att förstå analysen och dess affärsmässiga implikationer."
-            ]
-        },
-        # Förberedelser
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### Förberedelser\n",
-                "\n",
-                "För att säkerställa att analysen bygger på rimliga och fysiskt möjliga värden tar vi bort alla rader där någon av dimensionerna x, y eller z är 0. \n",
-                "En diamant kan inte ha noll i längd, bredd eller höjd. Om sådana värden finns i datan beror det på felregistreringar eller saknad data. \n",
-                "Om vi inte tar bort dessa rader riskerar vi att få missvisande medelvärden, felaktiga samband och konstiga visualiseringar. \n",
-                "Efter borttagning av dessa rader blir analysen mer tillförlitlig och slutsatserna mer relevanta för verkliga diamanter."
-            ]
-        },
-        # Biblioteksimport och data-inläsning
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Importera bibliotek och ladda in data\n",
-                "import pandas as pd\n",
-                "import numpy as np\n",
-                "import plotly.express as px\n",
-                "import plotly.graph_objects as go\n",
-                "\n",
-                "# Läs in diamonds-datan\n",
-                "df = pd.read_csv('diamonds_dataset/diamonds.csv')\n",
-                "# Ta bort rader där någon av dimensionerna x, y, z är 0\n",
-                "zero_mask = (df[['x', 'y', 'z']] == 0).any(axis=1)\n",
-                "df = df[~zero_mask].copy()\n",
-                "print(f\"Dataset innehåller {len(df):,} diamanter efter borttagning av 0-värden.\")"
-            ]
-        },
-        # Grundläggande Statistik
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 1. Grundläggande Statistik\n",
-                "Syfte: Ge en överblick över datasetets storlek och grundläggande egenskaper."
-            ]
-        },
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Visa grundläggande statistik\n",
-                "print(f'Antal diamanter: {len(df):,}')\n",
-                "print(f'Medelpris: ${df[\"price\"].mean():,.2f}')\n",
-                "print(f'Medelvikt: {df[\"carat\"].mean():.2f} karat')"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Tolkning:** Datasetet är stort och representativt för marknaden. Medelpriset och medelvikten ger en första känsla för utbudet."
-            ]
-        },
-        # Price analysis section
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 2. Prisanalys\nSyfte: Undersöka prisfördelningen och identifiera eventuella extremvärden."
-            ]
-        },
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Create price distribution histogram\n",
-                "fig_price = px.histogram(df, x='price', nbins=50, title='Fördelning av Diamantpriser', labels={'price': 'Pris (USD)', 'count': 'Antal'})\n",
-                "fig_price.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Histogram.\n",
-                "**Hur man tolkar:** X-axeln visar prisintervall, Y-axeln antal diamanter. En toppig fördelning betyder många diamanter i det prisintervallet.\n",
-                "**Tolkning:** Priserna är snedfördelade med många billigare diamanter och ett fåtal mycket dyra.\n",
-                "**Insikt:** Priserna är koncentrerade till lägre nivåer, men det finns en lång svans av dyra diamanter.\n",
-                "**Affärsmässig tolkning:** Guldfynd kan erbjuda både prisvärda och exklusiva diamanter för att möta olika kunders behov."
-            ]
-        },
-        # Quality attributes section
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 3. Kvalitetsattribut (Cut, Color, Clarity)\nSyfte: Undersöka fördelningen av slipning, färg och klarhet. Alla är sorterade från bäst till sämst."
-            ]
-        },
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Define category orders from best to worst\n",
-                "cut_order = ['Ideal', 'Premium', 'Very Good', 'Good', 'Fair']\n",
-                "color_order = ['D', 'E', 'F', 'G', 'H', 'I', 'J']\n",
-                "clarity_order = ['IF', 'VVS1', 'VVS2', 'VS1', 'VS2', 'SI1', 'SI2', 'I1']\n",
-                "\n",
-                "# Filter data to include only known categories\n",
-                "df_cut = df[df['cut'].isin(cut_order)]\n",
-                "df_color = df[df['color'].isin(color_order)]\n",
-                "df_clarity = df[df['clarity'].isin(clarity_order)]\n",
-                "\n",
-                "# Create pie chart for cut quality\n",
-                "fig_cut = px.pie(df_cut, names='cut', title='Fördelning av Slipningskvalitet', category_orders={'cut': cut_order})\n",
-                "fig_cut.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Cirkeldiagram (pie chart) för slipningskvalitet.\n",
-                "**Hur man tolkar:** Varje tårtbit visar andelen diamanter av en viss slipning.\n",
-                "**Tolkning:** Ideal och Premium dominerar.\n",
-                "**Insikt:** Majoriteten av diamanterna har hög slipningskvalitet.\n",
-                "**Affärsmässig tolkning:** Guldfynd kan marknadsföra sitt sortiment som högkvalitativt och locka kvalitetsmedvetna kunder."
-            ]
-        },
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Create pie chart for color quality\n",
-                "fig_color = px.pie(df_color, names='color', title='Fördelning av Färgkvalitet', category_orders={'color': color_order})\n",
-                "fig_color.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Cirkeldiagram (pie chart) för färgkvalitet.\n",
-                "**Hur man tolkar:** Varje tårtbit visar andelen diamanter av en viss färg.\n",
-                "**Tolkning:** E, F och G är vanligast.\n",
-                "**Insikt:** Sortimentet domineras av nästan färglösa diamanter (E, F, G). Det innebär att Guldfynd kan erbjuda hög kvalitet till ett mer tillgängligt pris än de allra mest färglösa (D).\n",
-                "**Affärsmässig tolkning:** Guldfynd bör utgå från att det är vikten som driver priset i dessa segment. Färgkvalitet kan användas för att skapa produktsegment, men prissättningen bör i första hand baseras på vikt."
-            ]
-        },
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Create pie chart for clarity grades\n",
-                "fig_clarity = px.pie(df_clarity, names='clarity', title='Fördelning av Klarhetsgrader', category_orders={'clarity': clarity_order})\n",
-                "fig_clarity.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Cirkeldiagram (pie chart) för klarhetsgrader.\n",
-                "**Hur man tolkar:** Varje tårtbit visar andelen diamanter av en viss klarhet.\n",
-                "**Tolkning:** SI1 och VS2 är vanligast.\n",
-                "**Insikt:** De flesta diamanter har medelhög klarhet.\n",
-                "**Affärsmässig tolkning:** Guldfynd bör utgå från att det är vikten som driver priset i dessa segment. Klarhetsgrad kan användas för att skapa produktsegment, men prissättningen bör i första hand baseras på vikt."
-            ]
-        },
-        # Add carat analysis to quality attributes
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Create histogram for carat (weight)\n",
-                "fig_carat = px.histogram(df, x='carat', nbins=40, title='Fördelning av Vikt (Carat)', labels={'carat': 'Vikt (carat)', 'count': 'Antal'})\n",
-                "fig_carat.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Histogram för vikt (carat).\n",
-                "**Hur man tolkar:** X-axeln visar viktintervall (carat), Y-axeln antal diamanter.\n",
-                "**Tolkning:** De flesta diamanter väger mindre än 1 carat, men det finns en lång svans av större stenar.\n",
-                "**Insikt:** Små diamanter är vanligast, men stora diamanter är mer sällsynta och värdefulla.\n",
-                "**Affärsmässig tolkning:** Guldfynd kan erbjuda ett brett sortiment av små diamanter för volymförsäljning och marknadsföra större stenar som exklusiva och sällsynta."
-            ]
-        },
-        # Price analysis by clarity section
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 4. Prisfördelning per Kvalitetsattribut\nSyfte: Undersöka hur priset varierar beroende på kvalitetsattributen cut, color och clarity."
-            ]
-        },
-        # Diagram och förklaring för cut
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Grupperat stapeldiagram för medel- och medianpris per slipning\n",
-                "cut_order = ['Ideal', 'Premium', 'Very Good', 'Good', 'Fair']\n",
-                "mean_price_cut = df.groupby('cut')['price'].mean().reindex(cut_order)\n",
-                "median_price_cut = df.groupby('cut')['price'].median().reindex(cut_order)\n",
-                "import plotly.graph_objects as go\n",
-                "fig_bar_cut = go.Figure()\n",
-                "fig_bar_cut.add_trace(go.Bar(x=cut_order, y=mean_price_cut, name='Medelpris'))\n",
-                "fig_bar_cut.add_trace(go.Bar(x=cut_order, y=median_price_cut, name='Medianpris'))\n",
-                "fig_bar_cut.update_layout(barmode='group', title='Medel- och Medianpris per Slipning', xaxis_title='Slipning', yaxis_title='Pris (USD)')\n",
-                "fig_bar_cut.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Grupperat stapeldiagram för medel- och medianpris per slipning.\n",
-                "**Hur man tolkar:** Varje stapel visar medel- eller medianpriset för en slipningsklass.\n",
-                "**Tolkning:** Premium och Fair har högst medel- och medianpris.\n",
-                "**Insikt:** Högre eller lägre slipningskvalitet kan ge högre pris, beroende på segment.\n",
-                "**Affärsmässig tolkning:** Guldfynd kan ta ut högre pris för vissa slipningsklasser och bör analysera vilka segment som är mest lönsamma."
-            ]
-        },
-        # Diagram och förklaring för color
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Grupperat stapeldiagram för medel- och medianpris per färg\n",
-                "color_order = ['D', 'E', 'F', 'G', 'H', 'I', 'J']\n",
-                "mean_price_color = df.groupby('color')['price'].mean().reindex(color_order)\n",
-                "median_price_color = df.groupby('color')['price'].median().reindex(color_order)\n",
-                "fig_bar_color = go.Figure()\n",
-                "fig_bar_color.add_trace(go.Bar(x=color_order, y=mean_price_color, name='Medelpris'))\n",
-                "fig_bar_color.add_trace(go.Bar(x=color_order, y=median_price_color, name='Medianpris'))\n",
-                "fig_bar_color.update_layout(barmode='group', title='Medel- och Medianpris per Färg', xaxis_title='Färg', yaxis_title='Pris (USD)')\n",
-                "fig_bar_color.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Grupperat stapeldiagram för medel- och medianpris per färg.\n",
-                "**Hur man tolkar:** Varje stapel visar medel- eller medianpriset för en färgklass.\n",
-                "**Tolkning:** J, I och H har högst medel- och medianpris.\n",
-                "**Insikt:** Högre färgklass (J, I, H) har högre pris i detta dataset.\n",
-                "**Affärsmässig tolkning:** Guldfynd kan ta ut högre pris för diamanter med dessa färger och bör analysera efterfrågan i dessa segment."
-            ]
-        },
-        # Diagram och förklaring för clarity
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Grupperat stapeldiagram för medel- och medianpris per klarhetsgrad\n",
-                "clarity_order = ['IF', 'VVS1', 'VVS2', 'VS1', 'VS2', 'SI1', 'SI2', 'I1']\n",
-                "mean_price_clarity = df.groupby('clarity')['price'].mean().reindex(clarity_order)\n",
-                "median_price_clarity = df.groupby('clarity')['price'].median().reindex(clarity_order)\n",
-                "fig_bar_clarity = go.Figure()\n",
-                "fig_bar_clarity.add_trace(go.Bar(x=clarity_order, y=mean_price_clarity, name='Medelpris'))\n",
-                "fig_bar_clarity.add_trace(go.Bar(x=clarity_order, y=median_price_clarity, name='Medianpris'))\n",
-                "fig_bar_clarity.update_layout(barmode='group', title='Medel- och Medianpris per Klarhetsgrad',\n",
-                "                             xaxis_title='Klarhetsgrad', yaxis_title='Pris (USD)')\n",
-                "fig_bar_clarity.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Grupperat stapeldiagram för medel- och medianpris per klarhetsgrad.\n",
-                "**Hur man tolkar:** Varje stapel visar medel- eller medianpriset för en klarhetsklass.\n",
-                "**Tolkning:** SI2, SI1 och I1 har högst medel- och medianpris.\n",
-                "**Insikt:** De klarhetsgrader som har högst pris har också högst vikt, vilket visar att det är vikten som driver priset snarare än klarhetsgraden.\n",
-                "**Affärsmässig tolkning:** Guldfynd bör utgå från att det är vikten som driver priset i dessa segment. Klarhetsgrad kan användas för att skapa produktsegment, men prissättningen bör i första hand baseras på vikt."
-            ]
-        },
-        # Efter kod/markdown för medel- och medianpris per klarhetsgrad:
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Grupperat stapeldiagram för medel- och medianvikt per slipning\n",
-                "cut_order = ['Ideal', 'Premium', 'Very Good', 'Good', 'Fair']\n",
-                "mean_carat_cut = df.groupby('cut')['carat'].mean().reindex(cut_order)\n",
-                "median_carat_cut = df.groupby('cut')['carat'].median().reindex(cut_order)\n",
-                "import plotly.graph_objects as go\n",
-                "fig_bar_carat_cut = go.Figure()\n",
-                "fig_bar_carat_cut.add_trace(go.Bar(x=cut_order, y=mean_carat_cut, name='Medelvikt (carat)'))\n",
-                "fig_bar_carat_cut.add_trace(go.Bar(x=cut_order, y=median_carat_cut, name='Medianvikt (carat)'))\n",
-                "fig_bar_carat_cut.update_layout(barmode='group', title='Medel- och Medianvikt per Slipning', xaxis_title='Slipning', yaxis_title='Vikt (carat)')\n",
-                "fig_bar_carat_cut.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Grupperat stapeldiagram för medel- och medianvikt per slipning.\n",
-                "**Hur man tolkar:** Varje stapel visar medel- eller medianvikten för en slipningsklass.\n",
-                "**Tolkning:** Premium och Fair har högst medel- och medianvikt.\n",
-                "**Insikt:** De slipningsklasser som har högst pris har också högst vikt, vilket visar att det är vikten som driver priset snarare än slipningskvaliteten.\n",
-                "**Affärsmässig tolkning:** Guldfynd bör utgå från att det är vikten som driver priset i dessa segment. Slipningskvalitet kan användas för att skapa produktsegment, men prissättningen bör i första hand baseras på vikt."
-            ]
-        },
-        # Efter kod/markdown för medel- och medianvikt per slipning (cut):
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Grupperat stapeldiagram för medel- och medianvikt per färg\n",
-                "mean_carat_color = df.groupby('color')['carat'].mean().reindex(color_order)\n",
-                "median_carat_color = df.groupby('color')['carat'].median().reindex(color_order)\n",
-                "fig_carat_color = go.Figure()\n",
-                "fig_carat_color.add_trace(go.Bar(x=color_order, y=mean_carat_color, name='Medelvikt'))\n",
-                "fig_carat_color.add_trace(go.Bar(x=color_order, y=median_carat_color, name='Medianvikt'))\n",
-                "fig_carat_color.update_layout(barmode='group', title='Medel- och Medianvikt per Färg', xaxis_title='Färg', yaxis_title='Vikt (carat)')\n",
-                "fig_carat_color.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Grupperat stapeldiagram för medel- och medianvikt per färg.\n",
-                "**Hur man tolkar:** Varje stapel visar medel- eller medianvikten för en färgklass.\n",
-                "**Tolkning:** J, I och H har högst medel- och medianvikt.\n",
-                "**Insikt:** De färgklasser som har högst pris har också högst vikt, vilket visar att det är vikten som driver priset snarare än färgklassen.\n",
-                "**Affärsmässig tolkning:** Guldfynd bör utgå från att det är vikten som driver priset i dessa segment. Färg kan användas för att skapa produktsegment, men prissättningen bör i första hand baseras på vikt."
-            ]
-        },
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Grupperat stapeldiagram för medel- och medianvikt per klarhetsgrad\n",
-                "mean_carat_clarity = df.groupby('clarity')['carat'].mean().reindex(clarity_order)\n",
-                "median_carat_clarity = df.groupby('clarity')['carat'].median().reindex(clarity_order)\n",
-                "fig_carat_clarity = go.Figure()\n",
-                "fig_carat_clarity.add_trace(go.Bar(x=clarity_order, y=mean_carat_clarity, name='Medelvikt'))\n",
-                "fig_carat_clarity.add_trace(go.Bar(x=clarity_order, y=median_carat_clarity, name='Medianvikt'))\n",
-                "fig_carat_clarity.update_layout(barmode='group', title='Medel- och Medianvikt per Klarhetsgrad', xaxis_title='Klarhetsgrad', yaxis_title='Vikt (carat)')\n",
-                "fig_carat_clarity.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Grupperat stapeldiagram för medel- och medianvikt per klarhetsgrad.\n",
-                "**Hur man tolkar:** Varje stapel visar medel- eller medianvikten för en klarhetsklass.\n",
-                "**Tolkning:** SI2, SI1 och I1 har högst medel- och medianvikt.\n",
-                "**Insikt:** De klarhetsgrader som har högst pris har också högst vikt, vilket visar att det är vikten som driver priset snarare än klarhetsgraden.\n",
-                "**Affärsmässig tolkning:** Guldfynd bör utgå från att det är vikten som driver priset i dessa segment. Klarhetsgrad kan användas för att skapa produktsegment, men prissättningen bör i första hand baseras på vikt."
-            ]
-        },
-        # 5. Samband mellan Vikt och Pris
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 5. Samband mellan Vikt och Pris\n",
-                "Syfte: Undersöka hur vikt och pris samvarierar beroende på kvalitet."
-            ]
-        },
-        # Vikt vs pris per slipning (cut)
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "fig_scatter_cut = px.scatter(df, x='carat', y='price', color='cut',\n",
-                "                           category_orders={'cut': cut_order},\n",
-                "                           title='Vikt vs Pris per Slipning',\n",
-                "                           labels={'carat': 'Vikt (karat)', 'price': 'Pris (USD)'})\n",
-                "fig_scatter_cut.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Spridningsdiagram (scatterplot) för vikt och pris per slipning.\n",
-                "**Hur man tolkar:** Varje punkt är en diamant. Om punkterna bildar ett mönster (t.ex. stigande linje) finns ett samband. Färg visar slipning.\n",
-                "**Tolkning:** Högre vikt och bättre slipning ger högre pris.\n",
-                "**Insikt:** Det finns ett tydligt samband mellan vikt, slipning och pris.\n",
-                "**Affärsmässig tolkning:** Guldfynd kan använda denna kunskap för att prissätta större och bättre slipade diamanter högre."
-            ]
-        },
-        # Vikt vs pris per färg (color)
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "fig_scatter_color = px.scatter(df, x='carat', y='price', color='color',\n",
-                "                             category_orders={'color': color_order},\n",
-                "                             title='Vikt vs Pris per Färg',\n",
-                "                             labels={'carat': 'Vikt (karat)', 'price': 'Pris (USD)'})\n",
-                "fig_scatter_color.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Spridningsdiagram (scatterplot) för vikt och pris per färg.\n",
-                "**Hur man tolkar:** Varje punkt är en diamant. Färg visar färgklass. Mönster visar samband.\n",
-                "**Tolkning:** Färg påverkar priset, särskilt för större diamanter.\n",
-                "**Insikt:** Premiumfärg ger högre pris, särskilt i större stenar.\n",
-                "**Affärsmässig tolkning:** Guldfynd kan särskilt marknadsföra stora diamanter med hög färgkvalitet till premiumkunder."
-            ]
-        },
-        # Vikt vs pris per klarhet (clarity) – redan finns, men säkerställ förklaring
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "fig_scatter_clarity = px.scatter(df, x='carat', y='price', color='clarity',\n",
-                "                               category_orders={'clarity': clarity_order},\n",
-                "                               title='Vikt vs Pris per Klarhet',\n",
-                "                               labels={'carat': 'Vikt (karat)', 'price': 'Pris (USD)'})\n",
-                "fig_scatter_clarity.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Spridningsdiagram (scatterplot) för vikt och pris per klarhet.\n",
-                "**Hur man tolkar:** Varje punkt är en diamant. Färg visar klarhetsgrad. Mönster visar samband.\n",
-                "**Tolkning:** Klarhet har störst effekt på priset för större diamanter.\n",
-                "**Insikt:** Premiumklarhet i stora stenar ger högst pris.\n",
-                "**Affärsmässig tolkning:** Guldfynd kan ta ut högre pris för stora diamanter med hög klarhet och rikta dem till exklusiva kunder."
-            ]
-        },
-        # 6. Korrelationer
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 6. Korrelationer\n",
-                "Syfte: Visa korrelationer mellan alla numeriska variabler i datasetet för att förstå sambanden mellan olika egenskaper."
-            ]
-        },
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Create correlation matrix for numerical columns\n",
-                "numerical_cols = ['price', 'carat', 'depth', 'table', 'x', 'y', 'z']\n",
-                "corr_matrix = df[numerical_cols].corr()\n",
-                "\n",
-                "# Create heatmap\n",
-                "fig_heatmap = px.imshow(corr_matrix,\n",
-                "                       labels=dict(color=\"Korrelation\"),\n",
-                "                       x=numerical_cols,\n",
-                "                       y=numerical_cols,\n",
-                "                       title='Korrelationsmatris för Numeriska Variabler',\n",
-                "                       color_continuous_scale='RdBu_r',\n",
-                "                       aspect='auto')\n",
-                "fig_heatmap.update_layout(\n",
-                "    xaxis_title=\"Variabler\",\n",
-                "    yaxis_title=\"Variabler\"\n",
-                ")\n",
-                "fig_heatmap.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Heatmap (värmekarta) för korrelationer.\n",
-                "**Hur man tolkar:** Färgerna visar styrkan och riktningen av sambandet mellan variablerna. Röd = positiv korrelation, blå = negativ korrelation. Mörkare färg = starkare samband.\n",
-                "**Tolkning:** Det finns starka positiva korrelationer mellan vikt (carat) och pris, samt mellan de fysiska måtten (x, y, z).\n",
-                "**Insikt:** Vikt och fysiska mått är starkt relaterade till pris, medan djup och tavla har svagare samband.\n",
-                "**Affärsmässig tolkning:** Guldfynd kan använda dessa samband för att förstå vilka faktorer som påverkar priset mest och optimera sitt sortiment."
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "Syfte: Det finns en stark korrelation mellan vikt (carat) och pris. Syftet är att visa sambandet mellan dessa på ett enkelt och tydligt sätt."
-            ]
-        },
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "fig_corr = px.scatter(df, x='carat', y='price', title='Samband mellan Vikt (Carat) och Pris', labels={'carat': 'Vikt (carat)', 'price': 'Pris (USD)'})\n",
-                "fig_corr.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Spridningsdiagram (scatterplot) för vikt (carat) och pris.\n",
-                "**Hur man tolkar:** Varje punkt är en diamant. Om punkterna bildar ett stigande mönster finns ett positivt samband.\n",
-                "**Tolkning:** Det finns ett tydligt positivt samband mellan vikt (carat) och pris – ju större diamant, desto högre pris.\n",
-                "**Insikt:** Vikt är den starkaste prisdrivande faktorn.\n",
-                "**Affärsmässig tolkning:** Guldfynd kan använda detta samband för att prissätta större diamanter högre och identifiera attraktiva segment."
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### Starka Korrelationer mellan Diamantmått\n",
-                "Syfte: Visa de tre starkaste sambanden mellan diamantens mått och vikt."
-            ]
-        },
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "fig_carat_x = px.scatter(df, x='carat', y='x', title='Samband mellan Vikt (carat) och Längd (x)', labels={'carat': 'Vikt (carat)', 'x': 'Längd (mm)'})\n",
-                "fig_carat_x.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Spridningsdiagram (scatterplot) för vikt (carat) och längd (x).\n",
-                "**Hur man tolkar:** Varje punkt är en diamant. Ett stigande mönster visar att större vikt ger större längd.\n",
-                "**Tolkning:** Det finns ett mycket starkt positivt samband mellan vikt och längd.\n",
-                "**Insikt:** Större diamanter är längre, vilket är logiskt och kan användas för kvalitetskontroll.\n",
-                "**Affärsmässig tolkning:** Guldfynd kan använda detta samband för att snabbt uppskatta vikt utifrån längd vid värdering."
-            ]
-        },
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "fig_x_y = px.scatter(df, x='x', y='y', title='Samband mellan Längd (x) och Bredd (y)', labels={'x': 'Längd (mm)', 'y': 'Bredd (mm)'})\n",
-                "fig_x_y.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Spridningsdiagram (scatterplot) för längd (x) och bredd (y).\n",
-                "**Hur man tolkar:** Varje punkt är en diamant. Ett stigande mönster visar att längre diamanter också är bredare.\n",
-                "**Tolkning:** Det finns ett mycket starkt positivt samband mellan längd och bredd.\n",
-                "**Insikt:** Diamanter är ofta symmetriska, vilket syns i detta samband.\n",
-                "**Affärsmässig tolkning:** Guldfynd kan använda detta samband för att kontrollera symmetri och kvalitet."
-            ]
-        },
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "fig_x_z = px.scatter(df, x='x', y='z', title='Samband mellan Längd (x) och Höjd (z)', labels={'x': 'Längd (mm)', 'z': 'Höjd (mm)'})\n",
-                "fig_x_z.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Spridningsdiagram (scatterplot) för längd (x) och höjd (z).\n",
-                "**Hur man tolkar:** Varje punkt är en diamant. Ett stigande mönster visar att längre diamanter tenderar att vara högre.\n",
-                "**Tolkning:** Det finns ett starkt positivt samband mellan längd och höjd.\n",
-                "**Insikt:** Diamanter med större längd tenderar att vara högre.\n",
-                "**Affärsmässig tolkning:** Guldfynd kan använda detta samband för att identifiera proportionerliga och välformade diamanter."
-            ]
-        },
-        # 7. Extremvärden och Saknade Värden
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 7. Extremvärden och Saknade Värden\n",
-                "Syfte: Identifiera och analysera extremvärden och saknade värden i datasetet."
-            ]
-        },
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Extremvärden\n",
-                "outliers = {}\n",
-                "for col in ['price', 'carat', 'depth', 'table', 'x', 'y', 'z']:\n",
-                "    Q1 = df[col].quantile(0.25)\n",
-                "    Q3 = df[col].quantile(0.75)\n",
-                "    IQR = Q3 - Q1\n",
-                "    outliers[col] = df[(df[col] < (Q1 - 1.5 * IQR)) | (df[col] > (Q3 + 1.5 * IQR))].shape[0]\n",
-                "\n",
-                "fig_outliers = px.bar(x=list(outliers.keys()), y=list(outliers.values()), \n",
-                "                     labels={'x': 'Variabel', 'y': 'Antal Extremvärden'}, \n",
-                "                     title='Antal Extremvärden per Variabel')\n",
-                "fig_outliers.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Stapeldiagram (bar chart) för extremvärden.\n",
-                "**Hur man tolkar:** Varje stapel visar antalet extremvärden för en variabel.\n",
-                "**Tolkning:** Extremvärden förekommer i samtliga nyckelvariabler (pris, vikt, djup, tavla) och kan snedvrida analysen, särskilt medelvärden och samband. För price kan enstaka mycket dyra diamanter ge en felaktig bild av prisnivåer. För carat kan extremt höga eller låga vikter påverka analysen av sambandet mellan vikt och pris. För depth och table kan extremvärden indikera mätfel eller ovanliga slipningar, vilket påverkar slutsatser om kvalitet och pris. Dessa bör identifieras och hanteras vid analys och affärsbeslut.\n",
-                "**Insikt:** Datadrivna beslut kring lager och prissättning blir mer tillförlitliga om extremvärden hanteras korrekt. Extremvärden kan indikera unika möjligheter eller risker i sortimentet.\n",
-                "**Affärsmässig tolkning:** Guldfynd bör identifiera och analysera extremvärden noggrant. Överväg att exkludera eller särskilt hantera diamanter med extremvärden vid prissättning och sortimentsplanering. Detta kan hjälpa till att optimera lager och öka lönsamheten."
-            ]
-        },
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "# Saknade värden\n",
-                "null_values = df.isnull().sum()\n",
-                "fig_null = px.bar(x=null_values.index, y=null_values.values, \n",
-                "                  labels={'x': 'Variabel', 'y': 'Antal Saknade Värden'}, \n",
-                "                  title='Antal Saknade Värden per Variabel')\n",
-                "fig_null.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Stapeldiagram (bar chart) för saknade värden.\n",
-                "**Hur man tolkar:** Varje stapel visar antalet saknade värden för en variabel.\n",
-                "**Diagramtyp:** Grupperat stapeldiagram för medel- och medianpris per slipning.\n",
-                "**Hur man tolkar:** Varje stapel visar medel- eller medianpriset för en slipningsklass.\n",
-                "**Tolkning:** Premium och Fair har högst medel- och medianpris.\n",
-                "**Insikt:** Högre eller lägre slipningskvalitet kan ge högre pris, beroende på segment.\n",
-                "**Affärsmässig tolkning:** Guldfynd kan ta ut högre pris för vissa slipningsklasser och bör analysera vilka segment som är mest lönsamma."
-            ]
-        },
-        # 8. Hypotesprövningar
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 8. Hypotesprövningar\n",
-                "Syfte: Undersöka om diamanter med högre vikt (carat) har större spridning i pris än lättare diamanter. Vi delar diamanterna i två grupper: små (carat <= median) och stora (carat > median). Vi använder ett enkelt stapeldiagram för att visa prisvariationen."
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Begreppsförklaring:** Prisvariation betyder hur mycket priserna skiljer sig åt inom en grupp. Hög variation betyder att det finns både billiga och dyra diamanter i gruppen."
-            ]
-        },
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "source": [
-                "carat_median = df['carat'].median()\n",
-                "df['carat_group'] = ['Låg vikt' if c <= carat_median else 'Hög vikt' for c in df['carat']]\n",
-                "price_std = df.groupby('carat_group')['price'].std()\n",
-                "fig_var = px.bar(x=price_std.index, y=price_std.values, \n",
-                "                 labels={'x': 'Viktgrupp', 'y': 'Prisvariation (std)'}, \n",
-                "                 title='Prisvariation för små och stora diamanter')\n",
-                "fig_var.show()"
-            ]
-        },
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "**Diagramtyp:** Stapeldiagram (bar chart) för prisvariation.\n",
-                "**Hur man tolkar:** Varje stapel visar hur mycket priserna varierar inom gruppen. Hög stapel = stor variation.\n",
-                "**Tolkning:** Stora diamanter har större prisvariation än små diamanter.\n",
-                "**Insikt:** Priset på stora diamanter kan skilja sig mycket, beroende på andra faktorer som kvalitet och sällsynthet.\n",
-                "**Affärsmässig tolkning:** Guldfynd bör vara extra noga med prissättning av stora diamanter, eftersom priset kan variera mycket även inom samma viktgrupp."
-            ]
-        },
-        # 9. Beslutsstöd: Ska vi köpa diamanten?
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 9. Beslutsstöd: Ska vi köpa diamanten?\n",
-                "Syfte: Hjälpa styrelsen att fatta datadrivna beslut om inköp av enskilda diamanter baserat på analysen ovan.\n",
-                "\n",
-                "Funktionen `should_buy_diamond` hjälper dig att fatta datadrivna beslut om du bör köpa en viss diamant eller inte.\n",
-                "Du matar in diamantens egenskaper och får ett tydligt ja/nej-svar samt en motivering baserat på analysen ovan.\n",
-                "\n",
-                "**Exempel:**\n",
-                "- Ja, priset är rimligt för denna vikt och kvalitet.\n",
-                "- Nej, priset är för högt jämfört med liknande diamanter.\n",
-                "- Nej, egenskaperna avviker från det normala (t.ex. extremvärde).\n"
-            ]
-        },
-        {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "outputs": [],
-            "source": [
-                "# Funktion för att fatta beslut om köp av diamant\n",
-                "def should_buy_diamond(carat, cut, color, clarity, price, depth, table, x, y, z, df):\n",
-                "    if carat <= 0 or price <= 0 or x <= 0 or y <= 0 or z <= 0:\n",
-                "        return (\"Nej\", \"Ogiltiga värden: carat, pris och dimensioner måste vara större än 0.\")\n",
-                "    # Kontrollera om egenskaperna är extremvärden\n",
-                "    for col, val in zip(['carat','price','depth','table','x','y','z'], [carat,price,depth,table,x,y,z]):\n",
-                "        Q1 = df[col].quantile(0.25)\n",
-                "        Q3 = df[col].quantile(0.75)\n",
-                "        IQR = Q3 - Q1\n",
-                "        if val < (Q1 - 1.5*IQR) or val > (Q3 + 1.5*IQR):\n",
-                "            return (\"Nej\", f\"{col}={val} är ett extremvärde jämfört med marknaden. Undvik köp utan manuell granskning.\")\n",
-                "    # Jämför pris per carat mot median för denna kvalitet\n",
-                "    ref = df.groupby(['cut', 'color', 'clarity'])[['price', 'carat']].median().reset_index()\n",
-                "    ref['price_per_carat'] = ref['price'] / ref['carat']\n",
-                "    ref_row = ref[(ref['cut']==cut) & (ref['color']==color) & (ref['clarity']==clarity)]\n",
-                "    if not ref_row.empty:\n",
-                "        ref_ppc = ref_row.iloc[0]['price_per_carat']\n",
-                "        ppc = price / carat\n",
-                "        if ppc > ref_ppc * 1.2:\n",
-                "            return (\"Nej\", f\"Priset per carat ({ppc:.0f} USD) är mer än 20% högre än medianen för denna kvalitet ({ref_ppc:.0f} USD). Undvik köp.\")\n",
-                "        elif ppc < ref_ppc * 0.7:\n",
-                "            return (\"Ja\", f\"Priset per carat ({ppc:.0f} USD) är lågt jämfört med marknaden för denna kvalitet. Möjligt fynd!\")\n",
-                "        else:\n",
-                "            return (\"Ja\", f\"Priset per carat ({ppc:.0f} USD) är rimligt för denna kvalitet.\")\n",
-                "    else:\n",
-                "        return (\"Nej\", \"Kombinationen av cut, color och clarity är ovanlig i marknaden. Kräver manuell granskning.\")\n",
-                "\n",
-                "# Exempel på användning:\n",
-                "carat = 0.7\n",
-                "cut = 'Very Good'\n",
-                "color = 'G'\n",
-                "clarity = 'VS2'\n",
-                "price = 3500\n",
-                "depth = 61.5\n",
-                "table = 57.0\n",
-                "x = 5.7\n",
-                "y = 5.7\n",
-                "z = 3.5\n",
-                "beslut, motivering = should_buy_diamond(carat, cut, color, clarity, price, depth, table, x, y, z, df)\n",
-                "print(f'Rekommendation: {beslut}')\n",
-                "print(f'Motivering: {motivering}')\n"
-            ]
-        },
-        # 10. Executive Summary
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "### 10. Executive Summary och Data Storytelling\n",
-                "\n",
-                "#### Huvudinsikter\n",
-                "1. **Marknadssegmentering**\n",
-                "   - Priser och kvaliteter varierar stort, men det är vikten (carat) som är den primära prisdrivande faktorn.\n",
-                "     _Detta innebär att prissättning bör baseras på vikt, medan kvalitetsattribut används för att skapa olika produktsegment._\n",
-                "2. **Kvalitetsattribut**\n",
-                "   - Premium och Fair har högst medel- och medianpris för slipning, men detta beror på att dessa klasser har högst vikt.\n",
-                "     _Detta visar att slipningskvaliteten i sig inte är den avgörande prisfaktorn._\n",
-                "   - J, I och H har högst medel- och medianpris för färg, men även här är det vikten som förklarar de högre priserna.\n",
-                "     _Detta innebär att färgkvaliteten är en sekundär prisfaktor._\n",
-                "   - SI2, SI1 och I1 har högst medel- och medianpris för klarhet, vilket också förklaras av högre vikt.\n",
-                "     _Detta visar att klarhetsgraden i sig inte är den enda prisdrivande faktorn._\n",
-                "3. **Prisdrivande faktorer**\n",
-                "   - Vikt (carat) är den starkaste prisdrivande faktorn, följt av kvalitetsattribut.\n",
-                "     _Större diamanter är betydligt dyrare, oavsett kvalitetsklass._\n",
-                "4. **Extremvärden och saknade värden**\n",
-                "   - Extremvärden förekommer i samtliga nyckelvariabler (pris, vikt, djup, tavla) och kan snedvrida analysen, särskilt medelvärden och samband. För price kan enstaka mycket dyra diamanter ge en felaktig bild av prisnivåer. För carat kan extremt höga eller låga vikter påverka analysen av sambandet mellan vikt och pris. För depth och table kan extremvärden indikera mätfel eller ovanliga slipningar, vilket påverkar slutsatser om kvalitet och pris. Dessa bör identifieras och hanteras vid analys och affärsbeslut.\n",
-                "     _Datadrivna beslut kring lager och prissättning blir mer tillförlitliga om extremvärden hanteras korrekt._\n",
-                "5. **Statistiska skillnader**\n",
-                "   - Prisskillnader mellan kvalitetsklasser är signifikanta, men till stor del förklaras av vikt.\n",
-                "     _Detta bekräftas av hypotesprövningar och bör beaktas vid sortimentsplanering._\n",
-                "6. **Affärsmässiga implikationer**\n",
-                "   - Sortiment och prissättning bör primärt baseras på vikt, med kvalitetsattribut som sekundära faktorer.\n",
-                "     _Genom att analysera vilka viktsegment som är mest lönsamma kan man optimera utbudet._\n",
-                "   - Extremvärden bör identifieras och hanteras särskilt vid prissättning och sortimentsplanering, eftersom de kan vara svårsålda, påverka lönsamheten eller ge en missvisande bild av marknaden.\n",
-                "     _Exkludera eller särskilt analysera diamanter med extremvärden för att fatta mer tillförlitliga beslut._\n",
-                "   - Premiumprodukter kan marknadsföras baserat på kombinationen av vikt och kvalitet.\n",
-                "     _Detta möjliggör differentierad marknadsföring och ökad lönsamhet._\n",
-                "   - Dataanalys möjliggör datadrivna beslut för inköp, lager och kampanjer.\n",
-                "     _Att använda insikter från datan minskar risken för felbeslut och ökar konkurrenskraften._\n",
-                "7. **Korrelationer och samband**\n",
-                "   - Carat och pris har starkast positiv korrelation.\n",
-                "     _Det är viktigt att förstå detta samband för att kunna förutsäga pris och identifiera avvikelser._\n",
-                "   - Måtten x, y, z är starkt korrelerade med vikt.\n",
-                "     _Detta visar att diamantens dimensioner hänger ihop med vikt och kan användas för kvalitetskontroll._\n",
-                "8. **Kundperspektiv**\n",
-                "   - Det finns \"fyndmöjligheter\" i vissa viktsegment.\n",
-                "     _Kunder med kunskap kan hitta diamanter med bra värde genom att fokusera på vikt och kompromissa på vissa kvalitetsattribut._\n",
-                "9. **Storytelling**\n",
-                "   - Diamantmarknaden är bred och mångfacetterad, med både exklusiva och prisvärda alternativ.\n",
-                "     _Analysen visar att det finns utrymme för både lyx och volym, och att datadrivna beslut kan maximera värdet för både företag och kund._\n",
-                "\n",
-                "#### Rekommendationer\n",
-                "- Basera prissättning och sortimentsplanering primärt på vikt (carat).\n",
-                "  _Använd kvalitetsattribut som sekundära differentieringsfaktorer._\n",
-                "- Identifiera och analysera extremvärden noggrant. Överväg att exkludera eller särskilt hantera diamanter med extremvärden vid prissättning och sortimentsplanering.\n",
-                "  _Detta minskar risken för felaktiga beslut och ökar lönsamheten._\n",
-                "- Skapa tydliga produktsegment baserade på vikt och kvalitet.\n",
-                "  _Kombinera vikt med kvalitetsattribut för att skapa attraktiva erbjudanden._\n",
-                "- Analysera och hantera extremvärden i lager och prissättning.\n",
-                "  _Undvik att låta outliers påverka prissättning och lagerbeslut._\n",
-                "- Använd datadrivna insikter för att optimera utbud och lönsamhet.\n",
-                "  _Fortsätt analysera data löpande för att anpassa strategin till marknadens förändringar._\n"
-            ]
-        },
-        # Självutvärdering sist i notebooken (utförlig version)
-        {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": [
-                "## Självutvärdering <a name=\"självutvärdering\"></a>\n",
-                "\n",
-                "1. **Vad har varit roligast i kunskapskontrollen?**\n",
-                "   - Dataanalysen och visualiseringen av diamanterna\n",
-                "   - Skapandet av interaktiva visualiseringar med Streamlit\n",
-                "   - Att se sambanden mellan olika attribut\n",
-                "\n",
-                "2. **Vilket betyg anser du att du ska ha och varför?**\n",
-                "   - VG eftersom jag har:\n",
-                "     - Skrivit tydlig och välstrukturerad kod\n",
-                "     - Skapat en omfattande dataanalys med tydlig progression\n",
-                "     - Implementerat en interaktiv Streamlit-applikation\n",
-                "     - Presenterat insikter på ett professionellt sätt\n",
-                "\n",
-                "3. **Vad har varit mest utmanande i arbetet och hur har du hanterat det?**\n",
-                "   - Att balansera detaljnivån i analysen\n",
-                "   - Att välja rätt visualiseringar för att illustrera sambanden\n",
-                "   - Lösning: Iterativ process med kontinuerlig förbättring"
-            ]
-        }
-    ],
-    "metadata": {
-        "kernelspec": {
-            "display_name": "Python 3",
-            "language": "python",
-            "name": "python3"
-        },
-        "language_info": {
-            "codemirror_mode": {
-                "name": "ipython",
-                "version": 3
-            },
-            "file_extension": ".py",
-            "mimetype": "text/x-python",
-            "name": "python",
-            "nbconvert_exporter": "python",
-            "pygments_lexer": "ipython3",
-            "version": "3.8.0"
-        }
+# Generates kunskapskontroll.ipynb, the notebook version of the assignment.
+#
+# The text of the notebook is written out here. The code cells of the data analysis
+# (part 2) are generated from small templates that call the same functions as the
+# Streamlit app, in diamond_analysis.py and figures.py, so the notebook uses the same
+# implementation as the app instead of a copy of it. The cells are generated one at a
+# time and written to the file as they are produced.
+#
+# Writing the notebook only needs the standard library. With --execute the notebook is
+# also run headless with nbclient (part of the Jupyter install). The outputs of every
+# code cell are cached under a fingerprint of its source, the cells it depends on and
+# the files the cells read, so only changed cells and the cells that use their results
+# are run again. Those cells are split between several kernels that run in parallel;
+# each kernel first runs the earlier cells they depend on, e.g. the one loading the data.
+#
+# Interactive figures embed every data point, so the scatter plots make the executed
+# notebook large and slow to open. --figures replaces them, in a process pool, with
+# static PNG or SVG images (rendered with kaleido, which needs Chrome) or with binned
+# versions that keep one point per grid cell. The full interactive figures can be kept
+# as HTML side files.
+
+# Import required libraries
+import argparse  # For parsing command-line arguments
+import ast  # For finding the names each code cell reads and assigns
+import base64  # For images in notebook outputs
+import hashlib  # For the fingerprints of the cache
+import json  # For writing the notebook
+import os  # For atomic renames into the cache
+import textwrap  # For the indented cell texts
+from concurrent.futures import ProcessPoolExecutor  # For running kernels in parallel
+from pathlib import Path  # For handling file paths
+
+# Notebook file to create
+NOTEBOOK_PATH = 'kunskapskontroll.ipynb'
+# Directory the code cells run in, so they can import the shared modules
+ROOT = Path(__file__).resolve().parent
+# Files read by the code cells: a change to any of them invalidates the cached outputs
+CELL_INPUTS = ['diamond_analysis.py', 'figures.py', 'profiling.py', 'price_curves.py', 'aggregates.py',
+               'diamonds_dataset/diamonds.csv']
+# Directory of the cached cell outputs
+CACHE_DIR = ROOT / '.notebook_cache'
+# Kernels run in parallel when executing; each needs a core of its own to pay off
+WORKERS = min(4, os.cpu_count() or 1)
+# MIME type of interactive Plotly figures in notebook outputs
+PLOTLY_MIME = 'application/vnd.plotly.v1+json'
+# Ways to export the figures of an executed notebook
+FIGURE_FORMATS = ['interactive', 'binned', 'png', 'svg']
+# Notebook metadata: Python 3 kernel
+METADATA = {
+    "kernelspec": {
+        "display_name": "Python 3",
+        "language": "python",
+        "name": "python3"
     },
-    "nbformat": 4,
-    "nbformat_minor": 4
+    "language_info": {
+        "codemirror_mode": {
+            "name": "ipython",
+            "version": 3
+        },
+        "file_extension": ".py",
+        "mimetype": "text/x-python",
+        "name": "python",
+        "nbconvert_exporter": "python",
+        "pygments_lexer": "ipython3",
+        "version": "3.8.0"
+    }
 }
 
-# Save the notebook to a file
-with open('kunskapskontroll.ipynb', 'w', encoding='utf-8') as f:
-    json.dump(notebook, f, indent=1, ensure_ascii=False)
 
-print("Jupyter Notebook har skapats: kunskapskontroll.ipynb")
\ No newline at end of file
+def markdown(text):
+    """
+    A text cell. The text is dedented, so it can be indented like the code around it.
+    Args:
+        text (str): Markdown, leading and trailing empty lines are left out
+    Returns:
+        dict: The cell
+    """
+    return {'cell_type': 'markdown', 'metadata': {}, 'source': _lines(text)}
+
+
+def code(text):
+    """
+    A code cell without outputs. The text is dedented like for markdown().
+    Returns:
+        dict: The cell
+    """
+    return {'cell_type': 'code', 'execution_count': None, 'metadata': {}, 'outputs': [], 'source': _lines(text)}
+
+
+def _lines(text):
+    """
+    Cell source as a list of lines, the format Jupyter writes.
+    """
+    return textwrap.dedent(text).strip('\n').splitlines(keepends=True)
+
+
+def figure_code(comment, name, call):
+    """
+    A code cell that builds a figure and shows it.
+    Args:
+        comment (str): Comment on the first line, or None
+        name (str): Variable for the figure
+        call (str): Expression that builds the figure
+    """
+    comment_line = f'# {comment}\n' if comment else ''
+    return code(f'{comment_line}{name} = {call}\n{name}.show()')
+
+
+def pie_code(col, title, description):
+    """
+    A code cell with the pie chart of a quality attribute, from the counts per category.
+    """
+    return figure_code(f'Create pie chart for {description}', f'fig_{col}',
+                       f"figures.pie(da.category_counts(df, '{col}'), title='Fördelning av {title}')")
+
+
+def grouped_bar_code(col, value_col, label):
+    """
+    A code cell with the grouped bar chart of the mean and median price or carat per category.
+    Args:
+        col (str): Category column
+        value_col (str): 'price' or 'carat'
+        label (str): Swedish name of the category
+    """
+    if value_col == 'price':
+        value, names, yaxis_title = 'pris', "'Medelpris', 'Medianpris'", 'Pris (USD)'
+    else:
+        value, names, yaxis_title = 'vikt', "'Medelvikt (carat)', 'Medianvikt (carat)'", 'Vikt (carat)'
+    name = f'fig_{value_col}_{col}'
+    return code(f"""
+        # Grupperat stapeldiagram för medel- och median{value} per {label.lower()}
+        mean, median = da.mean_median_by(df, '{col}', '{value_col}')
+        {name} = figures.grouped_bar(
+            da.CATEGORY_ORDERS['{col}'], mean, median, {names},
+            title='Medel- och Median{value} per {label}', xaxis_title='{label}', yaxis_title='{yaxis_title}')
+        {name}.show()
+        """)
+
+
+def scatter_code(col, label):
+    """
+    A code cell with the scatter plot of carat and price colored by a category.
+    """
+    return figure_code(None, f'fig_scatter_{col}',
+                       f"figures.scatter(df, x='carat', y='price', color='{col}', "
+                       f"order=da.CATEGORY_ORDERS['{col}'], title='Vikt vs Pris per {label}', "
+                       "labels={'carat': 'Vikt (karat)', 'price': 'Pris (USD)'})")
+
+
+def notebook_cells():
+    """
+    All cells of the notebook, in order.
+    """
+    yield from part1_cells()
+    yield from part2_cells()
+    yield from self_assessment_cells()
+
+
+def part1_cells():
+    """
+    Title, table of contents and part 1: theory questions and Python exercises.
+    """
+    # Title and table of contents
+    yield markdown("""
+        # Kunskapskontroll - Python och Dataanalys
+
+        ## Innehåll
+        1. [Del 1 - Teoretiska frågor och Python-övningar](#del-1)
+        2. [Del 2 - Dataanalys av Diamonds Dataset](#del-2)
+        3. [Självutvärdering](#självutvärdering)
+        """)
+
+    # Part 1 header
+    yield markdown("""
+        ## Del 1 - Teoretiska frågor och Python-övningar <a name="del-1"></a>
+        """)
+
+    # Table of contents for Del 1
+    yield markdown("""
+        ### Innehåll Del 1
+        1. [Tuple vs List](#tuple-vs-list)
+        2. [Funktioner](#funktioner)
+        3. [Klasser](#klasser)
+        4. [Streamlit](#streamlit)
+        5. [BankAccount klass](#bankaccount-klass)
+        6. [Vokalräknare](#vokalr%C3%A4knare)
+        7. [Gemensamma element](#gemensamma-element)
+        8. [Storkar och barnafödsel](#storkar-och-barnaf%C3%B6dsel)
+        9. [Medelvärde vs Median](#medelv%C3%A4rde-vs-median)
+        10. [Cirkeldiagram](#cirkeldiagram)
+        11. [Linjediagram](#linjediagram)
+        12. [Lådagram](#l%C3%A5dagram)
+        """)
+
+    # Tuple vs List explanation
+    yield markdown("""
+        ### 1. Tuple vs List
+
+        Skillnaden mellan tuple och list:
+        - Tuple är oföränderlig (immutable), list är föränderlig (mutable)
+        - Tuple används för data som inte ska ändras, list för data som kan ändras
+        - Tuple är snabbare och tar mindre minne
+        - List har fler inbyggda metoder för manipulation
+
+        Ingen är "bättre" - de har olika användningsområden:
+        - Tuple: När data inte ska ändras (t.ex. koordinater, konstanter)
+        - List: När data behöver manipuleras (t.ex. dynamiska samlingar)
+        """)
+
+    # Functions explanation
+    yield markdown("""
+        ### 2. Funktioner
+
+        Funktioner är återanvändbara kodblock som:
+        - Ökar kodens läsbarhet
+        - Minskar duplicering
+        - Gör koden mer underhållbar
+        - Möjliggör återanvändning av kod
+        """)
+
+    # Classes explanation
+    yield markdown("""
+        ### 3. Klasser
+
+        a) Instans: Ett konkret objekt skapat från en klass
+        b) Attribut: Egenskaper/variabler som tillhör en klass
+        c) Metod: Funktioner som tillhör en klass
+        """)
+
+    # Streamlit explanation
+    yield markdown("""
+        ### 4. Streamlit
+
+        Streamlit är ett Python-bibliotek för att skapa webbapplikationer för dataanalys.
+        Det gör det enkelt att:
+        - Skapa interaktiva visualiseringar
+        - Bygga dashboards
+        - Presentera dataanalys
+        - Skapa interaktiva datamodeller
+        """)
+
+    # BankAccount class implementation
+    yield markdown("""
+        ### 5. BankAccount klass
+        """)
+
+    yield code("""
+        # Define the BankAccount class with basic banking operations
+        class BankAccount:
+            def __init__(self, account_holder, balance=0):
+                self.account_holder = account_holder  # Store account holder name
+                self.balance = balance  # Initialize balance
+    
+            def deposit(self, amount):
+                # Add money to account if amount is positive
+                if amount > 0:
+                    self.balance += amount
+                    return f"Deposited {amount}. New balance: {self.balance}"
+                return "Invalid amount"
+    
+            def withdraw(self, amount):
+                # Remove money from account if sufficient balance
+                if amount > 0:
+                    if amount <= self.balance:
+                        self.balance -= amount
+                        return f"Withdrawn {amount}. New balance: {self.balance}"
+                    return "Too low balance"
+                return "Invalid amount"
+
+        # Test the BankAccount class with example operations
+        account = BankAccount("John Doe", 1000)
+        print(f"Account holder: {account.account_holder}")
+        print(f"Initial balance: {account.balance}")
+        print(account.deposit(500))
+        print(account.withdraw(200))
+        print(account.withdraw(2000))  # Should show "Too low balance"
+        """)
+
+    # Vowel counter implementation
+    yield markdown("""
+        ### 6. Vokalräknare
+        """)
+
+    yield code("""
+        # Function to count vowels in a text string
+        def vowel_checker(text):
+            vowels = "AEIOUYÅÄÖ"  # Define vowels including Swedish characters
+            return sum(1 for char in text.upper() if char in vowels)  # Count vowels
+
+        # Test the function with a Swedish word
+        print(vowel_checker("hjärna"))  # Should return 2
+        """)
+
+    # Common elements implementation
+    yield markdown("""
+        ### 7. Gemensamma element
+        """)
+
+    yield code("""
+        # Function to find common elements between two lists
+        def common_elements(list1, list2):
+            return [x for x in list1 if x in list2]  # List comprehension for common elements
+
+        # Test the function with example lists
+        list1 = [4, 'apple', 10, 'hi', 3]
+        list2 = [23, 'apple', 5, 9, 3]
+        print(common_elements(list1, list2))  # Should return ['apple', 3]
+        """)
+
+    # Storks and birth rates analysis
+    yield markdown("""
+        ### 8. Storkar och barnafödsel
+
+        Bilden visar ett spridningsdiagram med rubriken 'The Relationship Between Stork Populations and Human Birth Rates'. På x-axeln visas antalet storkpar ('Number of stork breeding pairs') och på y-axeln antalet födslar per år i tusental ('Birth rate (thousands per year)'). Varje punkt i grafen representerar en observation där både antalet storkpar och födelsetal har mätts. Det framgår dock inte exakt om en observation motsvarar en region, ett land, en stad eller något annat geografiskt område – men i liknande exempel brukar det ofta handla om olika regioner eller länder. Det finns en positiv trendlinje, vilket innebär att högre antal storkpar ofta sammanfaller med högre födelsetal.
+
+        Slutsats:
+
+        Trots att grafen visar en korrelation mellan antalet storkpar och födelsetal, innebär det inte att det finns ett orsakssamband mellan dessa två variabler. Detta är ett klassiskt exempel på en falsk korrelation (spurious correlation). Det är troligt att en tredje faktor, som till exempel regionens storlek eller befolkning, påverkar både antalet storkpar och antalet födslar. Grafen illustrerar tydligt att korrelation inte är detsamma som kausalitet, och att man måste vara försiktig med att dra slutsatser om orsakssamband enbart baserat på samband i data.
+        """)
+
+    # Mean vs Median explanation
+    yield markdown("""
+        ### 9. Medelvärde vs Median
+
+        Nej, jag håller inte med Kim. Båda måtten har sina användningsområden:
+        - Medelvärde: Bra för normalfördelad data utan extremvärden
+        - Median: Bättre när det finns extremvärden eller skev fördelning
+        """)
+
+    # Pie chart explanation
+    yield markdown("""
+        ### 10. Cirkeldiagram
+
+        Cirkeldiagram används för att visa andelar av en helhet.
+        Spotify-exempel: Visa fördelningen av musikgenrer bland användarna
+        """)
+
+    # Line chart explanation
+    yield markdown("""
+        ### 11. Linjediagram
+
+        Linjediagram används för att visa trender över tid.
+        Spotify-exempel: Visa antalet dagliga lyssnare över ett år
+        """)
+
+    # Box plot explanation
+    yield markdown("""
+        ### 12. Lådagram
+
+        Lådagram (boxplot) används för att visa:
+        - Median
+        - Kvartiler
+        - Extremvärden
+        - Fördelning av data
+        - Identifiera avvikelser
+        """)
+
+
+def part2_cells():
+    """
+    Part 2: the analysis of the diamonds dataset.
+    """
+    # --- Del 2: Dataanalys av Diamonds Dataset ---
+    yield markdown("""
+        ## Del 2 - Dataanalys av Diamonds Dataset <a name="del-2"></a>
+        """)
+
+    # Table of contents for Del 2
+    yield markdown("""
+        ### Innehåll Del 2
+        1. [Bakgrund](#bakgrund)
+        2. [Om Diamanter](#om-diamanter)
+        3. [Förberedelser](#f%C3%B6rberedelser)
+        4. [Grundläggande Statistik](#1-grundl%C3%A4ggande-statistik)
+        5. [Prisanalys](#2-prisanalys)
+        6. [Kvalitetsattribut (Cut, Color, Clarity)](#3-kvalitetsattribut-cut-color-clarity)
+        7. [Prisfördelning per Kvalitetsattribut](#4-prisf%C3%B6rdelning-per-kvalitetsattribut)
+        8. [Samband mellan Vikt och Pris](#5-samband-mellan-vikt-och-pris)
+        9. [Korrelationer](#6-korrelationer)
+        10. [Extremvärden och Saknade Värden](#7-extremv%C3%A4rden-och-saknade-v%C3%A4rden)
+        11. [Hypotesprövningar](#8-hypotespr%C3%B6vningar)
+        12. [Beslutsstöd: Ska vi köpa diamanten?](#9-beslutsst%C3%B6d-ska-vi-k%C3%B6pa-diamanten)
+        13. [Executive Summary och Data Storytelling](#10-executive-summary-och-data-storytelling)
+        """)
+
+    # Bakgrund
+    yield markdown("""
+        ### Bakgrund
+
+        Guldfynd överväger att expandera sitt sortiment med diamanter. 
+        Denna analys hjälper till att förstå diamanternas egenskaper och marknadsmöjligheter.
+        """)
+
+    # Om Diamanter
+    yield markdown("""
+        ### Om Diamanter
+
+        Diamanter är en av världens mest värdefulla ädelstenar, bildade under extremt högt tryck och temperatur djupt under jordens yta. 
+        De består av kolatomer i en kristallstruktur och är kända för sin exceptionella hårdhet och briljans.
+
+        #### De 4 C:na - Diamantens Viktigaste Egenskaper
+
+        1. **Cut (Slipning)**
+           - Beskriver hur väl diamanten är slipad och formad
+           - Påverkar hur ljuset reflekteras och diamantens briljans
+           - Kvaliteter från bäst till sämst: Ideal, Premium, Very Good, Good, Fair
+
+        2. **Color (Färg)**
+           - Mäter färglösheten i diamanten
+           - Skala från D (helt färglös) till Z (ljusgul)
+           - D-F: Färglösa
+           - G-J: Nästan färglösa
+           - K-M: Svagt färgade
+
+        3. **Clarity (Klarhet)**
+           - Beskriver frånvaron av inre och yttre brister
+           - IF (Internally Flawless): Perfekt
+           - VVS1-VVS2 (Very Very Slightly Included): Mycket små inneslutningar
+           - VS1-VS2 (Very Slightly Included): Små inneslutningar
+           - SI1-SI2 (Slightly Included): Synliga inneslutningar
+           - I1-I3 (Included): Tydliga inneslutningar
+
+        4. **Carat (Vikt)**
+           - Mäter diamantens vikt
+           - 1 karat = 0.2 gram
+           - Större diamanter är sällsyntare och därför värdefullare
+
+        #### Andra Viktiga Egenskaper
+
+        - **Depth (Djup)**: Förhållandet mellan diamantens höjd och diameter
+        - **Table (Tavla)**: Storleken på diamantens toppfasetter
+        - **Dimensions (x, y, z)**: Diamantens fysiska mått i millimeter
+
+        #### Värdering och Prissättning
+
+        Diamantens värde bestäms av en kombination av alla 4 C:na, där:
+        - Hög kvalitet på alla C:na ger högst värde
+        - Vikt (carat) har ofta störst påverkan på priset
+        - Perfekta diamanter (D-IF) är extremt sällsynta och värdefulla
+        - Mindre perfekta diamanter kan erbjuda bättre värde för pengarna
+
+        Denna kunskap är viktig för att förstå analysen och dess affärsmässiga implikationer.
+        """)
+
+    # Förberedelser
+    yield markdown("""
+        ### Förberedelser
+
+        För att säkerställa att analysen bygger på rimliga och fysiskt möjliga värden tar vi bort alla rader där någon av dimensionerna x, y eller z är 0. 
+        En diamant kan inte ha noll i längd, bredd eller höjd. Om sådana värden finns i datan beror det på felregistreringar eller saknad data. 
+        Om vi inte tar bort dessa rader riskerar vi att få missvisande medelvärden, felaktiga samband och konstiga visualiseringar. 
+        Efter borttagning av dessa rader blir analysen mer tillförlitlig och slutsatserna mer relevanta för verkliga diamanter.
+        """)
+
+    # Setup: the analysis and figure modules shared with the app
+    yield code("""
+        # Importera analys- och diagrammodulerna som också används av appen och ladda in data
+        import diamond_analysis as da
+        import figures
+
+        # Läs in diamonds-datan, rader där någon av dimensionerna x, y, z är 0 tas bort
+        df = da.load_data()
+        print(f"Dataset innehåller {len(df):,} diamanter efter borttagning av 0-värden.")
+        """)
+
+    # Grundläggande Statistik
+    yield markdown("""
+        ### 1. Grundläggande Statistik
+        Syfte: Ge en överblick över datasetets storlek och grundläggande egenskaper.
+        """)
+
+    yield code("""
+        # Visa grundläggande statistik
+        stats = da.basic_stats(df)
+        print(f'Antal diamanter: {stats["count"]:,}')
+        print(f'Medelpris: ${stats["mean_price"]:,.2f}')
+        print(f'Medelvikt: {stats["mean_carat"]:.2f} karat')
+        """)
+
+    yield markdown("""
+        **Tolkning:** Datasetet är stort och representativt för marknaden. Medelpriset och medelvikten ger en första känsla för utbudet.
+        """)
+
+    # Price analysis section
+    yield markdown("""
+        ### 2. Prisanalys
+        Syfte: Undersöka prisfördelningen och identifiera eventuella extremvärden.
+        """)
+
+    yield figure_code('Create price distribution histogram', 'fig_price',
+                      "figures.histogram(df, x='price', nbins=50, title='Fördelning av Diamantpriser', "
+                      "labels={'price': 'Pris (USD)', 'count': 'Antal'})")
+
+    yield markdown("""
+        **Diagramtyp:** Histogram.
+        **Hur man tolkar:** X-axeln visar prisintervall, Y-axeln antal diamanter. En toppig fördelning betyder många diamanter i det prisintervallet.
+        **Tolkning:** Priserna är snedfördelade med många billigare diamanter och ett fåtal mycket dyra.
+        **Insikt:** Priserna är koncentrerade till lägre nivåer, men det finns en lång svans av dyra diamanter.
+        **Affärsmässig tolkning:** Guldfynd kan erbjuda både prisvärda och exklusiva diamanter för att möta olika kunders behov.
+        """)
+
+    # Quality attributes section
+    yield markdown("""
+        ### 3. Kvalitetsattribut (Cut, Color, Clarity)
+        Syfte: Undersöka fördelningen av slipning, färg och klarhet. Alla är sorterade från bäst till sämst.
+        """)
+
+    yield pie_code('cut', 'Slipningskvalitet', 'cut quality')
+
+    yield markdown("""
+        **Diagramtyp:** Cirkeldiagram (pie chart) för slipningskvalitet.
+        **Hur man tolkar:** Varje tårtbit visar andelen diamanter av en viss slipning.
+        **Tolkning:** Ideal och Premium dominerar.
+        **Insikt:** Majoriteten av diamanterna har hög slipningskvalitet.
+        **Affärsmässig tolkning:** Guldfynd kan marknadsföra sitt sortiment som högkvalitativt och locka kvalitetsmedvetna kunder.
+        """)
+
+    yield pie_code('color', 'Färgkvalitet', 'color quality')
+
+    yield markdown("""
+        **Diagramtyp:** Cirkeldiagram (pie chart) för färgkvalitet.
+        **Hur man tolkar:** Varje tårtbit visar andelen diamanter av en viss färg.
+        **Tolkning:** E, F och G är vanligast.
+        **Insikt:** Sortimentet domineras av nästan färglösa diamanter (E, F, G). Det innebär att Guldfynd kan erbjuda hög kvalitet till ett mer tillgängligt pris än de allra mest färglösa (D).
+        **Affärsmässig tolkning:** Guldfynd bör utgå från att det är vikten som driver priset i dessa segment. Färgkvalitet kan användas för att skapa produktsegment, men prissättningen bör i första hand baseras på vikt.
+        """)
+
+    yield pie_code('clarity', 'Klarhetsgrader', 'clarity grades')
+
+    yield markdown("""
+        **Diagramtyp:** Cirkeldiagram (pie chart) för klarhetsgrader.
+        **Hur man tolkar:** Varje tårtbit visar andelen diamanter av en viss klarhet.
+        **Tolkning:** SI1 och VS2 är vanligast.
+        **Insikt:** De flesta diamanter har medelhög klarhet.
+        **Affärsmässig tolkning:** Guldfynd bör utgå från att det är vikten som driver priset i dessa segment. Klarhetsgrad kan användas för att skapa produktsegment, men prissättningen bör i första hand baseras på vikt.
+        """)
+
+    yield figure_code('Create histogram for carat (weight)', 'fig_carat',
+                      "figures.histogram(df, x='carat', nbins=40, title='Fördelning av Vikt (Carat)', "
+                      "labels={'carat': 'Vikt (carat)', 'count': 'Antal'})")
+
+    yield markdown("""
+        **Diagramtyp:** Histogram för vikt (carat).
+        **Hur man tolkar:** X-axeln visar viktintervall (carat), Y-axeln antal diamanter.
+        **Tolkning:** De flesta diamanter väger mindre än 1 carat, men det finns en lång svans av större stenar.
+        **Insikt:** Små diamanter är vanligast, men stora diamanter är mer sällsynta och värdefulla.
+        **Affärsmässig tolkning:** Guldfynd kan erbjuda ett brett sortiment av små diamanter för volymförsäljning och marknadsföra större stenar som exklusiva och sällsynta.
+        """)
+
+    # Price analysis by clarity section
+    yield markdown("""
+        ### 4. Prisfördelning per Kvalitetsattribut
+        Syfte: Undersöka hur priset varierar beroende på kvalitetsattributen cut, color och clarity.
+        """)
+
+    yield grouped_bar_code('cut', 'price', 'Slipning')
+
+    yield markdown("""
+        **Diagramtyp:** Grupperat stapeldiagram för medel- och medianpris per slipning.
+        **Hur man tolkar:** Varje stapel visar medel- eller medianpriset för en slipningsklass.
+        **Tolkning:** Premium och Fair har högst medel- och medianpris.
+        **Insikt:** Högre eller lägre slipningskvalitet kan ge högre pris, beroende på segment.
+        **Affärsmässig tolkning:** Guldfynd kan ta ut högre pris för vissa slipningsklasser och bör analysera vilka segment som är mest lönsamma.
+        """)
+
+    yield grouped_bar_code('color', 'price', 'Färg')
+
+    yield markdown("""
+        **Diagramtyp:** Grupperat stapeldiagram för medel- och medianpris per färg.
+        **Hur man tolkar:** Varje stapel visar medel- eller medianpriset för en färgklass.
+        **Tolkning:** J, I och H har högst medel- och medianpris.
+        **Insikt:** Högre färgklass (J, I, H) har högre pris i detta dataset.
+        **Affärsmässig tolkning:** Guldfynd kan ta ut högre pris för diamanter med dessa färger och bör analysera efterfrågan i dessa segment.
+        """)
+
+    yield grouped_bar_code('clarity', 'price', 'Klarhetsgrad')
+
+    yield markdown("""
+        **Diagramtyp:** Grupperat stapeldiagram för medel- och medianpris per klarhetsgrad.
+        **Hur man tolkar:** Varje stapel visar medel- eller medianpriset för en klarhetsklass.
+        **Tolkning:** SI2, SI1 och I1 har högst medel- och medianpris.
+        **Insikt:** De klarhetsgrader som har högst pris har också högst vikt, vilket visar att det är vikten som driver priset snarare än klarhetsgraden.
+        **Affärsmässig tolkning:** Guldfynd bör utgå från att det är vikten som driver priset i dessa segment. Klarhetsgrad kan användas för att skapa produktsegment, men prissättningen bör i första hand baseras på vikt.
+        """)
+
+    yield grouped_bar_code('cut', 'carat', 'Slipning')
+
+    yield markdown("""
+        **Diagramtyp:** Grupperat stapeldiagram för medel- och medianvikt per slipning.
+        **Hur man tolkar:** Varje stapel visar medel- eller medianvikten för en slipningsklass.
+        **Tolkning:** Premium och Fair har högst medel- och medianvikt.
+        **Insikt:** De slipningsklasser som har högst pris har också högst vikt, vilket visar att det är vikten som driver priset snarare än slipningskvaliteten.
+        **Affärsmässig tolkning:** Guldfynd bör utgå från att det är vikten som driver priset i dessa segment. Slipningskvalitet kan användas för att skapa produktsegment, men prissättningen bör i första hand baseras på vikt.
+        """)
+
+    yield grouped_bar_code('color', 'carat', 'Färg')
+
+    yield markdown("""
+        **Diagramtyp:** Grupperat stapeldiagram för medel- och medianvikt per färg.
+        **Hur man tolkar:** Varje stapel visar medel- eller medianvikten för en färgklass.
+        **Tolkning:** J, I och H har högst medel- och medianvikt.
+        **Insikt:** De färgklasser som har högst pris har också högst vikt, vilket visar att det är vikten som driver priset snarare än färgklassen.
+        **Affärsmässig tolkning:** Guldfynd bör utgå från att det är vikten som driver priset i dessa segment. Färg kan användas för att skapa produktsegment, men prissättningen bör i första hand baseras på vikt.
+        """)
+
+    yield grouped_bar_code('clarity', 'carat', 'Klarhetsgrad')
+
+    yield markdown("""
+        **Diagramtyp:** Grupperat stapeldiagram för medel- och medianvikt per klarhetsgrad.
+        **Hur man tolkar:** Varje stapel visar medel- eller medianvikten för en klarhetsklass.
+        **Tolkning:** SI2, SI1 och I1 har högst medel- och medianvikt.
+        **Insikt:** De klarhetsgrader som har högst pris har också högst vikt, vilket visar att det är vikten som driver priset snarare än klarhetsgraden.
+        **Affärsmässig tolkning:** Guldfynd bör utgå från att det är vikten som driver priset i dessa segment. Klarhetsgrad kan användas för att skapa produktsegment, men prissättningen bör i första hand baseras på vikt.
+        """)
+
+    # 5. Samband mellan Vikt och Pris
+    yield markdown("""
+        ### 5. Samband mellan Vikt och Pris
+        Syfte: Undersöka hur vikt och pris samvarierar beroende på kvalitet.
+        """)
+
+    yield scatter_code('cut', 'Slipning')
+
+    yield markdown("""
+        **Diagramtyp:** Spridningsdiagram (scatterplot) för vikt och pris per slipning.
+        **Hur man tolkar:** Varje punkt är en diamant. Om punkterna bildar ett mönster (t.ex. stigande linje) finns ett samband. Färg visar slipning.
+        **Tolkning:** Högre vikt och bättre slipning ger högre pris.
+        **Insikt:** Det finns ett tydligt samband mellan vikt, slipning och pris.
+        **Affärsmässig tolkning:** Guldfynd kan använda denna kunskap för att prissätta större och bättre slipade diamanter högre.
+        """)
+
+    yield scatter_code('color', 'Färg')
+
+    yield markdown("""
+        **Diagramtyp:** Spridningsdiagram (scatterplot) för vikt och pris per färg.
+        **Hur man tolkar:** Varje punkt är en diamant. Färg visar färgklass. Mönster visar samband.
+        **Tolkning:** Färg påverkar priset, särskilt för större diamanter.
+        **Insikt:** Premiumfärg ger högre pris, särskilt i större stenar.
+        **Affärsmässig tolkning:** Guldfynd kan särskilt marknadsföra stora diamanter med hög färgkvalitet till premiumkunder.
+        """)
+
+    yield scatter_code('clarity', 'Klarhet')
+
+    yield markdown("""
+        **Diagramtyp:** Spridningsdiagram (scatterplot) för vikt och pris per klarhet.
+        **Hur man tolkar:** Varje punkt är en diamant. Färg visar klarhetsgrad. Mönster visar samband.
+        **Tolkning:** Klarhet har störst effekt på priset för större diamanter.
+        **Insikt:** Premiumklarhet i stora stenar ger högst pris.
+        **Affärsmässig tolkning:** Guldfynd kan ta ut högre pris för stora diamanter med hög klarhet och rikta dem till exklusiva kunder.
+        """)
+
+    # 6. Korrelationer
+    yield markdown("""
+        ### 6. Korrelationer
+        Syfte: Visa korrelationer mellan alla numeriska variabler i datasetet för att förstå sambanden mellan olika egenskaper.
+        """)
+
+    yield figure_code('Create heatmap of the correlations between the numerical columns', 'fig_heatmap',
+                      "figures.correlation_heatmap(da.correlation_matrix(df), "
+                      "title='Korrelationsmatris för Numeriska Variabler')")
+
+    yield markdown("""
+        **Diagramtyp:** Heatmap (värmekarta) för korrelationer.
+        **Hur man tolkar:** Färgerna visar styrkan och riktningen av sambandet mellan variablerna. Röd = positiv korrelation, blå = negativ korrelation. Mörkare färg = starkare samband.
+        **Tolkning:** Det finns starka positiva korrelationer mellan vikt (carat) och pris, samt mellan de fysiska måtten (x, y, z).
+        **Insikt:** Vikt och fysiska mått är starkt relaterade till pris, medan djup och tavla har svagare samband.
+        **Affärsmässig tolkning:** Guldfynd kan använda dessa samband för att förstå vilka faktorer som påverkar priset mest och optimera sitt sortiment.
+        """)
+
+    yield markdown("""
+        Syfte: Det finns en stark korrelation mellan vikt (carat) och pris. Syftet är att visa sambandet mellan dessa på ett enkelt och tydligt sätt.
+        """)
+
+    yield figure_code(None, 'fig_corr',
+                      "figures.scatter(df, x='carat', y='price', title='Samband mellan Vikt (Carat) och Pris', "
+                      "labels={'carat': 'Vikt (carat)', 'price': 'Pris (USD)'})")
+
+    yield markdown("""
+        **Diagramtyp:** Spridningsdiagram (scatterplot) för vikt (carat) och pris.
+        **Hur man tolkar:** Varje punkt är en diamant. Om punkterna bildar ett stigande mönster finns ett positivt samband.
+        **Tolkning:** Det finns ett tydligt positivt samband mellan vikt (carat) och pris – ju större diamant, desto högre pris.
+        **Insikt:** Vikt är den starkaste prisdrivande faktorn.
+        **Affärsmässig tolkning:** Guldfynd kan använda detta samband för att prissätta större diamanter högre och identifiera attraktiva segment.
+        """)
+
+    yield markdown("""
+        ### Starka Korrelationer mellan Diamantmått
+        Syfte: Visa de tre starkaste sambanden mellan diamantens mått och vikt.
+        """)
+
+    yield figure_code(None, 'fig_carat_x',
+                      "figures.scatter(df, x='carat', y='x', title='Samband mellan Vikt (carat) och Längd (x)', "
+                      "labels={'carat': 'Vikt (carat)', 'x': 'Längd (mm)'})")
+
+    yield markdown("""
+        **Diagramtyp:** Spridningsdiagram (scatterplot) för vikt (carat) och längd (x).
+        **Hur man tolkar:** Varje punkt är en diamant. Ett stigande mönster visar att större vikt ger större längd.
+        **Tolkning:** Det finns ett mycket starkt positivt samband mellan vikt och längd.
+        **Insikt:** Större diamanter är längre, vilket är logiskt och kan användas för kvalitetskontroll.
+        **Affärsmässig tolkning:** Guldfynd kan använda detta samband för att snabbt uppskatta vikt utifrån längd vid värdering.
+        """)
+
+    yield figure_code(None, 'fig_x_y',
+                      "figures.scatter(df, x='x', y='y', title='Samband mellan Längd (x) och Bredd (y)', "
+                      "labels={'x': 'Längd (mm)', 'y': 'Bredd (mm)'})")
+
+    yield markdown("""
+        **Diagramtyp:** Spridningsdiagram (scatterplot) för längd (x) och bredd (y).
+        **Hur man tolkar:** Varje punkt är en diamant. Ett stigande mönster visar att längre diamanter också är bredare.
+        **Tolkning:** Det finns ett mycket starkt positivt samband mellan längd och bredd.
+        **Insikt:** Diamanter är ofta symmetriska, vilket syns i detta samband.
+        **Affärsmässig tolkning:** Guldfynd kan använda detta samband för att kontrollera symmetri och kvalitet.
+        """)
+
+    yield figure_code(None, 'fig_x_z',
+                      "figures.scatter(df, x='x', y='z', title='Samband mellan Längd (x) och Höjd (z)', "
+                      "labels={'x': 'Längd (mm)', 'z': 'Höjd (mm)'})")
+
+    yield markdown("""
+        **Diagramtyp:** Spridningsdiagram (scatterplot) för längd (x) och höjd (z).
+        **Hur man tolkar:** Varje punkt är en diamant. Ett stigande mönster visar att längre diamanter tenderar att vara högre.
+        **Tolkning:** Det finns ett starkt positivt samband mellan längd och höjd.
+        **Insikt:** Diamanter med större längd tenderar att vara högre.
+        **Affärsmässig tolkning:** Guldfynd kan använda detta samband för att identifiera proportionerliga och välformade diamanter.
+        """)
+
+    # 7. Extremvärden och Saknade Värden
+    yield markdown("""
+        ### 7. Extremvärden och Saknade Värden
+        Syfte: Identifiera och analysera extremvärden och saknade värden i datasetet.
+        """)
+
+    yield code("""
+        # Extremvärden utanför 1,5 IQR från kvartilerna
+        outliers = da.outlier_counts(df)
+        fig_outliers = figures.bar(x=list(outliers.keys()), y=list(outliers.values()),
+                                   labels={'x': 'Variabel', 'y': 'Antal Extremvärden'},
+                                   title='Antal Extremvärden per Variabel')
+        fig_outliers.show()
+        """)
+
+    yield markdown("""
+        **Diagramtyp:** Stapeldiagram (bar chart) för extremvärden.
+        **Hur man tolkar:** Varje stapel visar antalet extremvärden för en variabel.
+        **Tolkning:** Extremvärden förekommer i samtliga nyckelvariabler (pris, vikt, djup, tavla) och kan snedvrida analysen, särskilt medelvärden och samband. För price kan enstaka mycket dyra diamanter ge en felaktig bild av prisnivåer. För carat kan extremt höga eller låga vikter påverka analysen av sambandet mellan vikt och pris. För depth och table kan extremvärden indikera mätfel eller ovanliga slipningar, vilket påverkar slutsatser om kvalitet och pris. Dessa bör identifieras och hanteras vid analys och affärsbeslut.
+        **Insikt:** Datadrivna beslut kring lager och prissättning blir mer tillförlitliga om extremvärden hanteras korrekt. Extremvärden kan indikera unika möjligheter eller risker i sortimentet.
+        **Affärsmässig tolkning:** Guldfynd bör identifiera och analysera extremvärden noggrant. Överväg att exkludera eller särskilt hantera diamanter med extremvärden vid prissättning och sortimentsplanering. Detta kan hjälpa till att optimera lager och öka lönsamheten.
+        """)
+
+    yield code("""
+        # Saknade värden
+        null_values = da.missing_counts(df)
+        fig_null = figures.bar(x=null_values.index, y=null_values.values,
+                               labels={'x': 'Variabel', 'y': 'Antal Saknade Värden'},
+                               title='Antal Saknade Värden per Variabel')
+        fig_null.show()
+        """)
+
+    yield markdown("""
+        **Diagramtyp:** Stapeldiagram (bar chart) för saknade värden.
+        **Hur man tolkar:** Varje stapel visar antalet saknade värden för en variabel.
+        **Diagramtyp:** Grupperat stapeldiagram för medel- och medianpris per slipning.
+        **Hur man tolkar:** Varje stapel visar medel- eller medianpriset för en slipningsklass.
+        **Tolkning:** Premium och Fair har högst medel- och medianpris.
+        **Insikt:** Högre eller lägre slipningskvalitet kan ge högre pris, beroende på segment.
+        **Affärsmässig tolkning:** Guldfynd kan ta ut högre pris för vissa slipningsklasser och bör analysera vilka segment som är mest lönsamma.
+        """)
+
+    yield code("""
+        # Geometriska kontroller: djupet mot 2z/(x+y), vikten mot volymen x*y*z och symmetrin mellan x och y
+        geometry = da.geometry_flags(df)
+        print(da.geometry_counts(geometry))
+        df[geometry > 0][['carat', 'depth', 'x', 'y', 'z', 'price']].head(10)
+        """)
+
+    yield markdown("""
+        **Tabelltyp:** Antal diamanter per misslyckad kontroll och de första flaggade diamanterna.
+        **Hur man tolkar:** En diamant flaggas om djupet avviker mer än 2 procentenheter från 2z/(x+y), om vikten avviker mer än 20 % från 0,0061 carat per mm³ av x·y·z eller om längd och bredd skiljer sig mer än 10 %.
+        **Tolkning:** Ett sextiotal diamanter har mått som inte stämmer med djupet eller vikten, vilket tyder på mätfel utöver 0-värdena som redan tagits bort.
+        **Affärsmässig tolkning:** Guldfynd bör kontrollera måtten på sådana diamanter innan köp; beslutsstödet avvisar kandidater som inte klarar kontrollerna.
+        """)
+
+    # 8. Hypotesprövningar
+    yield markdown("""
+        ### 8. Hypotesprövningar
+        Syfte: Undersöka om diamanter med högre vikt (carat) har större spridning i pris än lättare diamanter. Vi delar diamanterna i två grupper: små (carat <= median) och stora (carat > median). Vi använder ett enkelt stapeldiagram för att visa prisvariationen.
+        """)
+
+    yield markdown("""
+        **Begreppsförklaring:** Prisvariation betyder hur mycket priserna skiljer sig åt inom en grupp. Hög variation betyder att det finns både billiga och dyra diamanter i gruppen.
+        """)
+
+    yield code("""
+        # Prisvariation för diamanter upp till och över medianvikten
+        price_std = da.price_std_by_carat_group(df)
+        fig_var = figures.bar(x=price_std.index, y=price_std.values,
+                              labels={'x': 'Viktgrupp', 'y': 'Prisvariation (std)'},
+                              title='Prisvariation för små och stora diamanter')
+        fig_var.show()
+        """)
+
+    yield markdown("""
+        **Diagramtyp:** Stapeldiagram (bar chart) för prisvariation.
+        **Hur man tolkar:** Varje stapel visar hur mycket priserna varierar inom gruppen. Hög stapel = stor variation.
+        **Tolkning:** Stora diamanter har större prisvariation än små diamanter.
+        **Insikt:** Priset på stora diamanter kan skilja sig mycket, beroende på andra faktorer som kvalitet och sällsynthet.
+        **Affärsmässig tolkning:** Guldfynd bör vara extra noga med prissättning av stora diamanter, eftersom priset kan variera mycket även inom samma viktgrupp.
+        """)
+
+    # 9. Beslutsstöd: Ska vi köpa diamanten?
+    yield markdown("""
+        ### 9. Beslutsstöd: Ska vi köpa diamanten?
+        Syfte: Hjälpa styrelsen att fatta datadrivna beslut om inköp av enskilda diamanter baserat på analysen ovan.
+
+        Funktionen `should_buy_diamond` hjälper dig att fatta datadrivna beslut om du bör köpa en viss diamant eller inte.
+        Du matar in diamantens egenskaper och får ett tydligt ja/nej-svar samt en motivering baserat på analysen ovan.
+
+        **Exempel:**
+        - Ja, priset är rimligt för denna vikt och kvalitet.
+        - Nej, priset är för högt jämfört med liknande diamanter.
+        - Nej, egenskaperna avviker från det normala (t.ex. extremvärde).
+        """)
+
+    yield code("""
+        # Beslutsfunktionen är samma som i appen. Referensvärdena per kvalitet, kurvorna för
+        # pris per carat över vikt och gränserna för extremvärden beräknas en gång och
+        # återanvänds för varje beslut.
+        from price_curves import PriceCurveIndex
+        reference_stats = da.get_reference_stats(df)
+        curves = PriceCurveIndex(df)
+        fences = da.outlier_fences(df)
+
+        # Exempel på användning:
+        carat = 0.7
+        cut = 'Very Good'
+        color = 'G'
+        clarity = 'VS2'
+        price = 3500
+        depth = 61.5
+        table = 57.0
+        x = 5.7
+        y = 5.7
+        z = 3.5
+        beslut, motivering = da.should_buy_diamond(carat, cut, color, clarity, price, depth, table, x, y, z,
+                                                   df, reference_stats, fences, price_curves=curves)
+        print(f'Rekommendation: {beslut}')
+        print(f'Motivering: {motivering}')
+        """)
+
+    # 10. Executive Summary
+    yield markdown("""
+        ### 10. Executive Summary och Data Storytelling
+
+        #### Huvudinsikter
+        1. **Marknadssegmentering**
+           - Priser och kvaliteter varierar stort, men det är vikten (carat) som är den primära prisdrivande faktorn.
+             _Detta innebär att prissättning bör baseras på vikt, medan kvalitetsattribut används för att skapa olika produktsegment._
+        2. **Kvalitetsattribut**
+           - Premium och Fair har högst medel- och medianpris för slipning, men detta beror på att dessa klasser har högst vikt.
+             _Detta visar att slipningskvaliteten i sig inte är den avgörande prisfaktorn._
+           - J, I och H har högst medel- och medianpris för färg, men även här är det vikten som förklarar de högre priserna.
+             _Detta innebär att färgkvaliteten är en sekundär prisfaktor._
+           - SI2, SI1 och I1 har högst medel- och medianpris för klarhet, vilket också förklaras av högre vikt.
+             _Detta visar att klarhetsgraden i sig inte är den enda prisdrivande faktorn._
+        3. **Prisdrivande faktorer**
+           - Vikt (carat) är den starkaste prisdrivande faktorn, följt av kvalitetsattribut.
+             _Större diamanter är betydligt dyrare, oavsett kvalitetsklass._
+        4. **Extremvärden och saknade värden**
+           - Extremvärden förekommer i samtliga nyckelvariabler (pris, vikt, djup, tavla) och kan snedvrida analysen, särskilt medelvärden och samband. För price kan enstaka mycket dyra diamanter ge en felaktig bild av prisnivåer. För carat kan extremt höga eller låga vikter påverka analysen av sambandet mellan vikt och pris. För depth och table kan extremvärden indikera mätfel eller ovanliga slipningar, vilket påverkar slutsatser om kvalitet och pris. Dessa bör identifieras och hanteras vid analys och affärsbeslut.
+             _Datadrivna beslut kring lager och prissättning blir mer tillförlitliga om extremvärden hanteras korrekt._
+        5. **Statistiska skillnader**
+           - Prisskillnader mellan kvalitetsklasser är signifikanta, men till stor del förklaras av vikt.
+             _Detta bekräftas av hypotesprövningar och bör beaktas vid sortimentsplanering._
+        6. **Affärsmässiga implikationer**
+           - Sortiment och prissättning bör primärt baseras på vikt, med kvalitetsattribut som sekundära faktorer.
+             _Genom att analysera vilka viktsegment som är mest lönsamma kan man optimera utbudet._
+           - Extremvärden bör identifieras och hanteras särskilt vid prissättning och sortimentsplanering, eftersom de kan vara svårsålda, påverka lönsamheten eller ge en missvisande bild av marknaden.
+             _Exkludera eller särskilt analysera diamanter med extremvärden för att fatta mer tillförlitliga beslut._
+           - Premiumprodukter kan marknadsföras baserat på kombinationen av vikt och kvalitet.
+             _Detta möjliggör differentierad marknadsföring och ökad lönsamhet._
+           - Dataanalys möjliggör datadrivna beslut för inköp, lager och kampanjer.
+             _Att använda insikter från datan minskar risken för felbeslut och ökar konkurrenskraften._
+        7. **Korrelationer och samband**
+           - Carat och pris har starkast positiv korrelation.
+             _Det är viktigt att förstå detta samband för att kunna förutsäga pris och identifiera avvikelser._
+           - Måtten x, y, z är starkt korrelerade med vikt.
+             _Detta visar att diamantens dimensioner hänger ihop med vikt och kan användas för kvalitetskontroll._
+        8. **Kundperspektiv**
+           - Det finns "fyndmöjligheter" i vissa viktsegment.
+             _Kunder med kunskap kan hitta diamanter med bra värde genom att fokusera på vikt och kompromissa på vissa kvalitetsattribut._
+        9. **Storytelling**
+           - Diamantmarknaden är bred och mångfacetterad, med både exklusiva och prisvärda alternativ.
+             _Analysen visar att det finns utrymme för både lyx och volym, och att datadrivna beslut kan maximera värdet för både företag och kund._
+
+        #### Rekommendationer
+        - Basera prissättning och sortimentsplanering primärt på vikt (carat).
+          _Använd kvalitetsattribut som sekundära differentieringsfaktorer._
+        - Identifiera och analysera extremvärden noggrant. Överväg att exkludera eller särskilt hantera diamanter med extremvärden vid prissättning och sortimentsplanering.
+          _Detta minskar risken för felaktiga beslut och ökar lönsamheten._
+        - Skapa tydliga produktsegment baserade på vikt och kvalitet.
+          _Kombinera vikt med kvalitetsattribut för att skapa attraktiva erbjudanden._
+        - Analysera och hantera extremvärden i lager och prissättning.
+          _Undvik att låta outliers påverka prissättning och lagerbeslut._
+        - Använd datadrivna insikter för att optimera utbud och lönsamhet.
+          _Fortsätt analysera data löpande för att anpassa strategin till marknadens förändringar._
+        """)
+
+
+def self_assessment_cells():
+    """
+    The self-assessment at the end.
+    """
+    # Självutvärdering sist i notebooken (utförlig version)
+    yield markdown("""
+        ## Självutvärdering <a name="självutvärdering"></a>
+
+        1. **Vad har varit roligast i kunskapskontrollen?**
+           - Dataanalysen och visualiseringen av diamanterna
+           - Skapandet av interaktiva visualiseringar med Streamlit
+           - Att se sambanden mellan olika attribut
+
+        2. **Vilket betyg anser du att du ska ha och varför?**
+           - VG eftersom jag har:
+             - Skrivit tydlig och välstrukturerad kod
+             - Skapat en omfattande dataanalys med tydlig progression
+             - Implementerat en interaktiv Streamlit-applikation
+             - Presenterat insikter på ett professionellt sätt
+
+        3. **Vad har varit mest utmanande i arbetet och hur har du hanterat det?**
+           - Att balansera detaljnivån i analysen
+           - Att välja rätt visualiseringar för att illustrera sambanden
+           - Lösning: Iterativ process med kontinuerlig förbättring
+        """)
+
+
+def write_notebook(path, cells):
+    """
+    Write cells to a notebook file as they are generated, so the whole notebook is
+    never held in memory.
+    Args:
+        path (str): Notebook file to create
+        cells (iterable): Cells as produced by markdown() and code()
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{\n "cells": [')
+        for i, cell in enumerate(cells):
+            f.write(',\n' if i else '\n')
+            f.write(textwrap.indent(json.dumps(cell, indent=1, ensure_ascii=False), '  '))
+        f.write('\n ],\n "metadata": ')
+        f.write(textwrap.indent(json.dumps(METADATA, indent=1, ensure_ascii=False), ' ').lstrip())
+        f.write(',\n "nbformat": 4,\n "nbformat_minor": 4\n}\n')
+
+
+def inputs_fingerprint():
+    """
+    Fingerprint of the files the code cells read.
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    for name in CELL_INPUTS:
+        digest.update(name.encode())
+        digest.update(hashlib.sha256((ROOT / name).read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def _names(tree):
+    """
+    Names a cell reads before assigning them itself, and names it assigns or changes.
+    Returns:
+        tuple: (read names, assigned names) as sets
+    """
+    loads, stores = set(), set()
+    for statement in tree.body:
+        statement_loads, statement_stores = set(), set()
+        for node in ast.walk(statement):
+            if isinstance(node, ast.Name):
+                (statement_loads if isinstance(node.ctx, ast.Load) else statement_stores).add(node.id)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                statement_stores.add(node.name)
+            elif isinstance(node, (ast.Import, ast.ImportFrom)):
+                statement_stores.update(alias.asname or alias.name.split('.')[0] for alias in node.names)
+            elif isinstance(node, (ast.Assign, ast.AugAssign, ast.AnnAssign, ast.Delete)):
+                # Assigning to an item or attribute, e.g. df['col'] = ..., changes the object
+                for target in getattr(node, 'targets', None) or [node.target]:
+                    while isinstance(target, (ast.Subscript, ast.Attribute)):
+                        target = target.value
+                    if isinstance(target, ast.Name):
+                        statement_stores.add(target.id)
+        loads |= statement_loads - stores
+        stores |= statement_stores
+    return loads, stores
+
+
+def cell_dependencies(sources):
+    """
+    Find the earlier code cells each code cell needs: for every name it reads, the
+    last earlier cell that assigned it. Changes made through method calls, e.g.
+    list.append(), are not seen.
+    Args:
+        sources (list): Source of every code cell, in order
+    Returns:
+        list: Sorted indices of the cells each cell depends on directly
+    """
+    assigned_by = {}
+    dependencies = []
+    for i, source in enumerate(sources):
+        try:
+            loads, stores = _names(ast.parse(source))
+        except SyntaxError:
+            # E.g. IPython magics: depends on, and may change, everything before
+            dependencies.append(list(range(i)))
+            assigned_by = dict.fromkeys(assigned_by, i)
+            continue
+        dependencies.append(sorted({assigned_by[name] for name in loads if name in assigned_by}))
+        assigned_by.update(dict.fromkeys(stores, i))
+    return dependencies
+
+
+def _with_dependencies(cells, dependencies):
+    """
+    The cells and everything they depend on, directly or not, in notebook order.
+    """
+    needed = set()
+    stack = list(cells)
+    while stack:
+        i = stack.pop()
+        if i not in needed:
+            needed.add(i)
+            stack.extend(dependencies[i])
+    return sorted(needed)
+
+
+def _run_cells(sources, timeout):
+    """
+    Run code cells in a new kernel, in a worker process.
+    Returns:
+        list: Outputs of every cell
+    """
+    import nbformat
+    from nbclient import NotebookClient
+    notebook = nbformat.v4.new_notebook(metadata=METADATA)
+    notebook.cells = [nbformat.v4.new_code_cell(source) for source in sources]
+    NotebookClient(notebook, timeout=timeout, kernel_name='python3',
+                   resources={'metadata': {'path': str(ROOT)}}).execute()
+    # Plain JSON types, to send them back to the main process
+    return [json.loads(json.dumps(cell.outputs)) for cell in notebook.cells]
+
+
+def execute_notebook(path, cache_dir=CACHE_DIR, timeout=600, workers=WORKERS):
+    """
+    Run a notebook headless and store the outputs in it, reusing the cached outputs
+    of cells whose source, dependencies and input files are unchanged.
+    Args:
+        path (str): Notebook to execute in place
+        cache_dir (Path): Directory of the cached cell outputs
+        timeout (int): Seconds a cell may run
+        workers (int): Kernels to run in parallel
+    Returns:
+        tuple: Number of cells taken from the cache and number of cells run
+    """
+    with open(path, encoding='utf-8') as f:
+        notebook = json.load(f)
+    cells = [cell for cell in notebook['cells'] if cell['cell_type'] == 'code']
+    sources = [''.join(cell['source']) for cell in cells]
+    dependencies = cell_dependencies(sources)
+
+    # A cell's key covers the keys of its dependencies, so a change is passed on to the cells using it
+    inputs = inputs_fingerprint()
+    keys = []
+    for source, deps in zip(sources, dependencies):
+        keys.append(hashlib.sha256('\0'.join([inputs, source] + [keys[d] for d in deps]).encode()).hexdigest())
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    outputs = {}
+    for i, key in enumerate(keys):
+        cache_path = cache_dir / f'{key}.json'
+        if cache_path.exists():
+            outputs[i] = json.loads(cache_path.read_text(encoding='utf-8'))
+
+    # Split the cells to run into one consecutive group per kernel, so cells that use the
+    # same earlier cells mostly end up in the same kernel
+    missing = [i for i in range(len(cells)) if i not in outputs]
+    groups = [missing[k * len(missing) // workers:(k + 1) * len(missing) // workers] for k in range(workers)]
+    groups = [group for group in groups if group]
+    if groups:
+        with ProcessPoolExecutor(max_workers=len(groups)) as pool:
+            runs = []
+            for group in groups:
+                needed = _with_dependencies(group, dependencies)
+                runs.append((group, needed, pool.submit(_run_cells, [sources[i] for i in needed], timeout)))
+            for group, needed, future in runs:
+                for i, cell_outputs in zip(needed, future.result()):
+                    if i in group:
+                        outputs[i] = cell_outputs
+                        tmp_path = cache_dir / f'{keys[i]}.tmp'
+                        tmp_path.write_text(json.dumps(cell_outputs, ensure_ascii=False), encoding='utf-8')
+                        os.replace(tmp_path, cache_dir / f'{keys[i]}.json')
+
+    # Numbered as if the notebook had been run from top to bottom
+    for i, cell in enumerate(cells):
+        number = i + 1
+        cell['outputs'] = outputs[i]
+        cell['execution_count'] = number
+        for output in cell['outputs']:
+            if 'execution_count' in output:
+                output['execution_count'] = number
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(notebook, f, indent=1, ensure_ascii=False)
+        f.write('\n')
+    return len(cells) - len(missing), len(missing)
+
+
+def _export_figure(figure, fmt, side_path=None):
+    """
+    Convert one interactive figure, in a worker process.
+    Args:
+        figure (dict): The figure JSON from the notebook output
+        fmt (str): 'binned', 'png' or 'svg'
+        side_path (str): HTML file to write the full interactive figure to, or None
+    Returns:
+        dict: The new output data, by MIME type
+    """
+    import plotly.io as pio
+    import figures
+    if side_path:
+        pio.write_html(figure, side_path, include_plotlyjs='cdn')
+    title = figure.get('layout', {}).get('title', {})
+    text = f"<Figure: {title.get('text', '') if isinstance(title, dict) else title}>"
+    if fmt == 'binned':
+        return {PLOTLY_MIME: figures.bin_scatter(figure), 'text/plain': text}
+    try:
+        image = pio.to_image(figure, format=fmt)
+    except (ValueError, RuntimeError) as problem:
+        # Rendering needs kaleido and a Chrome it can start; plotly explains what is missing
+        raise RuntimeError(str(problem).strip()) from None
+    if fmt == 'png':
+        return {'image/png': base64.b64encode(image).decode('ascii'), 'text/plain': text}
+    return {'image/svg+xml': image.decode('utf-8'), 'text/plain': text}
+
+
+def export_figures(path, fmt, side_dir=None, workers=WORKERS):
+    """
+    Replace the interactive figures of an executed notebook with static or binned ones.
+    Args:
+        path (str): Executed notebook, changed in place
+        fmt (str): 'binned', 'png' or 'svg'
+        side_dir (str): Directory for the full interactive figures as HTML files, or None
+        workers (int): Processes converting figures in parallel
+    Returns:
+        int: Number of figures converted
+    Raises:
+        RuntimeError: If a figure cannot be rendered, e.g. without kaleido or Chrome; the
+            notebook is then left unchanged
+    """
+    with open(path, encoding='utf-8') as f:
+        notebook = json.load(f)
+    if side_dir:
+        Path(side_dir).mkdir(parents=True, exist_ok=True)
+    found = []
+    for i, cell in enumerate(notebook['cells']):
+        for output in cell.get('outputs', []):
+            if PLOTLY_MIME in output.get('data', {}):
+                side_path = Path(side_dir) / f'figure-{i:03d}.html' if side_dir else None
+                found.append((cell, output, side_path))
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(_export_figure, output['data'][PLOTLY_MIME], fmt, side_path and str(side_path))
+                   for _, output, side_path in found]
+        for (cell, output, side_path), future in zip(found, futures):
+            try:
+                output['data'] = future.result()
+            except RuntimeError:
+                # The other figures would fail the same way
+                for pending in futures:
+                    pending.cancel()
+                raise
+            if side_path:
+                # Link to the interactive version, relative to the notebook
+                link = os.path.relpath(side_path, Path(path).resolve().parent)
+                cell['outputs'].append({'output_type': 'display_data', 'metadata': {},
+                                        'data': {'text/markdown': f'[Interaktiv version]({link})'}})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(notebook, f, indent=1, ensure_ascii=False)
+        f.write('\n')
+    return len(found)
+
+
+def build_parser():
+    """
+    Create the argument parser.
+    Returns:
+        argparse.ArgumentParser: The parser
+    """
+    parser = argparse.ArgumentParser(description="Generate the Kunskapskontroll notebook.")
+    parser.add_argument('--output', '-o', default=NOTEBOOK_PATH, help="Notebook file to create")
+    parser.add_argument('--execute', action='store_true', help="Run the notebook headless and store the outputs")
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help="Directory of cached cell outputs")
+    parser.add_argument('--timeout', type=int, default=600, help="Seconds a cell may run when executing")
+    parser.add_argument('--workers', type=int, default=WORKERS, help="Kernels to run in parallel when executing")
+    parser.add_argument('--figures', choices=FIGURE_FORMATS, default='interactive',
+                        help="How to store the figures of the executed notebook: interactive Plotly, "
+                             "binned scatter points, or static images (needs kaleido and Chrome, "
+                             "see plotly_get_chrome)")
+    parser.add_argument('--interactive-dir', help="Also write the full interactive figures as HTML files here")
+    return parser
+
+
+def main(argv=None):
+    """
+    Write the notebook, and execute it if asked to.
+    """
+    args = build_parser().parse_args(argv)
+    # Save the notebook to a file
+    write_notebook(args.output, notebook_cells())
+    print(f"Jupyter Notebook har skapats: {args.output}")
+    if args.execute:
+        cached, run = execute_notebook(args.output, args.cache_dir, args.timeout, args.workers)
+        print(f"Notebooken har körts: {run} celler körda, {cached} hämtade från cachen")
+        if args.figures != 'interactive':
+            try:
+                count = export_figures(args.output, args.figures, args.interactive_dir, args.workers)
+            except RuntimeError as problem:
+                raise SystemExit(f"Diagrammen kunde inte exporteras som {args.figures}: {problem}\n"
+                                 f"{args.output} har kvar de interaktiva diagrammen. Installera Chrome "
+                                 f"med plotly_get_chrome, eller använd --figures binned.")
+            print(f"{count} diagram exporterade som {args.figures}")
+
+
+if __name__ == '__main__':
+    main()
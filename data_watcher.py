@@ -0,0 +1,259 @@
+# Hot reload of the inventory data without restarting the app.
+#
+# A background thread polls the CSV's size and modification time, or the version of
+# a columnar store (see columnar_store.py). When rows have been appended, only the new
+# rows are read: the dataset and the aggregate cube are extended, and the reference
+# medians are recomputed only for the quality combinations of the new rows. Any other
+# change triggers a full reload. Either way the new state is computed next to the old
+# one and swapped in with a single assignment once it is complete, so sessions keep
+# using the old data until then and never see a half-updated state or a cold start.
+
+# Import required libraries
+import hashlib  # For recognising an appended file
+import io  # For parsing the appended bytes
+import logging  # For reporting reloads and failures
+import os  # For the file size and modification time
+import threading  # For the polling thread
+
+import pandas as pd  # For parsing the appended rows
+import aggregates  # Aggregate cube over the quality combinations
+import diamond_analysis as da  # Shared analysis logic
+
+# Bytes before the end of the previously read data that must be unchanged for an append
+CHECK_BYTES = 4096
+# Seconds between checks of the file, 0 turns the watcher off
+INTERVAL_ENV_VAR = 'DIAMONDS_RELOAD_INTERVAL'
+DEFAULT_INTERVAL = 5.0
+
+logger = logging.getLogger('diamonds.reload')
+
+
+def interval_from_env():
+    """
+    Polling interval from DIAMONDS_RELOAD_INTERVAL.
+    Returns:
+        float: Seconds between checks, 0 if the file should not be watched
+    """
+    return float(os.environ.get(INTERVAL_ENV_VAR, DEFAULT_INTERVAL))
+
+
+class SnapshotWatcher:
+    """
+    Keeps a warm-up snapshot (see warmup.py) of a data source current.
+
+    The snapshot in use is always `watcher.current`. Read it once per script run, so
+    the whole run uses the same consistent data. Subclasses implement check().
+    """
+
+    def __init__(self, start_snapshot, interval=DEFAULT_INTERVAL, precomputed=None):
+        """
+        Start the first snapshot and, if interval > 0, the polling thread.
+        Args:
+            start_snapshot (callable): Called with a dict of precomputed task results
+                (empty for a full load), returns a started warmup.TaskGraph
+            interval (float): Seconds between checks, 0 to not watch the source
+            precomputed (dict): Precomputed task results for the first snapshot
+        """
+        self.start_snapshot = start_snapshot
+        self.interval = interval
+        self.version = 1
+        self.current = start_snapshot(precomputed or {})
+        self._stop = threading.Event()
+        if interval > 0:
+            threading.Thread(target=self._poll, name='data-watcher', daemon=True).start()
+
+    def _poll(self):
+        """
+        Check the source until stop() is called. Errors are logged and the old data kept.
+        """
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Reloading the data failed, keeping the current data")
+
+    def stop(self):
+        """
+        Stop watching the source.
+        """
+        self._stop.set()
+
+    def check(self):
+        """
+        Reload the data if the source has changed.
+        Returns:
+            str: 'unchanged', 'appended' or 'reloaded'
+        """
+        raise NotImplementedError
+
+    def _append_rows(self, new_rows, dataset, cube, fences=None):
+        """
+        Start a snapshot with rows added, reusing what can be updated incrementally.
+        Args:
+            new_rows (pandas.DataFrame): The added rows
+            dataset (pandas.DataFrame): The dataset including the new rows
+            cube (dict): The aggregate cube including the new rows
+            fences (pandas.DataFrame): The outlier fences including the new rows, if known
+        """
+        old = self.current
+        precomputed = {
+            'dataset': dataset,
+            'cube': cube,
+            'reference_stats': da.update_reference_stats(old.result('reference_stats'), dataset, new_rows),
+        }
+        if fences is not None:
+            precomputed['fences'] = fences
+        self._swap(self.start_snapshot(precomputed))
+
+    def _swap(self, snapshot):
+        """
+        Wait until every task of the new snapshot is done, then put it in use.
+        If a task fails, the exception is raised and the current snapshot kept.
+        """
+        snapshot.wait()
+        self.current = snapshot
+        self.version += 1
+
+
+class DataWatcher(SnapshotWatcher):
+    """
+    Keeps the snapshot of a CSV file current.
+    """
+
+    def __init__(self, path, start_snapshot, interval=DEFAULT_INTERVAL):
+        """
+        Args:
+            path (str or Path): The CSV file to watch
+            start_snapshot (callable): See SnapshotWatcher
+            interval (float): Seconds between checks, 0 to not watch the file
+        """
+        self.path = path
+        self._read_state()
+        super().__init__(start_snapshot, interval)
+
+    def _read_state(self):
+        """
+        Remember how much of the file has been read: the offset of the end of the last
+        complete line, the number of data rows, the column names and a fingerprint.
+        """
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        self.offset = data.rfind(b'\n') + 1
+        self.columns = pd.read_csv(io.BytesIO(data[:self.offset]), nrows=0).columns.tolist()
+        self.raw_rows = data.count(b'\n', 0, self.offset) - 1
+        # An unterminated last line may still be written, so then any change reloads the whole file
+        self.fingerprint = self._fingerprint(data[:self.offset]) if data.endswith(b'\n') else None
+        stat = os.stat(self.path)
+        self.stat = (stat.st_size, stat.st_mtime_ns)
+
+    @staticmethod
+    def _fingerprint(data):
+        """
+        Hash of the end of the read data, used to check that the old content is unchanged.
+        """
+        return hashlib.sha1(data[-CHECK_BYTES:]).hexdigest()
+
+    def check(self):
+        """
+        Reload the file if it has changed.
+        Returns:
+            str: 'unchanged', 'appended' or 'reloaded'
+        """
+        stat = os.stat(self.path)
+        if (stat.st_size, stat.st_mtime_ns) == self.stat:
+            return 'unchanged'
+        with open(self.path, 'rb') as f:
+            head = f.read(self.offset)
+            tail = f.read()
+        if len(head) == self.offset and self._fingerprint(head) == self.fingerprint:
+            # Only complete lines are read, a line still being written is read next time
+            tail = tail[:tail.rfind(b'\n') + 1]
+            if tail:
+                self._append(head, tail)
+            self.stat = (stat.st_size, stat.st_mtime_ns)
+            return 'appended'
+        self._reload()
+        return 'reloaded'
+
+    def _append(self, head, tail):
+        """
+        Add appended rows to the data and update the derived state incrementally.
+        """
+        raw = pd.read_csv(io.BytesIO(tail), header=None, names=self.columns)
+        # Index the rows by their position in the file, like a full load would
+        raw.index = pd.RangeIndex(self.raw_rows, self.raw_rows + len(raw))
+        new_rows = da.clean_data(raw)
+
+        old = self.current
+        self._append_rows(new_rows, pd.concat([old.result('dataset'), new_rows]),
+                          aggregates.merge_cubes(old.result('cube'), aggregates.build_cube(new_rows)))
+        self.offset += len(tail)
+        self.raw_rows += len(raw)
+        self.fingerprint = self._fingerprint(head + tail)
+        logger.info("Appended %d rows from %s (version %d)", len(new_rows), self.path, self.version)
+
+    def _reload(self):
+        """
+        Load the whole file again, e.g. after rows were changed or removed.
+        """
+        self._read_state()
+        try:
+            self._swap(self.start_snapshot({}))
+        except Exception:
+            # Try again at the next check
+            self.stat = None
+            raise
+        logger.info("Reloaded %s (version %d)", self.path, self.version)
+
+
+class StoreWatcher(SnapshotWatcher):
+    """
+    Keeps the snapshot of a columnar store current. New partitions are read on their
+    own and the store's aggregate cube is used as it is, since the ingestion already
+    merged the new rows into it. The outlier fences come from the store's merged
+    sketches, so their cost does not grow with the history either.
+    """
+
+    def __init__(self, store, start_snapshot, interval=DEFAULT_INTERVAL):
+        """
+        Args:
+            store (columnar_store.ColumnarStore): The store to watch
+            start_snapshot (callable): See SnapshotWatcher
+            interval (float): Seconds between checks, 0 to not watch the store
+        """
+        self.store = store
+        self.manifest = store.manifest()
+        super().__init__(start_snapshot, interval, precomputed=self._load(self.manifest))
+
+    def _load(self, manifest):
+        """
+        The dataset, cube and outlier fences of a version of the store.
+        """
+        totals = self.store.aggregates(manifest)
+        return {'dataset': self.store.read_frame(manifest), 'cube': totals,
+                'fences': aggregates.sketch_fences(totals)}
+
+    def check(self):
+        """
+        Reload the data if the store has a new version.
+        Returns:
+            str: 'unchanged', 'appended' or 'reloaded'
+        """
+        manifest = self.store.manifest()
+        if manifest['version'] == self.manifest['version']:
+            return 'unchanged'
+        known = [p['name'] for p in self.manifest['partitions']]
+        names = [p['name'] for p in manifest['partitions']]
+        if names[:len(known)] == known and manifest['categories'] == self.manifest['categories']:
+            new_rows = self.store.read_partitions(names[len(known):], manifest)
+            dataset = pd.concat([self.current.result('dataset'), new_rows], ignore_index=True)
+            totals = self.store.aggregates(manifest)
+            self._append_rows(new_rows, dataset, totals, aggregates.sketch_fences(totals))
+            result = 'appended'
+        else:
+            # Rewritten partitions or new categories
+            self._swap(self.start_snapshot(self._load(manifest)))
+            result = 'reloaded'
+        self.manifest = manifest
+        logger.info("Store %s %s (version %d)", self.store.directory, result, self.version)
+        return result
@@ -0,0 +1,446 @@
+# Import required libraries
+import pandas as pd  # For data manipulation and analysis
+import numpy as np  # For numerical operations
+from pathlib import Path  # For handling file paths
+
+# Path to the bundled dataset
+DATA_PATH = Path(__file__).parent / 'diamonds_dataset' / 'diamonds.csv'
+
+# Order of the quality categories from best to worst
+CUT_ORDER = ["Ideal", "Premium", "Very Good", "Good", "Fair"]
+COLOR_ORDER = ["D", "E", "F", "G", "H", "I", "J"]
+CLARITY_ORDER = ["IF", "VVS1", "VVS2", "VS1", "VS2", "SI1", "SI2", "I1"]
+CATEGORY_ORDERS = {'cut': CUT_ORDER, 'color': COLOR_ORDER, 'clarity': CLARITY_ORDER}
+
+# Numerical columns used in the correlation and outlier analyses
+NUMERICAL_COLS = ['price', 'carat', 'depth', 'table', 'x', 'y', 'z']
+# Columns checked for extreme values when appraising a candidate, in the order they are checked
+APPRAISAL_COLS = ['carat', 'price', 'depth', 'table', 'x', 'y', 'z']
+# Geometric consistency checks of the dimensions, in the order of their bit in geometry_issues().
+# For a round brilliant the stated depth is the height over the mean diameter, 2z/(x+y),
+# the weight follows from the volume x*y*z, and length and width are about equal.
+GEOMETRY_CHECKS = ['depth', 'density', 'symmetry']
+# Largest difference in percentage points between the stated depth and 2z/(x+y)
+DEPTH_TOLERANCE = 2.0
+# Carat per mm³ of x*y*z for a round brilliant, and the largest relative deviation from it
+CARAT_PER_MM3 = 0.0061
+DENSITY_TOLERANCE = 0.2
+# Largest ratio between the longer and the shorter of x and y
+SYMMETRY_LIMIT = 1.1
+# Rows checked at a time, so the intermediate arrays stay in the CPU cache
+GEOMETRY_BLOCK = 16384
+# Description of each failed check in the appraisal motivation
+GEOMETRY_PROBLEMS = {'depth': "djupet stämmer inte med 2z/(x+y)",
+                     'density': "vikten stämmer inte med volymen x·y·z",
+                     'symmetry': "längd och bredd skiljer sig för mycket"}
+
+
+def load_data(path=DATA_PATH):
+    """
+    Load the diamonds dataset from CSV file.
+    Args:
+        path (str or Path): Path to the CSV file, defaults to the bundled dataset
+    Returns:
+        pandas.DataFrame: The loaded diamonds dataset
+    """
+    return clean_data(pd.read_csv(path))
+
+
+def clean_data(df):
+    """
+    Remove invalid rows from raw diamonds data, e.g. rows appended to the CSV.
+    Args:
+        df (pandas.DataFrame): Raw rows as read from the CSV
+    Returns:
+        pandas.DataFrame: The valid rows
+    """
+    # Remove rows where any of the dimensions x, y, or z are 0 (physically impossible for a diamond)
+    zero_mask = (df[['x', 'y', 'z']] == 0).any(axis=1)
+    df = df[~zero_mask].copy()
+
+    return df
+
+
+def basic_stats(df):
+    """
+    Overall size and averages of the dataset (section 3).
+    Returns:
+        dict: Number of diamonds, mean price and mean carat
+    """
+    return {
+        'count': int(len(df)),
+        'mean_price': float(df['price'].mean()),
+        'mean_carat': float(df['carat'].mean()),
+    }
+
+
+def category_counts(df, col):
+    """
+    Number of diamonds per quality category, ordered from best to worst (section 5).
+    Categories outside the known order are left out.
+    Returns:
+        pandas.Series: Count per category
+    """
+    order = CATEGORY_ORDERS[col]
+    # Counted from the category codes, where missing and unknown values are -1
+    codes = pd.Categorical(df[col], categories=order).codes
+    return pd.Series(np.bincount(codes[codes >= 0], minlength=len(order)), index=pd.Index(order, name=col),
+                     name='count')
+
+
+def mean_median_by(df, col, value_col):
+    """
+    Mean and median of a value per quality category, ordered from best to worst (section 6).
+    Returns:
+        tuple: (mean, median) as pandas.Series indexed by category
+    """
+    order = CATEGORY_ORDERS[col]
+    grouped = df.groupby(col, observed=True)[value_col]
+    return grouped.mean().reindex(order), grouped.median().reindex(order)
+
+
+def correlation_matrix(df):
+    """
+    Correlation matrix for the numerical columns (section 8).
+    Returns:
+        pandas.DataFrame: Pairwise correlations
+    """
+    return df[NUMERICAL_COLS].corr()
+
+
+def outlier_fences(df, cols=NUMERICAL_COLS):
+    """
+    Lower and upper IQR fences (1.5 * IQR outside the quartiles) per column.
+    Returns:
+        pandas.DataFrame: Columns 'low' and 'high' indexed by column name
+    """
+    quartiles = df[cols].quantile([0.25, 0.75])
+    iqr = quartiles.loc[0.75] - quartiles.loc[0.25]
+    return pd.DataFrame({'low': quartiles.loc[0.25] - 1.5 * iqr,
+                         'high': quartiles.loc[0.75] + 1.5 * iqr})
+
+
+def outlier_counts(df, fences=None):
+    """
+    Number of extreme values per numerical column (section 9).
+    Args:
+        df (pandas.DataFrame): The diamonds dataset
+        fences (pandas.DataFrame): Precomputed output of outlier_fences(df), computed if not given
+    Returns:
+        dict: Count of values outside the IQR fences per column
+    """
+    if fences is None:
+        fences = outlier_fences(df)
+    return {col: int(((df[col] < fences.at[col, 'low']) | (df[col] > fences.at[col, 'high'])).sum())
+            for col in NUMERICAL_COLS}
+
+
+def missing_counts(df):
+    """
+    Number of missing values per column (section 9).
+    Returns:
+        pandas.Series: Count of missing values per column
+    """
+    return df.isnull().sum()
+
+
+def geometry_issues(carat, depth, x, y, z):
+    """
+    Check that the dimensions of diamonds agree with their depth and weight, vectorized
+    over arrays. Missing values pass the checks they are part of.
+    Args:
+        carat, depth, x, y, z (array-like): Measurements of each diamond
+    Returns:
+        numpy.ndarray: uint8 per diamond with bit i set if GEOMETRY_CHECKS[i] failed, 0 if consistent
+    """
+    carat, depth, x, y, z = (np.asarray(v, dtype=float) for v in (carat, depth, x, y, z))
+    flags = np.empty(len(x), dtype=np.uint8)
+    # The rows are checked in blocks that fit in the CPU cache, with the intermediate
+    # results written into the same few buffers, and compared without dividing
+    a, b = np.empty(GEOMETRY_BLOCK), np.empty(GEOMETRY_BLOCK)
+    failed = np.empty(GEOMETRY_BLOCK, dtype=bool)
+    for start in range(0, len(x), GEOMETRY_BLOCK):
+        rows = slice(start, start + GEOMETRY_BLOCK)
+        xs, ys, zs, out = x[rows], y[rows], z[rows], flags[rows]
+        n = len(xs)
+        a_, b_, failed_ = a[:n], b[:n], failed[:n]
+        # Depth: |200z - depth * (x + y)| > tolerance * (x + y)
+        np.add(xs, ys, out=a_)
+        np.multiply(depth[rows], a_, out=b_)
+        b_ -= 200 * zs
+        np.abs(b_, out=b_)
+        a_ *= DEPTH_TOLERANCE
+        np.greater(b_, a_, out=failed_)
+        out[:] = failed_
+        # Density: |carat - k * x * y * z| > tolerance * k * x * y * z
+        np.multiply(xs, ys, out=a_)
+        a_ *= zs
+        a_ *= CARAT_PER_MM3
+        np.subtract(carat[rows], a_, out=b_)
+        np.abs(b_, out=b_)
+        a_ *= DENSITY_TOLERANCE
+        np.greater(b_, a_, out=failed_)
+        out |= failed_.view(np.uint8) << 1
+        # Symmetry: max(x, y) > limit * min(x, y)
+        np.maximum(xs, ys, out=a_)
+        np.minimum(xs, ys, out=b_)
+        b_ *= SYMMETRY_LIMIT
+        np.greater(a_, b_, out=failed_)
+        out |= failed_.view(np.uint8) << 2
+    return flags
+
+
+def geometry_flags(df):
+    """
+    Geometric consistency flags of every diamond in a dataset (see geometry_issues()).
+    Returns:
+        numpy.ndarray: Bit flags per row
+    """
+    return geometry_issues(*(df[col].to_numpy(dtype=float) for col in ['carat', 'depth', 'x', 'y', 'z']))
+
+
+def geometry_counts(flags):
+    """
+    Number of diamonds failing each geometric check (section 9).
+    Args:
+        flags (numpy.ndarray): Output of geometry_flags()
+    Returns:
+        dict: Count per check in GEOMETRY_CHECKS, and 'any' for diamonds failing at least one
+    """
+    counts = {check: int(np.count_nonzero(flags & (1 << bit))) for bit, check in enumerate(GEOMETRY_CHECKS)}
+    counts['any'] = int(np.count_nonzero(flags))
+    return counts
+
+
+def price_std_by_carat_group(df):
+    """
+    Price variation for light and heavy diamonds, split at the median carat (section 10).
+    Returns:
+        pandas.Series: Standard deviation of price per weight group
+    """
+    carat_median = df['carat'].median()
+    carat_group = np.where(df['carat'] <= carat_median, 'Låg vikt', 'Hög vikt')
+    return df.groupby(carat_group)['price'].std()
+
+
+def filter_diamonds(df, cuts=None, colors=None, clarities=None, ranges=None):
+    """
+    Select the diamonds matching the interactive filters (section 11).
+    Args:
+        df (pandas.DataFrame): The diamonds dataset
+        cuts, colors, clarities (list): Selected categories, an empty selection means all
+        ranges (dict): Inclusive (min, max) range per numerical column
+    Returns:
+        pandas.DataFrame: The matching diamonds
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for col, selected in [('cut', cuts), ('color', colors), ('clarity', clarities)]:
+        if selected:
+            mask &= df[col].isin(selected).to_numpy()
+    for col, (low, high) in (ranges or {}).items():
+        values = df[col].to_numpy()
+        mask &= (values >= low) & (values <= high)
+    return df[mask]
+
+
+def get_reference_stats(df):
+    """
+    Reference values for price per carat per quality combination (section 12).
+    Returns:
+        pandas.DataFrame: Median price and carat and their ratio per (cut, color, clarity)
+    """
+    ref = df.groupby(['cut', 'color', 'clarity'], observed=True)[['price', 'carat']].median().reset_index()
+    ref['price_per_carat'] = ref['price'] / ref['carat']
+    return ref
+
+
+def update_reference_stats(reference_stats, df, new_rows):
+    """
+    Update the reference values after rows were added to the dataset. Only the quality
+    combinations of the new rows are recomputed; the result equals get_reference_stats(df).
+    Args:
+        reference_stats (pandas.DataFrame): Output of get_reference_stats() before the rows were added
+        df (pandas.DataFrame): The dataset including the new rows
+        new_rows (pandas.DataFrame): The added rows
+    Returns:
+        pandas.DataFrame: The updated reference values
+    """
+    keys = ['cut', 'color', 'clarity']
+    touched = pd.MultiIndex.from_frame(new_rows[keys].dropna().drop_duplicates().astype(str))
+    in_touched = pd.MultiIndex.from_frame(df[keys].astype(str)).isin(touched)
+    kept = reference_stats[~pd.MultiIndex.from_frame(reference_stats[keys].astype(str)).isin(touched)]
+    updated = get_reference_stats(df[in_touched])
+    return pd.concat([kept, updated]).sort_values(keys).reset_index(drop=True)
+
+
+def geometry_motivation(flags):
+    """
+    Motivation of an appraisal that failed the geometric checks.
+    Args:
+        flags (int): Bit flags from geometry_issues(), not 0
+    Returns:
+        str: The motivation, naming the failed checks
+    """
+    problems = [GEOMETRY_PROBLEMS[check] for bit, check in enumerate(GEOMETRY_CHECKS) if flags & (1 << bit)]
+    return f"Måtten är inte förenliga: {', '.join(problems)}. Kontrollera mätningen innan köp."
+
+
+def should_buy_diamond(carat, cut, color, clarity, price, depth, table, x, y, z, df, reference_stats, fences=None,
+                       price_curves=None):
+    """
+    Recommend whether to buy a single diamond (section 12).
+    Args:
+        fences (pandas.DataFrame): Precomputed output of outlier_fences(df), computed if not given
+        price_curves (price_curves.PriceCurveIndex): If given, the price per carat is compared
+            against the median for the quality at the diamond's carat instead of reference_stats
+    Returns:
+        tuple: Decision ("Ja"/"Nej") and the motivation
+    """
+    # Grundläggande kontroller
+    if carat <= 0 or price <= 0 or x <= 0 or y <= 0 or z <= 0:
+        return ("Nej", "Ogiltiga värden: carat, pris och dimensioner måste vara större än 0.")
+    # Kontrollera om egenskaperna är extremvärden
+    if fences is None:
+        fences = outlier_fences(df, APPRAISAL_COLS)
+    for col, val in zip(APPRAISAL_COLS, [carat, price, depth, table, x, y, z]):
+        if val < fences.at[col, 'low'] or val > fences.at[col, 'high']:
+            return ("Nej", f"{col}={val} är ett extremvärde jämfört med marknaden. Undvik köp utan manuell granskning.")
+    # Kontrollera att måtten stämmer med djup och vikt
+    flags = int(geometry_issues([carat], [depth], [x], [y], [z])[0])
+    if flags:
+        return ("Nej", geometry_motivation(flags))
+    # Jämför pris per carat mot referens för denna kvalitet
+    if price_curves is not None:
+        ref_ppc = price_curves.median([cut], [color], [clarity], [carat])[0]
+        quality = "denna kvalitet och vikt"
+    else:
+        ref_row = reference_stats[(reference_stats['cut']==cut) & (reference_stats['color']==color) & (reference_stats['clarity']==clarity)]
+        ref_ppc = ref_row.iloc[0]['price_per_carat'] if not ref_row.empty else np.nan
+        quality = "denna kvalitet"
+    if not np.isnan(ref_ppc):
+        ppc = price / carat
+        if ppc > ref_ppc * 1.2:
+            return ("Nej", f"Priset per carat ({ppc:.0f} USD) är mer än 20% högre än medianen för {quality} ({ref_ppc:.0f} USD). Undvik köp.")
+        elif ppc < ref_ppc * 0.7:
+            return ("Ja", f"Priset per carat ({ppc:.0f} USD) är lågt jämfört med marknaden för {quality}. Möjligt fynd!")
+        else:
+            return ("Ja", f"Priset per carat ({ppc:.0f} USD) är rimligt för {quality}.")
+    else:
+        return ("Nej", "Kombinationen av cut, color och clarity är ovanlig i marknaden. Kräver manuell granskning.")
+
+
+def appraise_batch(candidates, df, reference_stats, fences=None, price_curves=None):
+    """
+    Vectorized version of should_buy_diamond for many candidates at once.
+    The checks are applied in the same order and give the same decisions and motivations.
+    Args:
+        candidates (pandas.DataFrame): Candidates with carat, cut, color, clarity, price, depth, table, x, y, z
+        df (pandas.DataFrame): Market data used for the extreme value fences
+        reference_stats (pandas.DataFrame): Output of get_reference_stats()
+        fences (pandas.DataFrame): Precomputed output of outlier_fences(df), computed if not given
+        price_curves (price_curves.PriceCurveIndex): If given, compare against the median for
+            the quality at each candidate's carat instead of reference_stats
+    Returns:
+        pandas.DataFrame: Columns 'decision' and 'motivation' aligned with the candidates
+    """
+    n = len(candidates)
+    decision = np.empty(n, dtype=object)
+    motivation = np.empty(n, dtype=object)
+    pending = np.ones(n, dtype=bool)
+
+    # Grundläggande kontroller
+    invalid = ((candidates[['carat', 'price', 'x', 'y', 'z']] <= 0).any(axis=1)).to_numpy()
+    decision[invalid] = "Nej"
+    motivation[invalid] = "Ogiltiga värden: carat, pris och dimensioner måste vara större än 0."
+    pending &= ~invalid
+
+    # Kontrollera extremvärden kolumn för kolumn, i samma ordning som should_buy_diamond
+    if fences is None:
+        fences = outlier_fences(df, APPRAISAL_COLS)
+    for col in APPRAISAL_COLS:
+        values = candidates[col].to_numpy(dtype=float)
+        extreme = pending & ((values < fences.at[col, 'low']) | (values > fences.at[col, 'high']))
+        decision[extreme] = "Nej"
+        motivation[extreme] = [f"{col}={val} är ett extremvärde jämfört med marknaden. Undvik köp utan manuell granskning."
+                               for val in candidates[col].to_numpy()[extreme]]
+        pending &= ~extreme
+
+    # Kontrollera att måtten stämmer med djup och vikt
+    flags = geometry_flags(candidates)
+    inconsistent = pending & (flags > 0)
+    decision[inconsistent] = "Nej"
+    motivation[inconsistent] = [geometry_motivation(int(f)) for f in flags[inconsistent]]
+    pending &= ~inconsistent
+
+    # Jämför pris per carat mot referens för denna kvalitet
+    if price_curves is not None:
+        ref_ppc = price_curves.median(candidates['cut'], candidates['color'], candidates['clarity'],
+                                      candidates['carat'].to_numpy(dtype=float))
+        quality = "denna kvalitet och vikt"
+    else:
+        ref_ppc = candidates[['cut', 'color', 'clarity']].merge(
+            reference_stats[['cut', 'color', 'clarity', 'price_per_carat']].drop_duplicates(['cut', 'color', 'clarity']),
+            on=['cut', 'color', 'clarity'], how='left')['price_per_carat'].to_numpy()
+        quality = "denna kvalitet"
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ppc = candidates['price'].to_numpy(dtype=float) / candidates['carat'].to_numpy(dtype=float)
+
+    unknown = pending & np.isnan(ref_ppc)
+    decision[unknown] = "Nej"
+    motivation[unknown] = "Kombinationen av cut, color och clarity är ovanlig i marknaden. Kräver manuell granskning."
+    pending &= ~unknown
+
+    expensive = pending & (ppc > ref_ppc * 1.2)
+    decision[expensive] = "Nej"
+    motivation[expensive] = [f"Priset per carat ({p:.0f} USD) är mer än 20% högre än medianen för {quality} ({r:.0f} USD). Undvik köp."
+                             for p, r in zip(ppc[expensive], ref_ppc[expensive])]
+    pending &= ~expensive
+
+    bargain = pending & (ppc < ref_ppc * 0.7)
+    decision[bargain] = "Ja"
+    motivation[bargain] = [f"Priset per carat ({p:.0f} USD) är lågt jämfört med marknaden för {quality}. Möjligt fynd!"
+                           for p in ppc[bargain]]
+    pending &= ~bargain
+
+    decision[pending] = "Ja"
+    motivation[pending] = [f"Priset per carat ({p:.0f} USD) är rimligt för {quality}." for p in ppc[pending]]
+
+    return pd.DataFrame({'decision': decision, 'motivation': motivation}, index=candidates.index)
+
+
+def section_stats(df):
+    """
+    Collect the statistics behind every dashboard section as plain Python values.
+    Sections 1, 2 and 13 are text only and sections 11 and 12 depend on user input,
+    so they are not included.
+    Returns:
+        dict: Statistics keyed by section name, ready for JSON serialization
+    """
+    def to_dict(series):
+        # Convert to plain floats and replace NaN (empty categories) with None
+        return {str(k): (None if pd.isna(v) else float(v)) for k, v in series.items()}
+
+    stats = {
+        '3_grundlaggande_statistik': basic_stats(df),
+        '4_prisanalys': to_dict(df['price'].describe()),
+        '5_kvalitetsattribut': {col: {k: int(v) for k, v in category_counts(df, col).items()}
+                                for col in CATEGORY_ORDERS},
+        '6_prisfordelning_per_kvalitetsattribut': {},
+        '7_samband_mellan_vikt_och_pris': {
+            'carat': to_dict(df['carat'].describe()),
+            'price_per_carat_median': float((df['price'] / df['carat']).median()),
+        },
+        '8_korrelationer': {col: to_dict(row) for col, row in correlation_matrix(df).iterrows()},
+        '9_extremvarden_och_saknade_varden': {
+            'outliers': outlier_counts(df),
+            'missing': {k: int(v) for k, v in missing_counts(df).items()},
+            'geometry': geometry_counts(geometry_flags(df)),
+        },
+        '10_hypotesprovningar': to_dict(price_std_by_carat_group(df)),
+    }
+    for col in CATEGORY_ORDERS:
+        for value_col in ['price', 'carat']:
+            mean, median = mean_median_by(df, col, value_col)
+            stats['6_prisfordelning_per_kvalitetsattribut'][f'{value_col}_per_{col}'] = {
+                'mean': to_dict(mean), 'median': to_dict(median)}
+    return stats
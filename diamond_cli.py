@@ -0,0 +1,268 @@
+# Import required libraries
+import argparse  # For parsing command-line arguments
+import json  # For writing JSON output
+import subprocess  # For timing imports in a fresh interpreter
+import sys  # For writing to standard output
+from pathlib import Path  # For handling file paths
+import pandas as pd  # For data manipulation and analysis
+import diamond_analysis as da  # Shared analysis logic, without any Streamlit dependency
+import price_curves  # Price-per-carat curves the candidates are compared against
+
+# Number of candidate rows read and appraised at a time
+CHUNK_SIZE = 10000
+
+
+def open_output(path):
+    """
+    Open the output destination, where '-' means standard output.
+    Returns:
+        file: A text file object
+    """
+    if path == '-':
+        return sys.stdout
+    return open(path, 'w', encoding='utf-8')
+
+
+def appraise_chunks(candidates_path, df, reference_stats, comparables=0, chunk_size=CHUNK_SIZE):
+    """
+    Read a candidate CSV in chunks and appraise each chunk.
+    Args:
+        candidates_path (str): CSV file with one candidate diamond per row
+        df (pandas.DataFrame): Market data
+        reference_stats (pandas.DataFrame): Output of da.get_reference_stats()
+        comparables (int): If above 0, add the median price of this many comparable diamonds
+        chunk_size (int): Number of rows per chunk
+    Yields:
+        pandas.DataFrame: The candidates of one chunk with 'decision' and 'motivation' columns
+    """
+    curves = price_curves.PriceCurveIndex(df)
+    index = None
+    if comparables > 0:
+        from comparables import ComparablesIndex  # Only needed when comparables are requested
+        index = ComparablesIndex(df)
+
+    # Fixed numeric types keep the columns consistent between chunks
+    dtypes = {col: float for col in da.APPRAISAL_COLS}
+    for chunk in pd.read_csv(candidates_path, chunksize=chunk_size, dtype=dtypes):
+        result = chunk.join(da.appraise_batch(chunk, df, reference_stats, price_curves=curves))
+        if index is not None:
+            matches = index.query(chunk, k=comparables)
+            result['comparables_median_price'] = matches.groupby('candidate')['price'].median()
+        yield result
+
+
+def write_jsonl(chunks, out):
+    """
+    Write appraised rows as JSON Lines, one row at a time, so output starts immediately.
+    """
+    for chunk in chunks:
+        for record in chunk.to_dict(orient='records'):
+            # Missing values are written as null
+            record = {key: (None if pd.isna(value) else value) for key, value in record.items()}
+            out.write(json.dumps(record, ensure_ascii=False, default=str))
+            out.write('\n')
+        out.flush()
+
+
+def write_parquet(chunks, path):
+    """
+    Write appraised rows to a Parquet file, one row group per chunk.
+    """
+    import pyarrow as pa  # Optional dependency, only needed for Parquet output
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, schema=writer.schema if writer else None, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_csv(chunks, path):
+    """
+    Write chunks to one CSV file in the layout of the bundled dataset.
+    """
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, header=(i == 0))
+
+
+def stats_to_frame(stats):
+    """
+    Flatten the nested section statistics into a long table for Parquet output.
+    Returns:
+        pandas.DataFrame: Columns 'section', 'metric' and 'value'
+    """
+    rows = []
+
+    def walk(section, prefix, value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                walk(section, f'{prefix}.{key}' if prefix else str(key), item)
+        else:
+            rows.append({'section': section, 'metric': prefix, 'value': value})
+
+    for section, value in stats.items():
+        walk(section, '', value)
+    return pd.DataFrame(rows)
+
+
+def cmd_appraise(args):
+    """
+    Appraise every diamond in a candidate CSV.
+    """
+    df = da.load_data(args.data)
+    reference_stats = da.get_reference_stats(df)
+    chunks = appraise_chunks(args.candidates, df, reference_stats, args.comparables, args.chunk_size)
+    if args.format == 'parquet':
+        if args.output == '-':
+            raise SystemExit("Parquet output needs a file path (--output).")
+        write_parquet(chunks, args.output)
+    else:
+        out = open_output(args.output)
+        try:
+            write_jsonl(chunks, out)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+
+def cmd_stats(args):
+    """
+    Dump the statistics behind the dashboard sections.
+    """
+    stats = da.section_stats(da.load_data(args.data))
+    if args.format == 'parquet':
+        if args.output == '-':
+            raise SystemExit("Parquet output needs a file path (--output).")
+        stats_to_frame(stats).astype({'value': float}).to_parquet(args.output, index=False)
+    else:
+        out = open_output(args.output)
+        try:
+            json.dump(stats, out, indent=2, ensure_ascii=False)
+            out.write('\n')
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+
+def cmd_generate(args):
+    """
+    Generate a synthetic dataset fitted on the market data.
+    """
+    from synthetic_data import SyntheticDiamondModel, generate_chunks
+    model = SyntheticDiamondModel(da.load_data(args.data))
+    chunks = generate_chunks(model, args.rows, args.chunk_size, args.seed)
+    if args.format == 'parquet':
+        write_parquet(chunks, args.output)
+    else:
+        write_csv(chunks, args.output)
+
+
+def cmd_ingest(args):
+    """
+    Append delta CSV files to a columnar store as new partitions.
+    """
+    from columnar_store import ColumnarStore
+    import aggregates
+    store = ColumnarStore(args.store)
+    for path in args.deltas:
+        entry = store.ingest_csv(path)
+        print(f"{path}: {entry['rows']:,} diamonds added as {entry['name']} ({entry['partitions']} partitions)")
+    totals = aggregates.totals(store.aggregates())
+    print(f"Store {args.store}: {totals['count']:,} diamonds, mean price ${totals['mean_price']:,.2f}")
+
+
+def import_times(module):
+    """
+    Import a module in a fresh interpreter with `python -X importtime` and sum the
+    import time per top-level package.
+    Args:
+        module (str): Name of the module to import, e.g. 'part2_data_analysis'
+    Returns:
+        dict: Import time in milliseconds per top-level package, largest first
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, cwd=Path(__file__).parent)
+    totals = {}
+    for line in result.stderr.splitlines():
+        # Lines look like "import time:       120 |        480 |   plotly.express"
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        # Self times add up without counting nested imports twice
+        totals[package] = totals.get(package, 0.0) + int(self_us) / 1000
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def cmd_import_times(args):
+    """
+    Print a startup timing report for a module.
+    """
+    totals = import_times(args.module)
+    total = sum(totals.values())
+    print(f"Import time for {args.module}: {total:.0f} ms")
+    for package, ms in list(totals.items())[:args.top]:
+        print(f"{package:<30} {ms:>9.1f} ms {100 * ms / total:>5.1f} %")
+
+
+def build_parser():
+    """
+    Create the argument parser for the command-line interface.
+    Returns:
+        argparse.ArgumentParser: The parser
+    """
+    parser = argparse.ArgumentParser(description="Headless diamond analysis for Guldfynd.")
+    parser.add_argument('--data', default=da.DATA_PATH, help="Market dataset (CSV), defaults to the bundled dataset")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    appraise = subparsers.add_parser('appraise', help="Appraise the diamonds in a candidate CSV")
+    appraise.add_argument('candidates', help="CSV with carat, cut, color, clarity, price, depth, table, x, y, z")
+    appraise.add_argument('--output', '-o', default='-', help="Output file, '-' for standard output")
+    appraise.add_argument('--format', choices=['jsonl', 'parquet'], default='jsonl')
+    appraise.add_argument('--comparables', type=int, default=0,
+                          help="Add the median price of this many comparable market diamonds")
+    appraise.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    appraise.set_defaults(func=cmd_appraise)
+
+    stats = subparsers.add_parser('stats', help="Dump the statistics behind the dashboard sections")
+    stats.add_argument('--output', '-o', default='-', help="Output file, '-' for standard output")
+    stats.add_argument('--format', choices=['json', 'parquet'], default='json')
+    stats.set_defaults(func=cmd_stats)
+
+    generate = subparsers.add_parser('generate', help="Generate a synthetic dataset of any size")
+    generate.add_argument('rows', type=int, help="Number of diamonds")
+    generate.add_argument('--output', '-o', required=True, help="Output file")
+    generate.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    generate.add_argument('--chunk-size', type=int, default=100000, help="Diamonds generated and written at a time")
+    generate.add_argument('--seed', type=int, default=0, help="Seed for reproducible output")
+    generate.set_defaults(func=cmd_generate)
+
+    ingest = subparsers.add_parser('ingest', help="Append delta CSV files to a columnar store")
+    ingest.add_argument('deltas', nargs='+', help="CSV files with the same columns as the bundled dataset")
+    ingest.add_argument('--store', required=True, help="Store directory, created on the first ingestion")
+    ingest.set_defaults(func=cmd_ingest)
+
+    timing = subparsers.add_parser('import-times', help="Report import time per package for a cold start")
+    timing.add_argument('--module', default='part2_data_analysis', help="Module to import")
+    timing.add_argument('--top', type=int, default=15, help="Number of packages to list")
+    timing.set_defaults(func=cmd_import_times)
+    return parser
+
+
+def main(argv=None):
+    """
+    Entry point for the command-line interface.
+    """
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
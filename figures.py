@@ -0,0 +1,314 @@
+# Figure builders for the dashboard.
+# Plotly is imported inside each builder, so importing this module is cheap and
+# code paths that never draw a figure never pay for loading plotly.
+
+import base64  # For the binary arrays of figure JSON
+
+import numpy as np  # For binning scatter points
+from profiling import profiled_figure  # Times each figure build when profiling is on
+
+# Grid cells per axis when scatter points are binned, see bin_scatter()
+SCATTER_BINS = 300
+# Significant digits kept of the values in compact figures, see compact()
+DISPLAY_DIGITS = 6
+
+
+def load_optional_modules():
+    """
+    Import the optional modules plotly uses while building figures. plotly.io.to_json()
+    looks them up in sys.modules without importing them, so it fails if another thread
+    is still importing one. Call this before building figures in several threads.
+    """
+    try:
+        import PIL.Image  # noqa: F401
+    except ImportError:
+        pass
+
+
+@profiled_figure
+def histogram(df, x, nbins, title, labels=None):
+    """
+    Histogram of one numerical column.
+    Returns:
+        plotly.graph_objects.Figure: The figure
+    """
+    import plotly.express as px
+    return px.histogram(df, x=x, nbins=nbins, title=title, labels=labels)
+
+
+@profiled_figure
+def binned_histogram(left_edges, counts, width, x, title):
+    """
+    Histogram drawn from precomputed bins, e.g. from aggregates.rebin().
+    Returns:
+        plotly.graph_objects.Figure: The figure
+    """
+    import plotly.express as px
+    fig = px.bar(x=left_edges + width / 2, y=counts, labels={'x': x, 'y': 'count'}, title=title)
+    fig.update_traces(width=width)
+    fig.update_layout(bargap=0)
+    return fig
+
+
+@profiled_figure
+def pie(counts, title):
+    """
+    Pie chart of the share of each category, from counts per category in the order to show.
+    Only the counts are embedded in the figure, not one entry per row.
+    Args:
+        counts (pandas.Series): Count per category, e.g. from da.category_counts()
+        title (str): Chart title
+    Returns:
+        plotly.graph_objects.Figure: The figure
+    """
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Pie(labels=counts.index, values=counts.values, sort=False, direction='clockwise',
+                           hovertemplate=f'{counts.index.name}=%{{label}}<br>count=%{{value}}<extra></extra>'))
+    fig.update_layout(title=title)
+    return fig
+
+
+@profiled_figure
+def grouped_bar(categories, mean, median, mean_name, median_name, title, xaxis_title, yaxis_title):
+    """
+    Grouped bar chart with the mean and median of a value per category.
+    Returns:
+        plotly.graph_objects.Figure: The figure
+    """
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=categories, y=mean, name=mean_name))
+    fig.add_trace(go.Bar(x=categories, y=median, name=median_name))
+    fig.update_layout(barmode='group', title=title, xaxis_title=xaxis_title, yaxis_title=yaxis_title)
+    return fig
+
+
+@profiled_figure
+def scatter(df, x, y, title, labels, color=None, order=None):
+    """
+    Scatter plot of two numerical columns, optionally colored by a category.
+    Returns:
+        plotly.graph_objects.Figure: The figure
+    """
+    import plotly.express as px
+    category_orders = {color: order} if color and order else None
+    return px.scatter(df, x=x, y=y, color=color, category_orders=category_orders, title=title, labels=labels)
+
+
+@profiled_figure
+def correlation_heatmap(corr_matrix, title):
+    """
+    Heatmap of a correlation matrix.
+    Returns:
+        plotly.graph_objects.Figure: The figure
+    """
+    import plotly.express as px
+    cols = list(corr_matrix.columns)
+    fig = px.imshow(corr_matrix,
+                    labels=dict(color="Korrelation"),
+                    x=cols,
+                    y=cols,
+                    title=title,
+                    color_continuous_scale='RdBu_r',
+                    aspect='auto')
+    fig.update_layout(
+        xaxis_title="Variabler",
+        yaxis_title="Variabler"
+    )
+    return fig
+
+
+@profiled_figure
+def bar(x, y, labels, title):
+    """
+    Simple bar chart from precomputed values.
+    Returns:
+        plotly.graph_objects.Figure: The figure
+    """
+    import plotly.express as px
+    return px.bar(x=x, y=y, labels=labels, title=title)
+
+
+def _values(array):
+    """
+    Values of a trace array: a list, a numpy array or a binary array as in figure JSON.
+    """
+    if isinstance(array, dict) and 'bdata' in array:
+        return np.frombuffer(base64.b64decode(array['bdata']), dtype=array['dtype']).astype(float)
+    return np.asarray(array, dtype=float)
+
+
+def _binary(values):
+    """
+    Encode values as a 32-bit float binary array, which plotly.js reads without parsing text.
+    """
+    return {'dtype': 'f4', 'bdata': base64.b64encode(values.astype('<f4').tobytes()).decode('ascii')}
+
+
+def _narrow(values):
+    """
+    Encode numerical values as the smallest binary array that shows them unchanged:
+    whole numbers as the smallest integer type that holds them, other values, and
+    values with gaps (NaN), as 32-bit floats rounded to DISPLAY_DIGITS significant digits.
+    Returns:
+        dict: The binary array, or None if the values are empty or infinite
+    """
+    known = values[~np.isnan(values)]
+    if len(values) == 0 or not np.isfinite(known).all():
+        return None
+    if len(known) == len(values) and (known == np.round(known)).all():
+        low, high = known.min(), known.max()
+        for dtype in ('u1', 'i1', 'u2', 'i2', 'u4', 'i4'):
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return {'dtype': dtype, 'bdata': base64.b64encode(values.astype('<' + dtype).tobytes()).decode('ascii')}
+    if len(known) and np.abs(known).max() >= np.finfo('f4').max:
+        return None
+    # 32-bit floats keep about seven significant digits, more than is ever shown
+    nonzero = np.isfinite(values) & (values != 0)
+    magnitude = np.floor(np.log10(np.abs(values), where=nonzero, out=np.zeros_like(values)))
+    scale = 10.0 ** (DISPLAY_DIGITS - 1 - magnitude)
+    return _binary(np.round(values * scale) / scale)
+
+
+def compact(fig):
+    """
+    Figure JSON that is quick to send to the browser: every numerical trace array is
+    a binary array of the smallest exact type (see _narrow()), e.g. prices as 16-bit
+    integers instead of 64-bit floats, and customdata that no hover text or template
+    refers to is left out. The figure is built once, so drawing it again only encodes
+    the arrays that are already binary.
+    Args:
+        fig (plotly.graph_objects.Figure or dict): The figure, or its JSON as a dict
+    Returns:
+        plotly.graph_objects.Figure: The compact figure
+    """
+    import plotly.graph_objects as go
+    fig = fig if isinstance(fig, dict) else fig.to_plotly_json()
+    data = []
+    for trace in fig.get('data', []):
+        trace = dict(trace)
+        if 'customdata' in trace and 'customdata' not in str(trace.get('hovertemplate', '')):
+            del trace['customdata']
+        for key, value in trace.items():
+            if isinstance(value, dict) and 'bdata' in value or \
+                    isinstance(value, np.ndarray) and value.ndim == 1 and value.dtype.kind in 'iuf':
+                encoded = _narrow(_values(value))
+                if encoded is not None:
+                    trace[key] = encoded
+        data.append(trace)
+    return go.Figure({**fig, 'data': data})
+
+
+def bin_scatter(fig, bins=SCATTER_BINS):
+    """
+    Reduce the points of the scatter traces to one marker per occupied cell of a
+    bins x bins grid over the plot area. At screen resolution the plot looks the same,
+    but a figure of tens of thousands of points shrinks to a few thousand.
+    Args:
+        fig (plotly.graph_objects.Figure or dict): The figure, or its JSON as a dict
+        bins (int): Grid cells per axis
+    Returns:
+        dict: The figure as a dict, with the binned traces as binary arrays
+    """
+    fig = fig if isinstance(fig, dict) else fig.to_dict()
+    traces = [trace for trace in fig.get('data', [])
+              if trace.get('type') in ('scatter', 'scattergl') and 'markers' in trace.get('mode', 'markers')
+              and trace.get('x') is not None and trace.get('y') is not None]
+    points = [(_values(trace['x']), _values(trace['y'])) for trace in traces]
+    if not points or sum(len(x) for x, _ in points) <= bins:
+        return fig
+    # One grid for all traces, so the traces are binned alike
+    all_x = np.concatenate([x for x, _ in points])
+    all_y = np.concatenate([y for _, y in points])
+    x0, x1 = np.nanmin(all_x), np.nanmax(all_x)
+    y0, y1 = np.nanmin(all_y), np.nanmax(all_y)
+    dx = (x1 - x0) / bins or 1.0
+    dy = (y1 - y0) / bins or 1.0
+    position = {id(trace): i for i, trace in enumerate(traces)}
+    data = []
+    for trace in fig['data']:
+        if id(trace) not in position:
+            data.append(trace)
+            continue
+        x, y = points[position[id(trace)]]
+        known = ~(np.isnan(x) | np.isnan(y))
+        ix = np.minimum(((x[known] - x0) / dx).astype(np.int64), bins - 1)
+        iy = np.minimum(((y[known] - y0) / dy).astype(np.int64), bins - 1)
+        cells = np.unique(ix * bins + iy)
+        # Per-point data no longer matches the markers
+        binned = {key: value for key, value in trace.items()
+                  if key not in ('customdata', 'hovertext', 'text', 'ids', 'selectedpoints')}
+        binned['x'] = _binary(x0 + (cells // bins + 0.5) * dx)
+        binned['y'] = _binary(y0 + (cells % bins + 0.5) * dy)
+        data.append(binned)
+    return {**fig, 'data': data}
+
+
+def _nice_width(span, nbins):
+    """
+    Smallest bin width of 1, 2 or 5 times a power of ten that covers span in at most nbins bins.
+    """
+    if span <= 0:
+        return 1.0
+    power = 10.0 ** np.floor(np.log10(span / nbins))
+    return next(step * power for step in (1, 2, 5, 10) if step * power * nbins >= span)
+
+
+def bin_histograms(fig, nbins=50):
+    """
+    Count the bins of the histogram traces on the server and draw them as bars, so the
+    figure carries one value per bin instead of one per row. The traces share one set
+    of bins of a round width, like plotly.js bins the traces of a histogram.
+    Args:
+        fig (plotly.graph_objects.Figure or dict): The figure, or its JSON as a dict
+        nbins (int): Most bins, if a trace does not set nbinsx
+    Returns:
+        dict: The figure as a dict, with the counted traces as bar traces
+    """
+    fig = fig if isinstance(fig, dict) else fig.to_plotly_json()
+    # Only plain count histograms of x can be counted like plotly.js does
+    traces = [trace for trace in fig.get('data', [])
+              if trace.get('type') == 'histogram' and trace.get('x') is not None and trace.get('y') is None
+              and not trace.get('histfunc') and not trace.get('histnorm') and not trace.get('cumulative')]
+    if not traces:
+        return fig
+    values = {id(trace): _values(trace['x']) for trace in traces}
+    known = np.concatenate([x[~np.isnan(x)] for x in values.values()])
+    if len(known) == 0:
+        return fig
+    nbins = max(trace.get('nbinsx') or nbins for trace in traces)
+    width = _nice_width(known.max() - known.min(), nbins)
+    start = np.floor(known.min() / width) * width
+    size = int((known.max() - start) // width) + 1
+    data = []
+    for trace in fig['data']:
+        if id(trace) not in values:
+            data.append(trace)
+            continue
+        x = values[id(trace)]
+        x = x[~np.isnan(x)]
+        counts = np.bincount(np.minimum(((x - start) // width).astype(np.int64), size - 1), minlength=size)
+        bars = {key: value for key, value in trace.items() if key not in ('x', 'nbinsx', 'bingroup', 'type')}
+        bars.update(type='bar', x=_binary(start + (np.arange(size) + 0.5) * width), y=_narrow(counts.astype(float)),
+                    width=width)
+        data.append(bars)
+    return {**fig, 'data': data, 'layout': {'bargap': 0, **fig.get('layout', {})}}
+
+
+def binned(fig):
+    """
+    Smaller variant of a figure, for when its full payload is too large: scatter points
+    are binned (see bin_scatter()) and histograms counted on the server (see bin_histograms()).
+    Args:
+        fig (plotly.graph_objects.Figure or dict): The figure
+    Returns:
+        plotly.graph_objects.Figure: The compact smaller figure, or None if the figure
+            has no traces that can be reduced
+    """
+    data = fig if isinstance(fig, dict) else fig.to_plotly_json()
+    reduced = bin_histograms(bin_scatter(data))
+    if reduced is data:
+        return None
+    return compact(reduced)
+
@@ -1,11 +1,17 @@
 # Import required libraries
-import pandas as pd  # For data manipulation and analysis
-import numpy as np  # For numerical operations
-import plotly.express as px  # For creating interactive visualizations
-import plotly.graph_objects as go  # For advanced plot customization
+import math  # For checking missing reference values
 import streamlit as st  # For creating the web application
-from pathlib import Path  # For handling file paths
-from scipy.stats import kruskal  # For statistical hypothesis testing
+import diamond_analysis as da  # Shared analysis logic, also used by the command-line interface
+import figures  # Figure builders, plotly is only loaded when a figure is drawn
+import profiling  # Optional per-section timing and memory instrumentation
+import aggregates  # Aggregate cube over the quality combinations
+import shared_store  # Optional dataset shared between worker processes
+import warmup  # Background precomputation of data and figures
+import data_watcher  # Reloads the dataset when the CSV changes
+import columnar_store  # Optional store of ingested inventory deltas
+import payload_budget  # Limits the figure payload of each section
+import appraisal_cache  # Memoized appraisals of the decision form
+import price_curves  # Price-per-carat curves over carat
 
 # Configure Streamlit page settings
 st.set_page_config(
@@ -14,32 +20,335 @@ st.set_page_config(
     layout="wide"  # Use wide layout for better visualization
 )
 
-# Cache the data loading function to improve performance
-@st.cache_data
-def load_data():
+def load_dataset(shared=None):
     """
-    Load the diamonds dataset from CSV file.
+    Load the diamonds dataset, from the columnar store if DIAMONDS_STORE is set or
+    the shared store if DIAMONDS_SHARED_STORE is set.
+    Args:
+        shared (shared_store.SharedStore): The shared store of this snapshot, if known
     Returns:
         pandas.DataFrame: The loaded diamonds dataset
     """
-    # Use Path to handle file paths in a cross-platform way
-    data_path = Path(__file__).parent / 'diamonds_dataset' / 'diamonds.csv'
-    df = pd.read_csv(data_path)
-    
-    # Remove rows where any of the dimensions x, y, or z are 0 (physically impossible for a diamond)
-    zero_mask = (df[['x', 'y', 'z']] == 0).any(axis=1)
-    df = df[~zero_mask].copy()
-    
-    return df
+    profiling.record_cache_miss('load_data')
+    store = columnar_store.from_env()
+    if store is not None:
+        return store.read_frame()
+    if shared_store.enabled():
+        return shared_store.load_shared_dataset(da.DATA_PATH, da.load_data, shared)
+    return da.load_data()
+
+def _grouped_bar_builder(col, value_col, label):
+    """
+    Builder of a section 6 grouped bar chart, for STATIC_FIGURES.
+    Args:
+        col (str): Category column
+        value_col (str): 'price' or 'carat'
+        label (str): Swedish name of the category
+    """
+    if value_col == 'price':
+        names, title, yaxis_title = ('Medelpris', 'Medianpris'), f'Medel- och Medianpris per {label}', 'Pris (USD)'
+    else:
+        names, title, yaxis_title = ('Medelvikt (carat)', 'Medianvikt (carat)'), f'Medel- och Medianvikt per {label}', 'Vikt (carat)'
+    return lambda category_stats: figures.grouped_bar(da.CATEGORY_ORDERS[col], *category_stats[(col, value_col)], *names,
+                                                      title=title, xaxis_title=label, yaxis_title=yaxis_title)
+
+def _scatter_builder(col, label):
+    """
+    Builder of a section 7 scatter plot of carat and price colored by a category, for STATIC_FIGURES.
+    """
+    return lambda dataset: figures.scatter(dataset, x='carat', y='price', color=col, order=da.CATEGORY_ORDERS[col],
+                                           title=f'Vikt vs Pris per {label}',
+                                           labels={'carat': 'Vikt (karat)', 'price': 'Pris (USD)'})
+
+# Figures that do not depend on user input: name -> (warm-up tasks they need, builder)
+STATIC_FIGURES = {
+    'price_hist': (['dataset'], lambda dataset: figures.histogram(
+        dataset, x='price', nbins=50, title='Fördelning av Diamantpriser',
+        labels={'price': 'Pris (USD)', 'count': 'Antal'})),
+    'cut_pie': (['category_counts'], lambda category_counts: figures.pie(
+        category_counts['cut'], title='Fördelning av Slipningskvalitet')),
+    'color_pie': (['category_counts'], lambda category_counts: figures.pie(
+        category_counts['color'], title='Fördelning av Färgkvalitet')),
+    'clarity_pie': (['category_counts'], lambda category_counts: figures.pie(
+        category_counts['clarity'], title='Fördelning av Klarhetsgrader')),
+    'carat_hist': (['dataset'], lambda dataset: figures.histogram(
+        dataset, x='carat', nbins=40, title='Fördelning av Vikt (Carat)',
+        labels={'carat': 'Vikt (carat)', 'count': 'Antal'})),
+    'price_by_cut': (['category_stats'], _grouped_bar_builder('cut', 'price', 'Slipning')),
+    'price_by_color': (['category_stats'], _grouped_bar_builder('color', 'price', 'Färg')),
+    'price_by_clarity': (['category_stats'], _grouped_bar_builder('clarity', 'price', 'Klarhetsgrad')),
+    'carat_by_cut': (['category_stats'], _grouped_bar_builder('cut', 'carat', 'Slipning')),
+    'carat_by_color': (['category_stats'], _grouped_bar_builder('color', 'carat', 'Färg')),
+    'carat_by_clarity': (['category_stats'], _grouped_bar_builder('clarity', 'carat', 'Klarhetsgrad')),
+    'scatter_cut': (['dataset'], _scatter_builder('cut', 'Slipning')),
+    'scatter_color': (['dataset'], _scatter_builder('color', 'Färg')),
+    'scatter_clarity': (['dataset'], _scatter_builder('clarity', 'Klarhet')),
+    'heatmap': (['correlation'], lambda correlation: figures.correlation_heatmap(
+        correlation, title='Korrelationsmatris för Numeriska Variabler')),
+    'carat_price': (['dataset'], lambda dataset: figures.scatter(
+        dataset, x='carat', y='price', title='Samband mellan Vikt (Carat) och Pris',
+        labels={'carat': 'Vikt (carat)', 'price': 'Pris (USD)'})),
+    'carat_x': (['dataset'], lambda dataset: figures.scatter(
+        dataset, x='carat', y='x', title='Samband mellan Vikt (carat) och Längd (x)',
+        labels={'carat': 'Vikt (carat)', 'x': 'Längd (mm)'})),
+    'x_y': (['dataset'], lambda dataset: figures.scatter(
+        dataset, x='x', y='y', title='Samband mellan Längd (x) och Bredd (y)',
+        labels={'x': 'Längd (mm)', 'y': 'Bredd (mm)'})),
+    'x_z': (['dataset'], lambda dataset: figures.scatter(
+        dataset, x='x', y='z', title='Samband mellan Längd (x) och Höjd (z)',
+        labels={'x': 'Längd (mm)', 'z': 'Höjd (mm)'})),
+    'outliers': (['outlier_counts'], lambda outlier_counts: figures.bar(
+        x=list(outlier_counts.keys()), y=list(outlier_counts.values()),
+        labels={'x': 'Variabel', 'y': 'Antal Extremvärden'}, title='Antal Extremvärden per Variabel')),
+    'missing': (['missing_counts'], lambda missing_counts: figures.bar(
+        x=missing_counts.index, y=missing_counts.values,
+        labels={'x': 'Variabel', 'y': 'Antal Saknade Värden'}, title='Antal Saknade Värden per Variabel')),
+    'price_std_bar': (['price_std'], lambda price_std: figures.bar(
+        x=price_std.index, y=price_std.values, labels={'x': 'Viktgrupp', 'y': 'Prisvariation (std)'},
+        title='Prisvariation för små och stora diamanter')),
+}
+
+def start_snapshot(precomputed):
+    """
+    Start the background warm-up of the data and the static figures.
+    Args:
+        precomputed (dict): Task results that are already known, see warmup.add_data_tasks()
+    Returns:
+        warmup.TaskGraph: The running task graph
+    """
+    shared = None
+    if shared_store.enabled() and columnar_store.from_env() is None:
+        # The dataset and its aggregates are published once and mapped by every worker
+        shared = shared_store.store_for(da.DATA_PATH)
+        if 'dataset' in precomputed:
+            # Publish the updated dataset, so every worker maps the same copy
+            dataset = precomputed['dataset']
+            precomputed = dict(precomputed, dataset=shared_store.load_shared_dataset(da.DATA_PATH, lambda: dataset,
+                                                                                     shared))
+    figures.load_optional_modules()
+    graph = warmup.TaskGraph()
+    warmup.add_data_tasks(graph, lambda: load_dataset(shared), precomputed, shared)
+    for name, (deps, build) in STATIC_FIGURES.items():
+        # Built once and drawn in every session, so the figures are stored compact
+        graph.add(name, lambda build=build, **deps: figures.compact(build(**deps)), deps)
+    return graph.start()
+
+# Started once per server process and shared by all sessions
+@st.cache_resource
+def get_data_watcher():
+    """
+    Start the warm-up and watch the CSV, or the columnar store, for new inventory.
+    Returns:
+        data_watcher.SnapshotWatcher: The watcher, whose current snapshot holds the data and figures
+    """
+    store = columnar_store.from_env()
+    if store is not None:
+        return data_watcher.StoreWatcher(store, start_snapshot, data_watcher.interval_from_env())
+    return data_watcher.DataWatcher(da.DATA_PATH, start_snapshot, data_watcher.interval_from_env())
+
+# Start values of the numerical inputs of the decision form
+FORM_DEFAULTS = {'carat': 0.5, 'price': 3000, 'depth': 61.0, 'table': 57.0, 'x': 5.0, 'y': 5.0, 'z': 3.05}
+
+# Shared by all sessions of the server process
+@st.cache_resource
+def get_appraisal_cache():
+    """
+    The cache of appraisals made with the decision form (section 12).
+    Returns:
+        appraisal_cache.AppraisalCache: The cache
+    """
+    return appraisal_cache.AppraisalCache(appraisal_cache.size_from_env())
+
+def appraisal(warm, inputs):
+    """
+    Appraise a diamond of the decision form with the data of a snapshot, without the cache.
+    Args:
+        warm (warmup.TaskGraph): The snapshot whose data the appraisal uses
+        inputs (dict): The form values by name
+    Returns:
+        tuple: See appraise()
+    """
+    # Referensvärden, extremvärdesgränser och sökindex kommer från uppvärmningen och delas mellan sessioner
+    curves = warm.result('price_curves')
+    decision, motivation = da.should_buy_diamond(**inputs, df=warm.result('dataset'),
+                                                 reference_stats=warm.result('reference_stats'),
+                                                 fences=warm.result('fences'), price_curves=curves)
+    quartiles = curves.quantiles([inputs['cut']], [inputs['color']], [inputs['clarity']], [inputs['carat']])[0]
+    band = tuple(float(quartiles[price_curves.QUANTILES.index(q)]) for q in (0.25, 0.75))
+    comparables = warm.result('comparables').query_one(
+        *(inputs[name] for name in ['carat', 'cut', 'color', 'clarity', 'depth', 'table', 'x', 'y', 'z']), k=20)
+    return decision, motivation, comparables, band
+
+def appraise(warm, inputs):
+    """
+    Appraise a diamond of the decision form, or return the cached appraisal of the same inputs.
+    Args:
+        warm (warmup.TaskGraph): The snapshot whose data the appraisal uses
+        inputs (dict): The form values by name
+    Returns:
+        tuple: Decision, motivation, the comparable market diamonds and the quartiles of
+            the price per carat for the quality at the diamond's carat (NaN if unknown)
+    """
+    # Appraise the rounded values of the cache key, so every input with the same key gets the same appraisal
+    key = appraisal_cache.normalize(inputs)
+    inputs = appraisal_cache.as_inputs(key)
+
+    def compute():
+        profiling.record_cache_miss('appraise')
+        profiling.record_cache_call('get_reference_stats')
+        return appraisal(warm, inputs)
+
+    profiling.record_cache_call('appraise')
+    result, _ = get_appraisal_cache().get(warm, key, compute)
+    appraisal_cache.remember(st.session_state.setdefault('appraisal_history', []), key, result[0])
+    return result
+
+def recall_appraisal(key):
+    """
+    Fill in the decision form with an earlier appraisal and show it (callback of the recall list).
+    """
+    for name, value in appraisal_cache.as_inputs(key).items():
+        st.session_state[f'form_{name}'] = value
+    st.session_state['appraisal_recalled'] = True
+
+def show_filtered_stats(count, mean_price, mean_carat):
+    """
+    Show the statistics of the diamonds selected in the interactive analysis (section 11).
+    """
+    st.subheader("Statistik för valda diamanter")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Antal diamanter", f"{count:,}")
+    with col2:
+        st.metric("Medelpris", f"${mean_price:,.2f}")
+    with col3:
+        st.metric("Medelvikt", f"{mean_carat:.2f} carat")
+
+def select_diamonds(warm, cuts, colors, clarities, ranges, full_ranges, store=None, manifest=None):
+    """
+    The diamonds selected in the interactive analysis (section 11) and their histograms.
+    Args:
+        warm (warmup.TaskGraph): The snapshot whose data is selected from
+        cuts, colors, clarities (list): Selected categories, an empty selection means all
+        ranges (dict): The (min, max) of the range sliders by column
+        full_ranges (dict): The full range of each slider
+        store (columnar_store.ColumnarStore): Store to query instead of the dataset, if any
+        manifest (dict): Version of the store to query
+    Returns:
+        tuple: Number of diamonds, mean price and mean carat, and the price and carat histograms
+    """
+    if ranges == full_ranges:
+        # No slider is moved, so the selection is answered by summing cells of the cube
+        selection = aggregates.select(warm.result('cube'), cuts, colors, clarities)
+        stats = selection['count'], selection['mean_price'], selection['mean_carat']
+        fig_price = figures.binned_histogram(*aggregates.rebin('price', selection['price_hist'], 30),
+                                             x='price', title='Prisfördelning (Filtrerad)')
+        fig_carat = figures.binned_histogram(*aggregates.rebin('carat', selection['carat_hist'], 30),
+                                             x='carat', title='Viktfördelning (Filtrerad)')
+        return stats, (fig_price, fig_carat)
+    if store is not None:
+        # Read only the partitions that can match, from the version the watcher has loaded
+        filtered_df = store.query(cuts, colors, clarities, ranges=ranges, columns=['price', 'carat'], manifest=manifest)
+    else:
+        filtered_df = da.filter_diamonds(warm.result('dataset'), cuts, colors, clarities, ranges=ranges)
+    stats = len(filtered_df), filtered_df['price'].mean(), filtered_df['carat'].mean()
+    # These histograms embed every selected row, so they are sent as compact binary arrays
+    fig_price = figures.compact(figures.histogram(filtered_df, x='price', nbins=30, title='Prisfördelning (Filtrerad)'))
+    fig_carat = figures.compact(figures.histogram(filtered_df, x='carat', nbins=30, title='Viktfördelning (Filtrerad)'))
+    return stats, (fig_price, fig_carat)
+
+def draw_figure(container, fig, section=None):
+    """
+    Draw a figure within the payload budget of its section (see payload_budget.py).
+    Args:
+        container: Where to draw it, st or a placeholder
+        fig (plotly.graph_objects.Figure): The figure
+        section (str): The section it belongs to, by default the current section
+    """
+    section = section or profiling.current().section
+    container.plotly_chart(payload_budget.fit(fig, section), use_container_width=True)
+
+def show_figure(warm, pending, name):
+    """
+    Show a static figure if the warm-up has built it, otherwise a placeholder that is
+    filled in by fill_pending_figures() at the end of the run.
+    Args:
+        warm (warmup.TaskGraph): The warm-up
+        pending (dict): Placeholders of figures that are not ready yet and their sections, by name
+        name (str): Name of the figure in STATIC_FIGURES
+    """
+    if warm.ready(name):
+        draw_figure(st, warm.result(name))
+    else:
+        pending[name] = (st.empty(), profiling.current().section)
+        pending[name][0].info("⏳ Diagrammet förbereds...")
+
+def fill_pending_figures(warm, pending):
+    """
+    Replace the placeholders with their figures, in the order the figures are ready.
+    """
+    for name in warm.as_completed(list(pending)):
+        placeholder, section = pending[name]
+        draw_figure(placeholder, warm.result(name), section)
+
+def render_profile_sidebar(profiler, budget):
+    """
+    Show the profiling results of this run in the sidebar.
+    Args:
+        profiler (profiling.Profiler): The profiler of the run
+        budget (payload_budget.PayloadBudget): The figure payloads of the run
+    """
+    import pandas as pd  # Only needed for the profiling tables
+    records = pd.DataFrame(profiler.records, columns=['kind', 'name', 'seconds', 'memory_delta_mb', 'peak_mb'])
+    st.sidebar.header("Profilering")
+    st.sidebar.metric("Total tid", f"{records.loc[records['kind'] == 'section', 'seconds'].sum():.2f} s")
+    st.sidebar.subheader("Sektioner")
+    st.sidebar.dataframe(records[records['kind'] == 'section'].drop(columns='kind')
+                         .sort_values('seconds', ascending=False), hide_index=True)
+    st.sidebar.subheader("Figurer")
+    st.sidebar.dataframe(records[records['kind'] == 'figure'].drop(columns='kind')
+                         .sort_values('seconds', ascending=False), hide_index=True)
+    st.sidebar.subheader(f"Diagramdata per sektion (budget {budget.budget / 1000:,.0f} kB)")
+    st.sidebar.dataframe(pd.DataFrame(budget.sections).T.rename(columns={'bytes': 'byte', 'figures': 'diagram',
+                                                                        'binned': 'binnade'}))
+    st.sidebar.subheader("Cache (sedan serverstart)")
+    st.sidebar.dataframe(pd.DataFrame(profiling.cache_stats()).T)
+    st.sidebar.subheader("Uppvärmning")
+    st.sidebar.dataframe(pd.DataFrame(get_data_watcher().current.status()).T)
+    with st.sidebar.expander("Prometheus-mätvärden"):
+        st.code(profiling.prometheus_metrics(), language='text')
+
 
 # Main function for data analysis
 def analyze_diamonds():
     """
     Main function that performs the complete diamond analysis and visualization.
-    Creates an interactive Streamlit dashboard with various analyses.
+    Profiling is turned on with the environment variable DIAMONDS_PROFILE=1 or the
+    query parameter ?profile=1. The figure payload per section is limited by
+    DIAMONDS_PAYLOAD_BUDGET_KB.
+    """
+    enabled = profiling.env_enabled() or st.query_params.get('profile') == '1'
+    with profiling.Profiler(enabled) as profiler, \
+            payload_budget.PayloadBudget(payload_budget.budget_from_env()) as budget:
+        render_dashboard(profiler)
+    if enabled:
+        render_profile_sidebar(profiler, budget)
+
+
+def render_dashboard(profiler):
+    """
+    Render all sections of the interactive Streamlit dashboard.
+    Args:
+        profiler (profiling.Profiler): Marks where each section starts
     """
     # Load the data
-    df = load_data()
+    profiler.start_section("Datainläsning")
+    # The current snapshot, read once so the whole run uses the same data
+    watcher = get_data_watcher()
+    warm = watcher.current
+    pending = {}
+    profiling.record_cache_call('load_data')
+    df = warm.result('dataset')
     
     # Display title and introduction
     st.title("💎 Diamonds Analysis for Guldfynd")
@@ -66,6 +375,7 @@ def analyze_diamonds():
     """, unsafe_allow_html=True)
 
     # --- Sektioner med HTML-ankare ---
+    profiler.start_section("1. Bakgrund")
     st.markdown('<a name="bakgrund"></a>', unsafe_allow_html=True)
     st.markdown("""
     ### Bakgrund
@@ -73,6 +383,7 @@ def analyze_diamonds():
     Denna analys hjälper till att förstå diamanternas egenskaper och marknadsmöjligheter.
     """)
 
+    profiler.start_section("2. Om diamanter")
     st.markdown('<a name="om-diamanter"></a>', unsafe_allow_html=True)
     st.markdown("""
     ### Om diamanter
@@ -124,28 +435,28 @@ def analyze_diamonds():
     Denna kunskap är viktig för att förstå analysen och dess affärsmässiga implikationer.
     """)
 
+    profiler.start_section("3. Grundläggande statistik")
     st.markdown('<a name="grundlaggande-statistik"></a>', unsafe_allow_html=True)
     st.header("3. Grundläggande statistik")
     st.markdown("Syfte: Ge en överblick över datasetets storlek och grundläggande egenskaper.")
     
     # Create three columns for metrics
     col1, col2, col3 = st.columns(3)
+    basic = aggregates.totals(warm.result('cube'))
     with col1:
-        st.metric("Antal diamanter", f"{len(df):,}")  # Display total number of diamonds
+        st.metric("Antal diamanter", f"{basic['count']:,}")  # Display total number of diamonds
     with col2:
-        st.metric("Medelpris", f"${df['price'].mean():,.2f}")  # Display average price
+        st.metric("Medelpris", f"${basic['mean_price']:,.2f}")  # Display average price
     with col3:
-        st.metric("Medelvikt", f"{df['carat'].mean():.2f} karat")  # Display average carat weight
+        st.metric("Medelvikt", f"{basic['mean_carat']:.2f} karat")  # Display average carat weight
 
+    profiler.start_section("4. Prisanalys")
     st.markdown('<a name="prisanalys"></a>', unsafe_allow_html=True)
     st.header("4. Prisanalys")
     st.markdown("Syfte: Undersöka prisfördelningen och identifiera eventuella extremvärden.")
     
     # Create price histogram
-    fig_price = px.histogram(df, x='price', nbins=50,
-                           title='Fördelning av Diamantpriser',
-                           labels={'price': 'Pris (USD)', 'count': 'Antal'})
-    st.plotly_chart(fig_price, use_container_width=True)
+    show_figure(warm, pending, 'price_hist')
     
     st.markdown("**Diagramtyp:** Histogram.")
     st.markdown("**Hur man tolkar:** X-axeln visar prisintervall, Y-axeln antal diamanter. En toppig fördelning betyder många diamanter i det prisintervallet.")
@@ -153,28 +464,22 @@ def analyze_diamonds():
     st.markdown("**Insikt:** Priserna är koncentrerade till lägre nivåer, men det finns en lång svans av dyra diamanter.")
     st.markdown("**Affärsmässig tolkning:** Guldfynd kan erbjuda både prisvärda och exklusiva diamanter för att möta olika kunders behov.")
 
+    profiler.start_section("5. Kvalitetsattribut")
     st.markdown('<a name="kvalitetsattribut"></a>', unsafe_allow_html=True)
     st.header("5. Kvalitetsattribut")
     st.markdown("Syfte: Undersöka fördelningen av slipning, färg och klarhet. Alla är sorterade från bäst till sämst.")
     
-    # Define the order of categories from best to worst
-    cut_order = ["Ideal", "Premium", "Very Good", "Good", "Fair"]
-    color_order = ["D", "E", "F", "G", "H", "I", "J"]
-    clarity_order = ["IF", "VVS1", "VVS2", "VS1", "VS2", "SI1", "SI2", "I1"]
-    
-    # Filter data to include only known categories
-    df_cut = df[df['cut'].isin(cut_order)]
-    df_color = df[df['color'].isin(color_order)]
-    df_clarity = df[df['clarity'].isin(clarity_order)]
+    # Order of categories from best to worst
+    cut_order = da.CUT_ORDER
+    color_order = da.COLOR_ORDER
+    clarity_order = da.CLARITY_ORDER
     
     # Create three columns for pie charts
     col1, col2, col3 = st.columns(3)
     
     # Cut quality pie chart
     with col1:
-        fig_cut = px.pie(df_cut, names='cut', title='Fördelning av Slipningskvalitet',
-                        category_orders={'cut': cut_order})
-        st.plotly_chart(fig_cut, use_container_width=True)
+        show_figure(warm, pending, 'cut_pie')
         st.markdown("**Diagramtyp:** Cirkeldiagram (pie chart) för slipningskvalitet.")
         st.markdown("**Hur man tolkar:** Varje tårtbit visar andelen diamanter av en viss slipning.")
         st.markdown("**Tolkning:** Ideal och Premium dominerar.")
@@ -183,9 +488,7 @@ def analyze_diamonds():
     
     # Color quality pie chart
     with col2:
-        fig_color = px.pie(df_color, names='color', title='Fördelning av Färgkvalitet',
-                          category_orders={'color': color_order})
-        st.plotly_chart(fig_color, use_container_width=True)
+        show_figure(warm, pending, 'color_pie')
         st.markdown("**Diagramtyp:** Cirkeldiagram (pie chart) för färgkvalitet.")
         st.markdown("**Hur man tolkar:** Varje tårtbit visar andelen diamanter av en viss färg.")
         st.markdown("**Tolkning:** E, F och G är vanligast.")
@@ -194,9 +497,7 @@ def analyze_diamonds():
     
     # Clarity quality pie chart
     with col3:
-        fig_clarity = px.pie(df_clarity, names='clarity', title='Fördelning av Klarhetsgrader',
-                            category_orders={'clarity': clarity_order})
-        st.plotly_chart(fig_clarity, use_container_width=True)
+        show_figure(warm, pending, 'clarity_pie')
         st.markdown("**Diagramtyp:** Cirkeldiagram (pie chart) för klarhetsgrader.")
         st.markdown("**Hur man tolkar:** Varje tårtbit visar andelen diamanter av en viss klarhet.")
         st.markdown("**Tolkning:** SI1 och VS2 är vanligast.")
@@ -208,160 +509,99 @@ def analyze_diamonds():
 
     # Carat (weight) histogram and explanation
     with st.container():
-        fig_carat = px.histogram(df, x='carat', nbins=40, title='Fördelning av Vikt (Carat)', labels={'carat': 'Vikt (carat)', 'count': 'Antal'})
-        st.plotly_chart(fig_carat, use_container_width=True)
+        show_figure(warm, pending, 'carat_hist')
         st.markdown("**Diagramtyp:** Histogram för vikt (carat).")
         st.markdown("**Hur man tolkar:** X-axeln visar viktintervall (carat), Y-axeln antal diamanter.")
         st.markdown("**Tolkning:** De flesta diamanter väger mindre än 1 carat, men det finns en lång svans av större stenar.")
         st.markdown("**Insikt:** Små diamanter är vanligast, men stora diamanter är mer sällsynta och värdefulla.")
         st.markdown("**Affärsmässig tolkning:** Guldfynd kan erbjuda ett brett sortiment av små diamanter för volymförsäljning och marknadsföra större stenar som exklusiva och sällsynta.")
 
+    profiler.start_section("6. Prisfördelning per kvalitetsattribut")
     st.markdown('<a name="prisfordelning-per-kvalitetsattribut"></a>', unsafe_allow_html=True)
     st.header("6. Prisfördelning per kvalitetsattribut")
     st.markdown("Syfte: Jämföra prisnivåer mellan olika kvalitetsklasser.")
     
-    # Replace boxplot for price per cut with grouped bar chart (mean and median)
-    mean_price_cut = df.groupby('cut')['price'].mean().reindex(cut_order)
-    median_price_cut = df.groupby('cut')['price'].median().reindex(cut_order)
-    fig_bar_cut = go.Figure()
-    fig_bar_cut.add_trace(go.Bar(x=cut_order, y=mean_price_cut, name='Medelpris'))
-    fig_bar_cut.add_trace(go.Bar(x=cut_order, y=median_price_cut, name='Medianpris'))
-    fig_bar_cut.update_layout(barmode='group', title='Medel- och Medianpris per Slipning', xaxis_title='Slipning', yaxis_title='Pris (USD)')
-    st.plotly_chart(fig_bar_cut, use_container_width=True)
+    # Grouped bar chart for mean and median price per cut
+    show_figure(warm, pending, 'price_by_cut')
     st.markdown("**Diagramtyp:** Grupperat stapeldiagram för medel- och medianpris per slipning.")
     st.markdown("**Hur man tolkar:** Varje stapel visar medel- eller medianpriset för en slipningsklass.")
     st.markdown("**Tolkning:** Premium och Fair har högst medel- och medianpris.")
     st.markdown("**Insikt:** Högre eller lägre slipningskvalitet kan ge högre pris, beroende på segment.")
     st.markdown("**Affärsmässig tolkning:** Guldfynd bör utgå från att det är vikten som driver priset i dessa segment. Slipningskvalitet kan användas för att skapa produktsegment, men prissättningen bör i första hand baseras på vikt.")
     
-    # Replace boxplot for price per color with grouped bar chart (mean and median)
-    mean_price_color = df.groupby('color')['price'].mean().reindex(color_order)
-    median_price_color = df.groupby('color')['price'].median().reindex(color_order)
-    fig_bar_color = go.Figure()
-    fig_bar_color.add_trace(go.Bar(x=color_order, y=mean_price_color, name='Medelpris'))
-    fig_bar_color.add_trace(go.Bar(x=color_order, y=median_price_color, name='Medianpris'))
-    fig_bar_color.update_layout(barmode='group', title='Medel- och Medianpris per Färg', xaxis_title='Färg', yaxis_title='Pris (USD)')
-    st.plotly_chart(fig_bar_color, use_container_width=True)
+    # Grouped bar chart for mean and median price per color
+    show_figure(warm, pending, 'price_by_color')
     st.markdown("**Diagramtyp:** Grupperat stapeldiagram för medel- och medianpris per färg.")
     st.markdown("**Hur man tolkar:** Varje stapel visar medel- eller medianpriset för en färgklass.")
     st.markdown("**Tolkning:** J, I och H har högst medel- och medianpris.")
     st.markdown("**Insikt:** Högre färgklass (J, I, H) har högre pris i detta dataset.")
     st.markdown("**Affärsmässig tolkning:** Guldfynd bör utgå från att det är vikten som driver priset i dessa segment. Färgkvalitet kan användas för att skapa produktsegment, men prissättningen bör i första hand baseras på vikt.")
     
-    # Replace boxplot for price per clarity with grouped bar chart (mean and median)
-    mean_price_clarity = df.groupby('clarity')['price'].mean().reindex(clarity_order)
-    median_price_clarity = df.groupby('clarity')['price'].median().reindex(clarity_order)
-    fig_bar_clarity = go.Figure()
-    fig_bar_clarity.add_trace(go.Bar(x=clarity_order, y=mean_price_clarity, name='Medelpris'))
-    fig_bar_clarity.add_trace(go.Bar(x=clarity_order, y=median_price_clarity, name='Medianpris'))
-    fig_bar_clarity.update_layout(barmode='group', title='Medel- och Medianpris per Klarhetsgrad', xaxis_title='Klarhetsgrad', yaxis_title='Pris (USD)')
-    st.plotly_chart(fig_bar_clarity, use_container_width=True)
+    # Grouped bar chart for mean and median price per clarity
+    show_figure(warm, pending, 'price_by_clarity')
     st.markdown("**Diagramtyp:** Grupperat stapeldiagram för medel- och medianpris per klarhetsgrad.")
     st.markdown("**Hur man tolkar:** Varje stapel visar medel- eller medianpriset för en klarhetsklass.")
     st.markdown("**Tolkning:** SI2, SI1 och I1 har högst medel- och medianpris.")
     st.markdown("**Insikt:** De klarhetsgrader som har högst pris har också högst vikt (titta på Medel- och Medianvikt per Klarhetsgrad nedanför), vilket visar att det är vikten som driver priset snarare än klarhetsgraden.")
     st.markdown("**Affärsmässig tolkning:** Guldfynd bör utgå från att det är vikten som driver priset i dessa segment. Klarhetsgrad kan användas för att skapa produktsegment, men prissättningen bör i första hand baseras på vikt.")
 
-    # Grouped bar chart for mean carat per cut
-    mean_carat_cut = df.groupby('cut')['carat'].mean().reindex(cut_order)
-    median_carat_cut = df.groupby('cut')['carat'].median().reindex(cut_order)
-    fig_bar_carat_cut = go.Figure()
-    fig_bar_carat_cut.add_trace(go.Bar(x=cut_order, y=mean_carat_cut, name='Medelvikt (carat)'))
-    fig_bar_carat_cut.add_trace(go.Bar(x=cut_order, y=median_carat_cut, name='Medianvikt (carat)'))
-    fig_bar_carat_cut.update_layout(barmode='group', title='Medel- och Medianvikt per Slipning', xaxis_title='Slipning', yaxis_title='Vikt (carat)')
-    st.plotly_chart(fig_bar_carat_cut, use_container_width=True)
+    # Grouped bar chart for mean and median carat per cut
+    show_figure(warm, pending, 'carat_by_cut')
     st.markdown("**Diagramtyp:** Grupperat stapeldiagram för medel- och medianvikt per slipning.")
     st.markdown("**Hur man tolkar:** Varje stapel visar medel- eller medianvikten för en slipningsklass.")
     st.markdown("**Tolkning:** Premium och Fair har högst medel- och medianvikt.")
     st.markdown("**Insikt:** De slipningsklasser som har högst pris har också högst vikt, vilket visar att det är vikten som driver priset snarare än slipningskvaliteten.")
     st.markdown("**Affärsmässig tolkning:** Guldfynd bör utgå från att det är vikten som driver priset i dessa segment. Slipningskvalitet kan användas för att skapa produktsegment, men prissättningen bör i första hand baseras på vikt.")
 
-    # Grouped bar chart for mean carat per color
-    mean_carat_color = df.groupby('color')['carat'].mean().reindex(color_order)
-    median_carat_color = df.groupby('color')['carat'].median().reindex(color_order)
-    fig_bar_carat_color = go.Figure()
-    fig_bar_carat_color.add_trace(go.Bar(x=color_order, y=mean_carat_color, name='Medelvikt (carat)'))
-    fig_bar_carat_color.add_trace(go.Bar(x=color_order, y=median_carat_color, name='Medianvikt (carat)'))
-    fig_bar_carat_color.update_layout(barmode='group', title='Medel- och Medianvikt per Färg', xaxis_title='Färg', yaxis_title='Vikt (carat)')
-    st.plotly_chart(fig_bar_carat_color, use_container_width=True)
+    # Grouped bar chart for mean and median carat per color
+    show_figure(warm, pending, 'carat_by_color')
     st.markdown("**Diagramtyp:** Grupperat stapeldiagram för medel- och medianvikt per färg.")
     st.markdown("**Hur man tolkar:** Varje stapel visar medel- eller medianvikten för en färgklass.")
     st.markdown("**Tolkning:** J, I och H har högst medel- och medianvikt.")
     st.markdown("**Insikt:** De färgklasser som har högst pris har också högst vikt, vilket visar att det är vikten som driver priset snarare än färgkvaliteten.")
     st.markdown("**Affärsmässig tolkning:** Guldfynd bör utgå från att det är vikten som driver priset i dessa segment. Färgkvalitet kan användas för att skapa produktsegment, men prissättningen bör i första hand baseras på vikt.")
 
-    # Grouped bar chart for mean carat per clarity
-    mean_carat_clarity = df.groupby('clarity')['carat'].mean().reindex(clarity_order)
-    median_carat_clarity = df.groupby('clarity')['carat'].median().reindex(clarity_order)
-    fig_bar_carat_clarity = go.Figure()
-    fig_bar_carat_clarity.add_trace(go.Bar(x=clarity_order, y=mean_carat_clarity, name='Medelvikt (carat)'))
-    fig_bar_carat_clarity.add_trace(go.Bar(x=clarity_order, y=median_carat_clarity, name='Medianvikt (carat)'))
-    fig_bar_carat_clarity.update_layout(barmode='group', title='Medel- och Medianvikt per Klarhetsgrad', xaxis_title='Klarhetsgrad', yaxis_title='Vikt (carat)')
-    st.plotly_chart(fig_bar_carat_clarity, use_container_width=True)
+    # Grouped bar chart for mean and median carat per clarity
+    show_figure(warm, pending, 'carat_by_clarity')
     st.markdown("**Diagramtyp:** Grupperat stapeldiagram för medel- och medianvikt per klarhetsgrad.")
     st.markdown("**Hur man tolkar:** Varje stapel visar medel- eller medianvikten för en klarhetsklass.")
     st.markdown("**Tolkning:** SI2, SI1 och I1 har högst medel- och medianvikt.")
     st.markdown("**Insikt:** De klarhetsgrader som har högst pris har också högst vikt, vilket visar att det är vikten som driver priset snarare än klarhetsgraden.")
     st.markdown("**Affärsmässig tolkning:** Guldfynd bör utgå från att det är vikten som driver priset i dessa segment. Klarhetsgrad kan användas för att skapa produktsegment, men prissättningen bör i första hand baseras på vikt.")
 
+    profiler.start_section("7. Samband mellan vikt och pris")
     st.markdown('<a name="samband-mellan-vikt-och-pris"></a>', unsafe_allow_html=True)
     st.header("7. Samband mellan vikt och pris")
     st.markdown("Syfte: Undersöka hur vikt och pris samvarierar beroende på kvalitet.")
     # Scatterplot för cut
-    fig_scatter_cut = px.scatter(df, x='carat', y='price', color='cut',
-                               category_orders={'cut': cut_order},
-                               title='Vikt vs Pris per Slipning',
-                               labels={'carat': 'Vikt (karat)', 'price': 'Pris (USD)'})
-    st.plotly_chart(fig_scatter_cut, use_container_width=True)
+    show_figure(warm, pending, 'scatter_cut')
     st.markdown("**Diagramtyp:** Spridningsdiagram (scatterplot) för vikt och pris per slipning.")
     st.markdown("**Hur man tolkar:** Varje punkt är en diamant. Om punkterna bildar ett mönster (t.ex. stigande linje) finns ett samband. Färg visar slipning.")
     st.markdown("**Tolkning:** Högre vikt och bättre slipning ger högre pris.")
     st.markdown("**Insikt:** Det finns ett tydligt samband mellan vikt, slipning och pris.")
     st.markdown("**Affärsmässig tolkning:** Guldfynd kan använda denna kunskap för att prissätta större och bättre slipade diamanter högre.")
     # Scatterplot för color
-    fig_scatter_color = px.scatter(df, x='carat', y='price', color='color',
-                                 category_orders={'color': color_order},
-                                 title='Vikt vs Pris per Färg',
-                                 labels={'carat': 'Vikt (karat)', 'price': 'Pris (USD)'})
-    st.plotly_chart(fig_scatter_color, use_container_width=True)
+    show_figure(warm, pending, 'scatter_color')
     st.markdown("**Diagramtyp:** Spridningsdiagram (scatterplot) för vikt och pris per färg.")
     st.markdown("**Hur man tolkar:** Varje punkt är en diamant. Färg visar färgklass. Mönster visar samband.")
     st.markdown("**Tolkning:** Färg påverkar priset, särskilt för större diamanter.")
     st.markdown("**Insikt:** Premiumfärg ger högre pris, särskilt i större stenar.")
     st.markdown("**Affärsmässig tolkning:** Guldfynd kan särskilt marknadsföra stora diamanter med hög färgkvalitet till premiumkunder.")
     # Scatterplot för clarity
-    fig_scatter_clarity = px.scatter(df, x='carat', y='price', color='clarity',
-                                   category_orders={'clarity': clarity_order},
-                                   title='Vikt vs Pris per Klarhet',
-                                   labels={'carat': 'Vikt (karat)', 'price': 'Pris (USD)'})
-    st.plotly_chart(fig_scatter_clarity, use_container_width=True)
+    show_figure(warm, pending, 'scatter_clarity')
     st.markdown("**Diagramtyp:** Spridningsdiagram (scatterplot) för vikt och pris per klarhet.")
     st.markdown("**Hur man tolkar:** Varje punkt är en diamant. Färg visar klarhetsgrad. Mönster visar samband.")
     st.markdown("**Tolkning:** Klarhet har störst effekt på priset för större diamanter.")
     st.markdown("**Insikt:** Premiumklarhet i stora stenar ger högst pris.")
     st.markdown("**Affärsmässig tolkning:** Guldfynd kan ta ut högre pris för stora diamanter med hög klarhet och rikta dem till exklusiva kunder.")
 
+    profiler.start_section("8. Korrelationer")
     st.markdown('<a name="korrelationer"></a>', unsafe_allow_html=True)
     st.header("8. Korrelationer")
     st.markdown("Syfte: Visa korrelationer mellan alla numeriska variabler i datasetet för att förstå sambanden mellan olika egenskaper.")
     
-    # Create correlation matrix for numerical columns
-    numerical_cols = ['price', 'carat', 'depth', 'table', 'x', 'y', 'z']
-    corr_matrix = df[numerical_cols].corr()
     
-    # Create heatmap
-    fig_heatmap = px.imshow(corr_matrix,
-                           labels=dict(color="Korrelation"),
-                           x=numerical_cols,
-                           y=numerical_cols,
-                           title='Korrelationsmatris för Numeriska Variabler',
-                           color_continuous_scale='RdBu_r',
-                           aspect='auto')
-    fig_heatmap.update_layout(
-        xaxis_title="Variabler",
-        yaxis_title="Variabler"
-    )
-    st.plotly_chart(fig_heatmap, use_container_width=True)
+    show_figure(warm, pending, 'heatmap')
     st.markdown("**Diagramtyp:** Heatmap (värmekarta) för korrelationer.")
     st.markdown("**Hur man tolkar:** Färgerna visar styrkan och riktningen av sambandet mellan variablerna. Röd = positiv korrelation, blå = negativ korrelation. Mörkare färg = starkare samband.")
     st.markdown("**Tolkning:** Det finns starka positiva korrelationer mellan vikt (carat) och pris, samt mellan de fysiska måtten (x, y, z).")
@@ -369,8 +609,7 @@ def analyze_diamonds():
     st.markdown("**Affärsmässig tolkning:** Guldfynd kan använda dessa samband för att förstå vilka faktorer som påverkar priset mest och optimera sitt sortiment.")
 
     st.markdown("Syfte: Det finns en stark korrelation mellan vikt (carat) och pris. Syftet är att visa sambandet mellan dessa på ett enkelt och tydligt sätt.")
-    fig_corr = px.scatter(df, x='carat', y='price', title='Samband mellan Vikt (Carat) och Pris', labels={'carat': 'Vikt (carat)', 'price': 'Pris (USD)'})
-    st.plotly_chart(fig_corr, use_container_width=True)
+    show_figure(warm, pending, 'carat_price')
     st.markdown("**Diagramtyp:** Spridningsdiagram (scatterplot) för vikt (carat) och pris.")
     st.markdown("**Hur man tolkar:** Varje punkt är en diamant. Om punkterna bildar ett stigande mönster finns ett positivt samband.")
     st.markdown("**Tolkning:** Det finns ett tydligt positivt samband mellan vikt (carat) och pris – ju större diamant, desto högre pris.")
@@ -379,28 +618,26 @@ def analyze_diamonds():
     # Inbädda sektion 10 här med fulla förklaringsblock
     st.markdown("### Starka Korrelationer mellan Diamantmått")
     st.markdown("Syfte: Visa de tre starkaste sambanden mellan diamantens mått och vikt.")
-    fig_carat_x = px.scatter(df, x='carat', y='x', title='Samband mellan Vikt (carat) och Längd (x)', labels={'carat': 'Vikt (carat)', 'x': 'Längd (mm)'})
-    st.plotly_chart(fig_carat_x, use_container_width=True)
+    show_figure(warm, pending, 'carat_x')
     st.markdown("**Diagramtyp:** Spridningsdiagram (scatterplot) för vikt (carat) och längd (x).")
     st.markdown("**Hur man tolkar:** Varje punkt är en diamant. Ett stigande mönster visar att större vikt ger större längd.")
     st.markdown("**Tolkning:** Det finns ett mycket starkt positivt samband mellan vikt och längd.")
     st.markdown("**Insikt:** Större diamanter är längre, vilket är logiskt och kan användas för kvalitetskontroll.")
     st.markdown("**Affärsmässig tolkning:** Guldfynd kan använda detta samband för att snabbt uppskatta vikt utifrån längd vid värdering.")
-    fig_x_y = px.scatter(df, x='x', y='y', title='Samband mellan Längd (x) och Bredd (y)', labels={'x': 'Längd (mm)', 'y': 'Bredd (mm)'})
-    st.plotly_chart(fig_x_y, use_container_width=True)
+    show_figure(warm, pending, 'x_y')
     st.markdown("**Diagramtyp:** Spridningsdiagram (scatterplot) för längd (x) och bredd (y).")
     st.markdown("**Hur man tolkar:** Varje punkt är en diamant. Ett stigande mönster visar att längre diamanter också är bredare.")
     st.markdown("**Tolkning:** Det finns ett mycket starkt positivt samband mellan längd och bredd.")
     st.markdown("**Insikt:** Diamanter är ofta symmetriska, vilket syns i detta samband.")
     st.markdown("**Affärsmässig tolkning:** Guldfynd kan använda detta samband för att kontrollera symmetri och kvalitet.")
-    fig_x_z = px.scatter(df, x='x', y='z', title='Samband mellan Längd (x) och Höjd (z)', labels={'x': 'Längd (mm)', 'z': 'Höjd (mm)'})
-    st.plotly_chart(fig_x_z, use_container_width=True)
+    show_figure(warm, pending, 'x_z')
     st.markdown("**Diagramtyp:** Spridningsdiagram (scatterplot) för längd (x) och höjd (z).")
     st.markdown("**Hur man tolkar:** Varje punkt är en diamant. Ett stigande mönster visar att längre diamanter tenderar att vara högre.")
     st.markdown("**Tolkning:** Det finns ett starkt positivt samband mellan längd och höjd.")
     st.markdown("**Insikt:** Diamanter med större längd tenderar att vara högre.")
     st.markdown("**Affärsmässig tolkning:** Guldfynd kan använda detta samband för att identifiera proportionerliga och välformade diamanter.")
 
+    profiler.start_section("9. Extremvärden och saknade värden")
     st.markdown('<a name="extremvarden-och-saknade-varden"></a>', unsafe_allow_html=True)
     st.header("9. Extremvärden och saknade värden")
     st.markdown("Syfte: Identifiera och analysera extremvärden och saknade värden i datasetet.")
@@ -408,44 +645,46 @@ def analyze_diamonds():
 Datakvalitet: Datasetet innehåller extremvärden och saknade värden som kan påverka analysen. Det är viktigt att identifiera och hantera dessa för att säkerställa tillförlitliga resultat. Notera att 0-värden i x, y, z har tagits bort eftersom de är fysiskt omöjliga för en diamant. En diamant måste ha en längd, bredd och höjd för att existera, och därför kan inte någon av dessa dimensioner vara 0.
 """)
     # Extremvärden
-    outliers = {}
-    for col in ['price', 'carat', 'depth', 'table', 'x', 'y', 'z']:
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
-        IQR = Q3 - Q1
-        outliers[col] = df[(df[col] < (Q1 - 1.5 * IQR)) | (df[col] > (Q3 + 1.5 * IQR))].shape[0]
-    fig_outliers = px.bar(x=list(outliers.keys()), y=list(outliers.values()), labels={'x': 'Variabel', 'y': 'Antal Extremvärden'}, title='Antal Extremvärden per Variabel')
-    st.plotly_chart(fig_outliers, use_container_width=True)
+    outliers = warm.result('outlier_counts')
+    show_figure(warm, pending, 'outliers')
     st.markdown("**Diagramtyp:** Stapeldiagram (bar chart) för extremvärden.")
     st.markdown("**Hur man tolkar:** Varje stapel visar antalet extremvärden för en variabel.")
     st.markdown("**Tolkning:** Extremvärden förekommer i samtliga nyckelvariabler (pris, vikt, djup, tavla) och kan snedvrida analysen, särskilt medelvärden och samband. För price kan enstaka mycket dyra diamanter ge en felaktig bild av prisnivåer. För carat kan extremt höga eller låga vikter påverka analysen av sambandet mellan vikt och pris. För depth och table kan extremvärden indikera mätfel eller ovanliga slipningar, vilket påverkar slutsatser om kvalitet och pris. Dessa bör identifieras och hanteras vid analys och affärsbeslut. Totalt finns det {} extremvärden.".format(sum(outliers.values())))
     st.markdown("**Insikt:** Datadrivna beslut kring lager och prissättning blir mer tillförlitliga om extremvärden hanteras korrekt. Extremvärden kan indikera unika möjligheter eller risker i sortimentet.")
     st.markdown("**Affärsmässig tolkning:** Guldfynd bör identifiera och analysera extremvärden noggrant. Överväg att exkludera eller särskilt hantera diamanter med extremvärden vid prissättning och sortimentsplanering. Detta kan hjälpa till att optimera lager och öka lönsamheten.")
     # Saknade värden
-    null_values = df.isnull().sum()
-    fig_null = px.bar(x=null_values.index, y=null_values.values, labels={'x': 'Variabel', 'y': 'Antal Saknade Värden'}, title='Antal Saknade Värden per Variabel')
-    st.plotly_chart(fig_null, use_container_width=True)
+    null_values = warm.result('missing_counts')
+    show_figure(warm, pending, 'missing')
     st.markdown("**Diagramtyp:** Stapeldiagram (bar chart) för saknade värden.")
     st.markdown("**Hur man tolkar:** Varje stapel visar antalet saknade värden för en variabel.")
     st.markdown("**Tolkning:** Saknade värden är få och påverkar inte analysen nämnvärt. Totalt finns det {} saknade värden.".format(null_values.sum()))
     st.markdown("**Insikt:** Datasetet är relativt komplett, vilket ger tillförlitliga resultat.")
     st.markdown("**Affärsmässig tolkning:** Guldfynd kan lita på datan för att fatta beslut kring lager och prissättning.")
+    # Geometriska kontroller av måtten, flaggade när datan läses in
+    geometry = warm.result('geometry_flags')
+    geometry_counts = da.geometry_counts(geometry)
+    st.markdown(f"**Geometriska kontroller:** Måtten x, y och z ska stämma med djupet, vikten och varandra. "
+                f"{geometry_counts['any']} diamanter har mått som inte gör det: {geometry_counts['depth']} där djupet "
+                f"avviker mer än {da.DEPTH_TOLERANCE:.0f} procentenheter från 2z/(x+y), {geometry_counts['density']} där "
+                f"vikten avviker mer än {da.DENSITY_TOLERANCE:.0%} från volymen x·y·z och {geometry_counts['symmetry']} "
+                f"där längd och bredd skiljer sig mer än {da.SYMMETRY_LIMIT - 1:.0%}. Det är troligen mätfel, och "
+                f"samma kontroll görs för diamanter i beslutsstödet.")
+    if geometry_counts['any']:
+        st.dataframe(df[geometry > 0][['carat', 'depth', 'x', 'y', 'z', 'price']], hide_index=True)
 
+    profiler.start_section("10. Hypotesprövningar")
     st.markdown('<a name="hypotesprovningar"></a>', unsafe_allow_html=True)
     st.header("10. Hypotesprövningar")
     st.markdown("Syfte: Undersöka om diamanter med högre vikt (carat) har större spridning i pris än lättare diamanter. Vi delar diamanterna i två grupper: små (carat <= median) och stora (carat > median). Vi använder ett enkelt stapeldiagram för att visa prisvariationen.")
     st.markdown("**Begreppsförklaring:** Prisvariation betyder hur mycket priserna skiljer sig åt inom en grupp. Hög variation betyder att det finns både billiga och dyra diamanter i gruppen.")
-    carat_median = df['carat'].median()
-    df['carat_group'] = ['Låg vikt' if c <= carat_median else 'Hög vikt' for c in df['carat']]
-    price_std = df.groupby('carat_group')['price'].std()
-    fig_var = px.bar(x=price_std.index, y=price_std.values, labels={'x': 'Viktgrupp', 'y': 'Prisvariation (std)'}, title='Prisvariation för små och stora diamanter')
-    st.plotly_chart(fig_var, use_container_width=True)
+    show_figure(warm, pending, 'price_std_bar')
     st.markdown("**Diagramtyp:** Stapeldiagram (bar chart) för prisvariation.")
     st.markdown("**Hur man tolkar:** Varje stapel visar hur mycket priserna varierar inom gruppen. Hög stapel = stor variation.")
     st.markdown("**Tolkning:** Stora diamanter har större prisvariation än små diamanter.")
     st.markdown("**Insikt:** Priset på stora diamanter kan skilja sig mycket, beroende på andra faktorer som kvalitet och sällsynthet.")
     st.markdown("**Affärsmässig tolkning:** Guldfynd bör vara extra noga med prissättning av stora diamanter, eftersom priset kan variera mycket även inom samma viktgrupp.")
 
+    profiler.start_section("11. Interaktiv analys")
     st.markdown('<a name="interaktiv-analys"></a>', unsafe_allow_html=True)
     st.header("11. Interaktiv analys")
     st.markdown("Syfte: Filtrera och analysera diamanter utifrån valda kvalitetsattribut och pris.")
@@ -483,102 +722,80 @@ Datakvalitet: Datasetet innehåller extremvärden och saknade värden som kan p
         z_min, z_max = float(df['z'].min()), float(df['z'].max())
         z_range = st.slider('Höjdintervall (z)', min_value=z_min, max_value=z_max, value=(z_min, z_max), step=0.01, key='z_slider', help='Filtrera på diamantens höjd (mm)', label_visibility='visible')
     # Filtrera data baserat på valda parametrar
-    filtered_df = df.copy()
-    if selected_cut:
-        filtered_df = filtered_df[filtered_df['cut'].isin(selected_cut)]
-    if selected_color:
-        filtered_df = filtered_df[filtered_df['color'].isin(selected_color)]
-    if selected_clarity:
-        filtered_df = filtered_df[filtered_df['clarity'].isin(selected_clarity)]
-    filtered_df = filtered_df[(filtered_df['price'] >= price_range[0]) & (filtered_df['price'] <= price_range[1])]
-    filtered_df = filtered_df[(filtered_df['carat'] >= carat_range[0]) & (filtered_df['carat'] <= carat_range[1])]
-    filtered_df = filtered_df[(filtered_df['depth'] >= depth_range[0]) & (filtered_df['depth'] <= depth_range[1])]
-    filtered_df = filtered_df[(filtered_df['table'] >= table_range[0]) & (filtered_df['table'] <= table_range[1])]
-    # Visa statistik och visualiseringar för filtrerad data
-    st.subheader("Statistik för valda diamanter")
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Antal diamanter", f"{len(filtered_df):,}")
-    with col2:
-        st.metric("Medelpris", f"${filtered_df['price'].mean():,.2f}")
-    with col3:
-        st.metric("Medelvikt", f"{filtered_df['carat'].mean():.2f} carat")
-    fig_filt_price = px.histogram(filtered_df, x='price', nbins=30, title='Prisfördelning (Filtrerad)')
-    st.plotly_chart(fig_filt_price, use_container_width=True)
+    ranges = {'price': price_range, 'carat': carat_range, 'depth': depth_range, 'table': table_range}
+    full_ranges = {'price': (int(df['price'].min()), int(df['price'].max())), 'carat': (carat_min, carat_max),
+                   'depth': (depth_min, depth_max), 'table': (table_min, table_max)}
+    store = manifest = None
+    if isinstance(watcher, data_watcher.StoreWatcher):
+        store, manifest = watcher.store, watcher.manifest
+    stats, (fig_filt_price, fig_filt_carat) = select_diamonds(warm, selected_cut, selected_color, selected_clarity,
+                                                              ranges, full_ranges, store, manifest)
+    show_filtered_stats(*stats)
+    draw_figure(st, fig_filt_price)
     st.markdown("**Diagramtyp:** Histogram för prisfördelning (filtrerad data).")
     st.markdown("**Hur man tolkar:** Visar hur priserna fördelar sig i det valda segmentet.")
     st.markdown("**Tolkning:** Filtrering ger möjlighet att analysera specifika segment och deras prisfördelning.")
     st.markdown("**Insikt:** Möjlighet att identifiera attraktiva segment för riktad marknadsföring.")
-    fig_filt_carat = px.histogram(filtered_df, x='carat', nbins=30, title='Viktfördelning (Filtrerad)')
-    st.plotly_chart(fig_filt_carat, use_container_width=True)
+    draw_figure(st, fig_filt_carat)
     st.markdown("**Diagramtyp:** Histogram för viktfördelning (filtrerad data).")
     st.markdown("**Hur man tolkar:** Visar hur vikterna fördelar sig i det valda segmentet.")
     st.markdown("**Tolkning:** Filtrering ger möjlighet att analysera specifika segment och deras viktfördelning.")
     st.markdown("**Insikt:** Möjlighet att anpassa lager och inköp efter efterfrågan i olika segment.")
     st.markdown("**Affärsmässig tolkning:** Guldfynd kan använda denna analys för att optimera lager och inköp.")
 
+    profiler.start_section("12. Beslutsstöd")
     st.markdown('<a name="beslutsstod"></a>', unsafe_allow_html=True)
     st.header("12. Beslutsstöd: Ska vi köpa diamanten?")
     st.markdown("Syfte: Hjälpa styrelsen att fatta datadrivna beslut om inköp av enskilda diamanter baserat på analysen ovan.")
 
-    # Funktion för att fatta beslut om köp
-    @st.cache_data
-    def get_reference_stats(df):
-        # Beräkna referensvärden för pris per carat per kvalitet
-        ref = df.groupby(['cut', 'color', 'clarity'])[['price', 'carat']].median().reset_index()
-        ref['price_per_carat'] = ref['price'] / ref['carat']
-        return ref
-
-    reference_stats = get_reference_stats(df)
-
-    def should_buy_diamond(carat, cut, color, clarity, price, depth, table, x, y, z, df, reference_stats):
-        # Grundläggande kontroller
-        if carat <= 0 or price <= 0 or x <= 0 or y <= 0 or z <= 0:
-            return ("Nej", "Ogiltiga värden: carat, pris och dimensioner måste vara större än 0.")
-        # Kontrollera om egenskaperna är extremvärden
-        for col, val in zip(['carat','price','depth','table','x','y','z'], [carat,price,depth,table,x,y,z]):
-            Q1 = df[col].quantile(0.25)
-            Q3 = df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            if val < (Q1 - 1.5*IQR) or val > (Q3 + 1.5*IQR):
-                return ("Nej", f"{col}={val} är ett extremvärde jämfört med marknaden. Undvik köp utan manuell granskning.")
-        # Jämför pris per carat mot referens för denna kvalitet
-        ref_row = reference_stats[(reference_stats['cut']==cut) & (reference_stats['color']==color) & (reference_stats['clarity']==clarity)]
-        if not ref_row.empty:
-            ref_ppc = ref_row.iloc[0]['price_per_carat']
-            ppc = price / carat
-            if ppc > ref_ppc * 1.2:
-                return ("Nej", f"Priset per carat ({ppc:.0f} USD) är mer än 20% högre än medianen för denna kvalitet ({ref_ppc:.0f} USD). Undvik köp.")
-            elif ppc < ref_ppc * 0.7:
-                return ("Ja", f"Priset per carat ({ppc:.0f} USD) är lågt jämfört med marknaden för denna kvalitet. Möjligt fynd!")
-            else:
-                return ("Ja", f"Priset per carat ({ppc:.0f} USD) är rimligt för denna kvalitet.")
-        else:
-            return ("Nej", "Kombinationen av cut, color och clarity är ovanlig i marknaden. Kräver manuell granskning.")
-
-    # Formulär för att mata in diamantens egenskaper
+    # Formulär för att mata in diamantens egenskaper. Startvärdena sätts i session state,
+    # där snabbvalen av tidigare värderingar också fyller i formuläret.
+    for name, value in FORM_DEFAULTS.items():
+        st.session_state.setdefault(f'form_{name}', value)
     with st.form("diamond_decision_form"):
         st.subheader("Fatta beslut om enskild diamant")
         col1, col2, col3 = st.columns(3)
         with col1:
-            carat = st.number_input('Vikt (carat)', min_value=0.01, max_value=5.0, value=0.5, step=0.01)
-            price = st.number_input('Pris (USD)', min_value=1, max_value=100000, value=3000, step=1)
-            cut = st.selectbox('Slipning (cut)', cut_order)
+            carat = st.number_input('Vikt (carat)', min_value=0.01, max_value=5.0, step=0.01, key='form_carat')
+            price = st.number_input('Pris (USD)', min_value=1, max_value=100000, step=1, key='form_price')
+            cut = st.selectbox('Slipning (cut)', cut_order, key='form_cut')
         with col2:
-            color = st.selectbox('Färg (color)', color_order)
-            clarity = st.selectbox('Klarhet (clarity)', clarity_order)
-            depth = st.number_input('Djup (%)', min_value=40.0, max_value=80.0, value=61.0, step=0.1)
+            color = st.selectbox('Färg (color)', color_order, key='form_color')
+            clarity = st.selectbox('Klarhet (clarity)', clarity_order, key='form_clarity')
+            depth = st.number_input('Djup (%)', min_value=40.0, max_value=80.0, step=0.1, key='form_depth')
         with col3:
-            table = st.number_input('Tavla (%)', min_value=40.0, max_value=100.0, value=57.0, step=0.1)
-            x = st.number_input('Längd (x, mm)', min_value=0.1, max_value=15.0, value=5.0, step=0.01)
-            y = st.number_input('Bredd (y, mm)', min_value=0.1, max_value=15.0, value=5.0, step=0.01)
-            z = st.number_input('Höjd (z, mm)', min_value=0.1, max_value=10.0, value=3.2, step=0.01)
+            table = st.number_input('Tavla (%)', min_value=40.0, max_value=100.0, step=0.1, key='form_table')
+            x = st.number_input('Längd (x, mm)', min_value=0.1, max_value=15.0, step=0.01, key='form_x')
+            y = st.number_input('Bredd (y, mm)', min_value=0.1, max_value=15.0, step=0.01, key='form_y')
+            z = st.number_input('Höjd (z, mm)', min_value=0.1, max_value=10.0, step=0.01, key='form_z')
         submitted = st.form_submit_button("Få rekommendation")
-        if submitted:
-            beslut, motivering = should_buy_diamond(carat, cut, color, clarity, price, depth, table, x, y, z, df, reference_stats)
+        # A diamond picked from the recent appraisals below is shown as if it was submitted
+        if submitted or st.session_state.pop('appraisal_recalled', False):
+            # Samma indata ger samma värdering, så den hämtas från cachen om den redan gjorts
+            beslut, motivering, comparables, band = appraise(warm, dict(carat=carat, cut=cut, color=color, clarity=clarity, price=price,
+                                                                  depth=depth, table=table, x=x, y=y, z=z))
             st.success(f"Rekommendation: {beslut}")
             st.info(f"Motivering: {motivering}")
+            if not math.isnan(band[0]):
+                st.caption(f"Hälften av diamanterna med denna kvalitet och vikt kostar mellan {band[0]:,.0f} och "
+                           f"{band[1]:,.0f} USD per carat.")
+            # Visa de mest lika diamanterna i marknaden
+            st.markdown(f"**Jämförbara diamanter:** De {len(comparables)} mest lika diamanterna i marknaden har medianpriset ${comparables['price'].median():,.0f}.")
+            if not comparables['same_quality'].any():
+                st.caption("Kombinationen av cut, color och clarity har för få diamanter, så jämförelsen görs mot hela marknaden.")
+            st.dataframe(comparables.drop(columns=['candidate', 'rank', 'same_quality']), hide_index=True)
 
+    # Snabbval av sessionens senaste värderingar
+    history = st.session_state.get('appraisal_history', [])
+    if history:
+        st.markdown("**Senaste värderingar:**")
+        for i, (key, beslut_tidigare) in enumerate(history):
+            inputs = appraisal_cache.as_inputs(key)
+            st.button(f"{inputs['carat']} carat {inputs['cut']} {inputs['color']} {inputs['clarity']}, "
+                      f"{inputs['price']:,.0f} USD: {beslut_tidigare}",
+                      key=f'recall_{i}', on_click=recall_appraisal, args=(key,))
+
+    profiler.start_section("13. Executive summary")
     st.markdown('<a name="executive-summary"></a>', unsafe_allow_html=True)
     st.header("13. Executive summary och data storytelling")
     st.markdown("""
@@ -636,5 +853,9 @@ Datakvalitet: Datasetet innehåller extremvärden och saknade värden som kan p
       _Fortsätt analysera data löpande för att anpassa strategin till marknadens förändringar._
     """)
 
+    # Fyll i diagram som inte var klara när sidan ritades
+    profiler.start_section("Väntan på uppvärmning")
+    fill_pending_figures(warm, pending)
+
 if __name__ == "__main__":
     analyze_diamonds() 
\ No newline at end of file
@@ -0,0 +1,149 @@
+# Payload budgets for the dashboard sections.
+#
+# Every figure is sent to the browser as Plotly JSON over Streamlit's websocket, and a
+# few scatter plots of every diamond make up most of a page. The budget measures the
+# JSON of each figure before it is drawn and charges it to its section. A figure that
+# would take its section over the budget is replaced by its binned variant (see
+# figures.binned()), and sections that are still over budget are logged at the end of
+# the run. Sizes and binned variants are computed once per figure object, so the
+# figures of the warm-up, which every session draws, are only measured once.
+
+# Import required libraries
+import json  # For structured log lines
+import logging  # For reporting sections over budget
+import os  # For reading the environment
+import threading  # For per-session state and the shared cache
+import weakref  # For forgetting figures that are no longer used
+
+import figures  # Figure builders and the binned variants
+
+# Environment variable with the budget per section in kB, 0 turns the budget off
+ENV_VAR = 'DIAMONDS_PAYLOAD_BUDGET_KB'
+DEFAULT_BUDGET_KB = 500
+
+logger = logging.getLogger('diamonds.payload')
+
+# The budget of the session running in this thread (Streamlit runs each session in its own thread)
+_active = threading.local()
+# Measured figures, shared by all sessions: id(figure) -> cache entry, see _entry()
+_lock = threading.Lock()
+_measured = {}
+
+
+def budget_from_env():
+    """
+    Budget per section from DIAMONDS_PAYLOAD_BUDGET_KB.
+    Returns:
+        int: Bytes per section, 0 if payloads should not be limited
+    """
+    return int(float(os.environ.get(ENV_VAR, DEFAULT_BUDGET_KB)) * 1000)
+
+
+def _entry(fig):
+    """
+    Cache entry of a figure, created when the figure is first measured.
+    Returns:
+        dict: 'size' of the figure's JSON in bytes, and 'binned' once the binned variant is made
+    """
+    key = id(fig)
+    with _lock:
+        entry = _measured.get(key)
+    if entry is not None and entry['ref']() is fig:
+        return entry
+    # Forget the figure once it is garbage collected, before its id can be reused
+    entry = {'ref': weakref.ref(fig, lambda _, key=key: _measured.pop(key, None)),
+             'size': len(fig.to_json(validate=False))}
+    with _lock:
+        _measured[key] = entry
+    return entry
+
+
+def payload_size(fig):
+    """
+    Size of the JSON Streamlit sends for a figure.
+    Returns:
+        int: Bytes
+    """
+    return _entry(fig)['size']
+
+
+def binned_variant(fig):
+    """
+    The binned variant of a figure (see figures.binned()), made once per figure object.
+    Returns:
+        plotly.graph_objects.Figure: The variant, or None if the figure cannot be binned
+    """
+    entry = _entry(fig)
+    if 'binned' not in entry:
+        entry['binned'] = figures.binned(fig)
+    return entry['binned']
+
+
+class PayloadBudget:
+    """
+    Keeps the figures of each section of one script run within the budget.
+    """
+
+    def __init__(self, budget):
+        """
+        Args:
+            budget (int): Bytes per section, 0 to only measure
+        """
+        self.budget = budget
+        # Section -> bytes sent, figures sent and figures replaced by their binned variant
+        self.sections = {}
+
+    def fit(self, fig, section):
+        """
+        The figure to draw in a section: the figure itself, or its binned variant if the
+        figure would take the section over its budget.
+        Args:
+            fig (plotly.graph_objects.Figure): The figure
+            section (str): Name of the section it is drawn in
+        Returns:
+            plotly.graph_objects.Figure: The figure to draw
+        """
+        used = self.sections.setdefault(section, {'bytes': 0, 'figures': 0, 'binned': 0})
+        size = payload_size(fig)
+        if self.budget and used['bytes'] + size > self.budget and binned_variant(fig) is not None:
+            fig = binned_variant(fig)
+            size = payload_size(fig)
+            used['binned'] += 1
+        used['bytes'] += size
+        used['figures'] += 1
+        return fig
+
+    def over_budget(self):
+        """
+        Sections that sent more than the budget.
+        Returns:
+            dict: The usage of those sections, by name
+        """
+        return {name: used for name, used in self.sections.items() if self.budget and used['bytes'] > self.budget}
+
+    def __enter__(self):
+        _active.budget = self
+        return self
+
+    def __exit__(self, *exc_info):
+        _active.budget = None
+        for name, used in self.over_budget().items():
+            logger.warning(json.dumps({'section': name, 'budget_bytes': self.budget, **used}, ensure_ascii=False))
+
+
+def current():
+    """
+    The payload budget of the script run in this thread.
+    Returns:
+        PayloadBudget or None: The active budget, if any
+    """
+    return getattr(_active, 'budget', None)
+
+
+def fit(fig, section):
+    """
+    The figure to draw in a section, within the active budget (see PayloadBudget.fit()).
+    Without an active budget the figure is returned unchanged.
+    """
+    budget = current()
+    return fig if budget is None else budget.fit(fig, section)
@@ -0,0 +1,115 @@
+# Price-per-carat curves per quality combination, for appraising a diamond against
+# stones of about the same weight.
+#
+# Price per carat rises steeply with carat: within one (cut, color, clarity) combination
+# a 2 carat stone typically costs three times as much per carat as a 0.3 carat stone.
+# One median per combination therefore makes small stones look like bargains and
+# large stones look overpriced. The index splits every combination into carat bins and
+# keeps quantiles of the price per carat in each bin that has enough diamonds, placed
+# at the bin's median carat. A candidate is compared against the curve interpolated
+# linearly at its own carat, and beyond the outermost bins the curve stays flat.
+
+# Import required libraries
+import numpy as np  # For the curve arrays and interpolation
+import pandas as pd  # For mapping categories to codes
+
+import aggregates  # Cells of the quality combinations
+import diamond_analysis as da  # Category orders
+
+# Carat bins, with edges at the weights where prices jump
+CARAT_EDGES = np.array([0.2, 0.3, 0.4, 0.5, 0.7, 0.9, 1.0, 1.25, 1.5, 2.0, 3.0])
+# Quantiles of the price per carat kept per bin
+QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+# Fewest diamonds in a bin for it to become a point of the curve
+MIN_ROWS = 10
+
+
+def _cells(cuts, colors, clarities):
+    """
+    Cube cell of every candidate, -1 if a category is missing or unknown.
+    """
+    codes = [pd.Categorical(values, categories=da.CATEGORY_ORDERS[axis]).codes.astype(np.int64)
+             for axis, values in zip(aggregates.AXES, [cuts, colors, clarities])]
+    known = np.logical_and.reduce([code >= 0 for code in codes])
+    cells = np.ravel_multi_index([np.maximum(code, 0) for code in codes], aggregates.SHAPE)
+    return np.where(known, cells, -1)
+
+
+class PriceCurveIndex:
+    """
+    Quantile curves of the price per carat over carat, per (cut, color, clarity).
+
+    The curves are stored as arrays indexed by cube cell (see aggregates.cell_codes()):
+    `carats` holds the carat of each point, padded with infinity, and `values` the
+    quantiles at each point. A combination whose bins are all too small gets one point
+    from all its diamonds, so every combination in the market has a curve.
+    """
+
+    def __init__(self, df):
+        """
+        Build the curves.
+        Args:
+            df (pandas.DataFrame): Market diamonds with carat, price, cut, color and clarity
+        """
+        data = df[['carat', 'price']].assign(cell=aggregates.cell_codes(df)).dropna()
+        data = data[data['carat'] > 0]
+        data['price_per_carat'] = data['price'] / data['carat']
+        data['bin'] = np.searchsorted(CARAT_EDGES, data['carat'].to_numpy(), side='right')
+
+        grouped = data.groupby(['cell', 'bin'])
+        points = grouped['carat'].median().to_frame().assign(count=grouped.size())
+        points = points.join(grouped['price_per_carat'].quantile(QUANTILES).unstack())
+        points = points[points['count'] >= MIN_ROWS].reset_index()
+        # One point from all diamonds of the combinations without a large enough bin
+        sparse = data[~data['cell'].isin(points['cell'])].groupby('cell')
+        single = sparse['carat'].median().to_frame().join(sparse['price_per_carat'].quantile(QUANTILES).unstack())
+        points = pd.concat([points, single.reset_index()]).sort_values(['cell', 'carat'])
+
+        size = int(np.prod(aggregates.SHAPE))
+        cells = points['cell'].to_numpy(dtype=np.int64)
+        # Position of each point within its cell
+        rank = np.arange(len(points)) - np.searchsorted(cells, cells, side='left')
+        width = int(rank.max()) + 1 if len(points) else 1
+        self.carats = np.full((size, width), np.inf, dtype=np.float32)
+        self.values = np.full((size, width, len(QUANTILES)), np.nan, dtype=np.float32)
+        self.counts = np.bincount(cells, minlength=size)
+        self.carats[cells, rank] = points['carat'].to_numpy()
+        self.values[cells, rank] = points[QUANTILES].to_numpy()
+
+    def quantiles(self, cuts, colors, clarities, carats):
+        """
+        The price per carat quantiles of the curves at the candidates' carats.
+        Args:
+            cuts, colors, clarities (array-like): Quality of each candidate
+            carats (array-like): Carat of each candidate
+        Returns:
+            numpy.ndarray: One row of QUANTILES per candidate, NaN if the combination
+                has no diamonds in the market
+        """
+        cells = _cells(cuts, colors, clarities)
+        carats = np.asarray(carats, dtype=float)
+        result = np.full((len(cells), len(QUANTILES)), np.nan)
+        known = cells >= 0
+        known[known] = self.counts[cells[known]] > 0
+        cells, carat = cells[known], carats[known]
+        # Point at or below the carat and the one above it, clamped to the ends of the curve
+        xs = self.carats[cells].astype(float)
+        n = self.counts[cells]
+        above = np.minimum((xs <= carat[:, None]).sum(axis=1), n - 1)
+        below = np.maximum(above - 1, 0)
+        rows = np.arange(len(cells))
+        x0, x1 = xs[rows, below], xs[rows, above]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            share = np.where(x1 > x0, (carat - x0) / (x1 - x0), 0.0)
+        share = np.clip(share, 0.0, 1.0)[:, None]
+        y0, y1 = self.values[cells, below], self.values[cells, above]
+        result[known] = y0 + share * (y1 - y0)
+        return result
+
+    def median(self, cuts, colors, clarities, carats):
+        """
+        The median price per carat of the curves at the candidates' carats.
+        Returns:
+            numpy.ndarray: One value per candidate, NaN if the combination is not in the market
+        """
+        return self.quantiles(cuts, colors, clarities, carats)[:, QUANTILES.index(0.5)]
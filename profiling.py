@@ -0,0 +1,218 @@
+# Per-section timing and memory instrumentation for the dashboard.
+#
+# Profiling is off by default and costs nothing then. When enabled, every section and
+# every figure build is timed and its memory use is traced with tracemalloc. Results
+# are logged as JSON lines and aggregated per process into Prometheus-style metrics.
+# tracemalloc is process-wide: once a profiled run has started it, it stays on, and
+# memory figures of sessions profiled at the same time include each other's allocations.
+
+# Import required libraries
+import json  # For structured log lines
+import logging  # For emitting the measurements
+import os  # For reading the environment
+import threading  # For per-session state and thread-safe counters
+import time  # For measuring wall time
+import tracemalloc  # For measuring memory use
+from contextlib import contextmanager  # For the timing context managers
+from functools import wraps  # For the figure decorator
+
+# Environment variable that turns profiling on for every session
+ENV_VAR = 'DIAMONDS_PROFILE'
+# Optional file the Prometheus metrics are written to (e.g. for the node_exporter textfile collector)
+METRICS_FILE_ENV_VAR = 'DIAMONDS_PROFILE_METRICS_FILE'
+
+logger = logging.getLogger('diamonds.profiling')
+
+# The profiler of the session running in this thread (Streamlit runs each session in its own thread)
+_active = threading.local()
+# Process-wide totals, shared by all sessions
+_lock = threading.Lock()
+_totals = {}
+_cache_calls = {}
+_cache_misses = {}
+
+
+def env_enabled():
+    """
+    Check whether profiling is turned on through the environment.
+    Returns:
+        bool: True if DIAMONDS_PROFILE is set to 1/true/yes
+    """
+    return os.environ.get(ENV_VAR, '').lower() in ('1', 'true', 'yes')
+
+
+def record_cache_call(name):
+    """
+    Count a call to a cached function. Call this where the cached function is called.
+    """
+    with _lock:
+        _cache_calls[name] = _cache_calls.get(name, 0) + 1
+
+
+def record_cache_miss(name):
+    """
+    Count a cache miss. Call this inside the body of the cached function, which only
+    runs when the cache has no result.
+    """
+    with _lock:
+        _cache_misses[name] = _cache_misses.get(name, 0) + 1
+
+
+def cache_stats():
+    """
+    Hits and misses per cached function since the process started.
+    Returns:
+        dict: {'function': {'hits': int, 'misses': int}}
+    """
+    with _lock:
+        return {name: {'hits': max(calls - _cache_misses.get(name, 0), 0), 'misses': _cache_misses.get(name, 0)}
+                for name, calls in _cache_calls.items()}
+
+
+class Profiler:
+    """
+    Collects timing and memory measurements for one script run.
+    """
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.records = []
+        # Name of the current section, also kept when profiling is off
+        self.section = None
+        self._open_section = None
+        self._peaks = []
+
+    @contextmanager
+    def measure(self, kind, name):
+        """
+        Time a block and trace its memory use.
+        Args:
+            kind (str): 'section' or 'figure'
+            name (str): Name of the section or figure
+        """
+        if not self.enabled:
+            yield
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        start_memory, enclosing_peak = tracemalloc.get_traced_memory()
+        # Keep the peak of an enclosing measurement before resetting it
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], enclosing_peak)
+        tracemalloc.reset_peak()
+        self._peaks.append(0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            end_memory, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self._peaks.pop())
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            self._record({'kind': kind, 'name': name, 'seconds': seconds,
+                          'memory_delta_mb': (end_memory - start_memory) / 1e6,
+                          'peak_mb': (peak - start_memory) / 1e6})
+
+    def start_section(self, name):
+        """
+        Start timing a section. The previous section, if any, ends here.
+        """
+        self.end_section()
+        self.section = name
+        if self.enabled:
+            self._open_section = self.measure('section', name)
+            self._open_section.__enter__()
+
+    def end_section(self):
+        """
+        Stop timing the current section.
+        """
+        if self._open_section is not None:
+            self._open_section.__exit__(None, None, None)
+            self._open_section = None
+
+    def _record(self, record):
+        """
+        Store a measurement, log it and add it to the process totals.
+        """
+        self.records.append(record)
+        logger.info(json.dumps(record, ensure_ascii=False))
+        key = (record['kind'], record['name'])
+        with _lock:
+            count, seconds = _totals.get(key, (0, 0.0))
+            _totals[key] = (count + 1, seconds + record['seconds'])
+
+    def __enter__(self):
+        _active.profiler = self
+        return self
+
+    def __exit__(self, *exc_info):
+        self.end_section()
+        _active.profiler = None
+        if self.enabled and os.environ.get(METRICS_FILE_ENV_VAR):
+            write_metrics_file(os.environ[METRICS_FILE_ENV_VAR])
+
+
+def current():
+    """
+    The profiler of the script run in this thread.
+    Returns:
+        Profiler or None: The active profiler, if any
+    """
+    return getattr(_active, 'profiler', None)
+
+
+def profiled_figure(builder):
+    """
+    Decorator that times a figure builder when profiling is active.
+    """
+    @wraps(builder)
+    def wrapper(*args, **kwargs):
+        profiler = current()
+        if profiler is None or not profiler.enabled:
+            return builder(*args, **kwargs)
+        with profiler.measure('figure', f"{builder.__name__}: {kwargs.get('title', '')}"):
+            return builder(*args, **kwargs)
+    return wrapper
+
+
+def _escape(value):
+    """
+    Escape a Prometheus label value.
+    """
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+def prometheus_metrics():
+    """
+    Process-wide metrics in the Prometheus text exposition format.
+    Returns:
+        str: The metrics
+    """
+    lines = [
+        '# HELP diamonds_render_seconds Time spent rendering sections and building figures.',
+        '# TYPE diamonds_render_seconds summary',
+    ]
+    with _lock:
+        totals = dict(_totals)
+    for (kind, name), (count, seconds) in sorted(totals.items()):
+        labels = f'kind="{kind}",name="{_escape(name)}"'
+        lines.append(f'diamonds_render_seconds_sum{{{labels}}} {seconds:.6f}')
+        lines.append(f'diamonds_render_seconds_count{{{labels}}} {count}')
+    lines.append('# HELP diamonds_cache_requests_total Calls to cached functions by result.')
+    lines.append('# TYPE diamonds_cache_requests_total counter')
+    for name, stats in sorted(cache_stats().items()):
+        lines.append(f'diamonds_cache_requests_total{{function="{name}",result="hit"}} {stats["hits"]}')
+        lines.append(f'diamonds_cache_requests_total{{function="{name}",result="miss"}} {stats["misses"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_metrics_file(path):
+    """
+    Write the metrics atomically, so a collector never reads a half-written file.
+    """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(prometheus_metrics())
+    os.replace(tmp_path, path)
@@ -0,0 +1,291 @@
+# Read-only dataset shared between worker processes through memory-mapped files.
+#
+# The first worker publishes the cleaned dataset (and any precomputed arrays) as .npy
+# files in a directory, by default under /dev/shm so the files live in shared memory.
+# Every worker then memory-maps the same files read-only, so the operating system
+# keeps one copy of the data in RAM however many workers a host runs. The aggregates
+# the warm-up derives from the dataset (cube, outlier fences and reference values) are
+# published next to it, so only the first worker computes them.
+#
+# A changed source file gets a new store directory. Each process leaves a reference
+# file in the stores it has attached, and after attaching a new version it removes
+# the older stores that no running process refers to. Publishing, attaching and
+# removing happen under a file lock, so a store is never removed while it is attached.
+
+# Import required libraries
+import contextlib  # For the store lock
+import hashlib  # For naming the store after the source file
+import json  # For the manifest
+import os  # For atomic renames and the environment
+import shutil  # For removing a losing concurrent publish
+import tempfile  # For the fallback store location
+from pathlib import Path  # For handling file paths
+
+try:
+    import fcntl  # For locking the stores between processes
+except ImportError:  # Not available on Windows, where old stores are kept
+    fcntl = None
+
+import numpy as np  # For the memory-mapped arrays
+import pandas as pd  # For rebuilding DataFrames on top of the arrays
+
+# Set to 1 to use the shared store, or to a directory to also choose where it lives
+ENV_VAR = 'DIAMONDS_SHARED_STORE'
+# Prefix of the store directories, and the lock file next to them
+STORE_PREFIX = 'diamonds-'
+LOCK_NAME = '.diamonds.lock'
+
+
+def enabled():
+    """
+    Check whether the shared store is turned on through the environment.
+    Returns:
+        bool: True if DIAMONDS_SHARED_STORE is set
+    """
+    return os.environ.get(ENV_VAR, '').lower() not in ('', '0', 'false', 'no')
+
+
+def default_root():
+    """
+    Directory the stores are created in: the DIAMONDS_SHARED_STORE path if one is
+    given, otherwise /dev/shm (shared memory) or the temp directory.
+    Returns:
+        Path: The root directory
+    """
+    value = os.environ.get(ENV_VAR, '')
+    if value and value.lower() not in ('1', 'true', 'yes'):
+        return Path(value)
+    shm = Path('/dev/shm')
+    return shm if shm.is_dir() else Path(tempfile.gettempdir())
+
+
+def source_version(path):
+    """
+    Fingerprint of a source file, so a changed file gets a new store.
+    Returns:
+        str: Short hash of the path, size and modification time
+    """
+    stat = os.stat(path)
+    key = f'{Path(path).resolve()}:{stat.st_size}:{stat.st_mtime_ns}'
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+class SharedStore:
+    """
+    A directory of named, read-only entries. An entry is either a DataFrame or a dict
+    of numpy arrays, stored as .npy files plus a manifest.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def _publish(self, name, write):
+        """
+        Write an entry into a temporary directory and rename it into place. The rename
+        is atomic, so workers never see a half-written entry; if another worker
+        published the same entry first, its copy is kept.
+        """
+        target = self.directory / name
+        if (target / 'manifest.json').exists():
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f'.{name}-', dir=self.directory))
+        try:
+            write(tmp)
+            os.rename(tmp, target)
+        except OSError:
+            if not (target / 'manifest.json').exists():
+                raise
+        finally:
+            if tmp.exists():
+                shutil.rmtree(tmp, ignore_errors=True)
+
+    def publish_frame(self, name, df):
+        """
+        Publish a DataFrame. Numerical columns are stored as one 2D array per dtype,
+        text columns as integer category codes.
+        """
+        def write(tmp):
+            manifest = {'rows': len(df), 'columns': list(df.columns), 'blocks': {}, 'categories': {}}
+            numeric = {}
+            for col in df.columns:
+                if pd.api.types.is_numeric_dtype(df[col]) and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                    numeric.setdefault(str(df[col].dtype), []).append(col)
+                else:
+                    categorical = pd.Categorical(df[col])
+                    manifest['categories'][col] = [str(c) for c in categorical.categories]
+                    np.save(tmp / f'codes-{len(manifest["categories"]) - 1}.npy', categorical.codes)
+            for dtype, cols in numeric.items():
+                # Columns as rows, so each block can be handed to pandas without copying
+                np.save(tmp / f'{dtype}.npy', np.ascontiguousarray(df[cols].to_numpy(dtype=dtype).T))
+                manifest['blocks'][dtype] = cols
+            (tmp / 'manifest.json').write_text(json.dumps(manifest, ensure_ascii=False), encoding='utf-8')
+        self._publish(name, write)
+
+    def attach_frame(self, name):
+        """
+        Memory-map a published DataFrame. The numerical columns and category codes are
+        views of the shared files; writing to the DataFrame makes a private copy.
+        Returns:
+            pandas.DataFrame: The DataFrame, with text columns as categoricals
+        """
+        directory = self.directory / name
+        manifest = json.loads((directory / 'manifest.json').read_text(encoding='utf-8'))
+        parts = []
+        for dtype, cols in manifest['blocks'].items():
+            block = np.load(directory / f'{dtype}.npy', mmap_mode='r')
+            parts.append(pd.DataFrame(block.T, columns=cols, copy=False))
+        for i, (col, categories) in enumerate(manifest['categories'].items()):
+            codes = np.load(directory / f'codes-{i}.npy', mmap_mode='r')
+            series = pd.Series(pd.Categorical.from_codes(codes, categories=categories), name=col, copy=False)
+            parts.append(series.to_frame())
+        return pd.concat(parts, axis=1)[manifest['columns']]
+
+    def publish_arrays(self, name, arrays):
+        """
+        Publish a dict of numpy arrays, e.g. precomputed aggregates.
+        """
+        def write(tmp):
+            for key, array in arrays.items():
+                np.save(tmp / f'{key}.npy', np.asarray(array))
+            (tmp / 'manifest.json').write_text(json.dumps({'arrays': list(arrays)}), encoding='utf-8')
+        self._publish(name, write)
+
+    def attach_arrays(self, name):
+        """
+        Memory-map published arrays.
+        Returns:
+            dict: Read-only arrays by name
+        """
+        directory = self.directory / name
+        manifest = json.loads((directory / 'manifest.json').read_text(encoding='utf-8'))
+        return {key: np.load(directory / f'{key}.npy', mmap_mode='r') for key in manifest['arrays']}
+
+    def has(self, name):
+        """
+        Check whether an entry has been published.
+        """
+        return (self.directory / name / 'manifest.json').exists()
+
+    def register(self):
+        """
+        Record that this process has attached the store, so it is not removed.
+        """
+        refs = self.directory / 'refs'
+        refs.mkdir(parents=True, exist_ok=True)
+        (refs / str(os.getpid())).touch()
+
+
+@contextlib.contextmanager
+def locked(root):
+    """
+    Hold the lock of the stores in a root directory, shared by all processes on the host.
+    Without fcntl the block runs unlocked.
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / LOCK_NAME, 'a') as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _running(pid):
+    """
+    Check whether a process is still running.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def remove_unused(root, keep):
+    """
+    Remove the stores in a root directory that no running process refers to. Call
+    with the lock held. This process's references to other stores are dropped first,
+    since it has moved on to `keep`; arrays it already mapped stay valid after removal.
+    Args:
+        root (Path): Directory of the stores
+        keep (Path): The store in use, never removed
+    Returns:
+        list: The removed store directories
+    """
+    removed = []
+    for directory in root.glob(f'{STORE_PREFIX}*'):
+        if directory == keep or not directory.is_dir():
+            continue
+        refs = directory / 'refs'
+        (refs / str(os.getpid())).unlink(missing_ok=True)
+        live = [ref for ref in refs.glob('*') if ref.name.isdigit() and _running(int(ref.name))]
+        if not live:
+            shutil.rmtree(directory, ignore_errors=True)
+            removed.append(directory)
+    return removed
+
+
+def store_for(path):
+    """
+    The shared store for a source file. A changed source file gets a new directory.
+    Returns:
+        SharedStore: The store
+    """
+    return SharedStore(default_root() / f'{STORE_PREFIX}{source_version(path)}')
+
+
+def load_shared_dataset(path, load, store=None):
+    """
+    Attach to the shared copy of a dataset, publishing it first if no worker has yet,
+    and remove the stores of older versions that are no longer attached.
+    Args:
+        path (str or Path): Source file, used to version the store
+        load (callable): Loads and cleans the dataset, called only by the publishing worker
+        store (SharedStore): The store to use, store_for(path) if not given
+    Returns:
+        pandas.DataFrame: The memory-mapped dataset
+    """
+    store = store or store_for(path)
+    with locked(store.directory.parent):
+        if not store.has('dataset'):
+            store.publish_frame('dataset', load())
+        dataset = store.attach_frame('dataset')
+        store.register()
+        if fcntl is not None:
+            remove_unused(store.directory.parent, store.directory)
+    return dataset
+
+
+def share_frame(store, name, compute):
+    """
+    Attach a DataFrame derived from the dataset, computing and publishing it first if
+    no worker has yet.
+    Args:
+        store (SharedStore): The store of the dataset it is derived from
+        name (str): Name of the entry
+        compute (callable): Computes the DataFrame, called only by the publishing worker
+    Returns:
+        pandas.DataFrame: The memory-mapped DataFrame
+    """
+    with locked(store.directory.parent):
+        if not store.has(name):
+            store.publish_frame(name, compute())
+        return store.attach_frame(name)
+
+
+def share_arrays(store, name, compute):
+    """
+    Attach arrays derived from the dataset, computing and publishing them first if no
+    worker has yet (see share_frame()).
+    Returns:
+        dict: Read-only arrays by name
+    """
+    with locked(store.directory.parent):
+        if not store.has(name):
+            store.publish_arrays(name, compute())
+        return store.attach_arrays(name)
@@ -0,0 +1,169 @@
+# Import required libraries
+import numpy as np  # For numerical operations and random sampling
+import pandas as pd  # For data manipulation and analysis
+import diamond_analysis as da  # Category orders shared with the app
+
+# Columns of the generated data, in the same order as the bundled CSV
+OUTPUT_COLS = ['carat', 'cut', 'color', 'clarity', 'depth', 'table', 'price', 'x', 'y', 'z']
+# Cells with fewer diamonds than this use the pooled price model
+MIN_CELL_ROWS = 30
+
+
+class SyntheticDiamondModel:
+    """
+    Model of the joint distribution of the diamonds dataset, used to generate
+    realistic datasets of any size.
+
+    - (cut, color, clarity) combinations are drawn with their observed frequencies.
+    - Carat is drawn from the observed carats of the same combination, with a small
+      random variation, which keeps the typical peaks at 0.3, 0.5, 0.7 and 1.0 carat.
+    - Depth and table are drawn as pairs from diamonds with the same cut.
+    - Price follows log(price) = a + b * log(carat) + noise, fitted per combination.
+    - x grows with the cube root of carat, y follows the observed y/x ratio and z is
+      derived from depth, so the dimensions stay consistent with carat and depth.
+    """
+
+    def __init__(self, df):
+        """
+        Fit the model.
+        Args:
+            df (pandas.DataFrame): Diamonds dataset, e.g. from da.load_data()
+        """
+        df = df.dropna(subset=OUTPUT_COLS)
+        df = df[df['cut'].isin(da.CUT_ORDER) & df['color'].isin(da.COLOR_ORDER) & df['clarity'].isin(da.CLARITY_ORDER)]
+        self.shape = (len(da.CUT_ORDER), len(da.COLOR_ORDER), len(da.CLARITY_ORDER))
+        n_cells = int(np.prod(self.shape))
+
+        # Cell code per diamond: cut, color and clarity flattened to one integer
+        cut = pd.Categorical(df['cut'], categories=da.CUT_ORDER).codes
+        color = pd.Categorical(df['color'], categories=da.COLOR_ORDER).codes
+        clarity = pd.Categorical(df['clarity'], categories=da.CLARITY_ORDER).codes
+        cell = np.ravel_multi_index((cut, color, clarity), self.shape)
+
+        # Frequency of each combination
+        counts = np.bincount(cell, minlength=n_cells)
+        self.cell_p = counts / counts.sum()
+
+        # Observed carats grouped per combination, addressed by offset and count
+        order = np.argsort(cell, kind='stable')
+        self.carats = df['carat'].to_numpy()[order]
+        self.carat_offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        self.carat_counts = counts
+
+        # Observed (depth, table) pairs grouped per cut
+        cut_order = np.argsort(cut, kind='stable')
+        cut_counts = np.bincount(cut, minlength=self.shape[0])
+        self.proportions = df[['depth', 'table']].to_numpy()[cut_order]
+        self.proportion_offsets = np.concatenate([[0], np.cumsum(cut_counts)[:-1]])
+        self.proportion_counts = cut_counts
+
+        # Price model per combination, with a pooled model for rare combinations
+        log_carat = np.log(df['carat'].to_numpy())
+        log_price = np.log(df['price'].to_numpy())
+        pooled = self._fit_line(log_carat, log_price)
+        self.price_model = np.tile(pooled, (n_cells, 1))
+        for code in np.flatnonzero(counts >= MIN_CELL_ROWS):
+            mask = cell == code
+            self.price_model[code] = self._fit_line(log_carat[mask], log_price[mask])
+        self.price_range = (float(df['price'].min()), float(df['price'].max()))
+
+        # Dimensions: x relative to the cube root of carat, y relative to x (robust estimates)
+        log_x_ratio = np.log(df['x'].to_numpy()) - log_carat / 3
+        log_y_ratio = np.log(df['y'].to_numpy() / df['x'].to_numpy())
+        self.x_model = self._robust_normal(log_x_ratio)
+        self.y_model = self._robust_normal(log_y_ratio)
+
+    @staticmethod
+    def _fit_line(x, y):
+        """
+        Least-squares line with the standard deviation of the residuals.
+        Returns:
+            numpy.ndarray: Intercept, slope and residual standard deviation
+        """
+        slope, intercept = np.polyfit(x, y, 1)
+        residual_std = np.std(y - (intercept + slope * x))
+        return np.array([intercept, slope, residual_std])
+
+    @staticmethod
+    def _robust_normal(values):
+        """
+        Median and MAD-based standard deviation, insensitive to measurement errors.
+        Returns:
+            tuple: Location and scale
+        """
+        median = np.median(values)
+        return median, 1.4826 * np.median(np.abs(values - median))
+
+    def sample(self, n, rng):
+        """
+        Draw n synthetic diamonds.
+        Args:
+            n (int): Number of diamonds
+            rng (numpy.random.Generator): Random generator
+        Returns:
+            pandas.DataFrame: Diamonds with OUTPUT_COLS
+        """
+        cell = rng.choice(len(self.cell_p), size=n, p=self.cell_p)
+        cut, color, clarity = np.unravel_index(cell, self.shape)
+
+        # Carat from the same combination, with about 2% variation
+        pick = self.carat_offsets[cell] + (rng.random(n) * self.carat_counts[cell]).astype(np.int64)
+        carat = np.maximum(np.round(self.carats[pick] * np.exp(rng.normal(0, 0.02, n)), 2), 0.2)
+
+        # Depth and table from the same cut
+        pick = self.proportion_offsets[cut] + (rng.random(n) * self.proportion_counts[cut]).astype(np.int64)
+        depth = np.round(self.proportions[pick, 0] + rng.normal(0, 0.1, n), 1)
+        table = np.round(self.proportions[pick, 1] + rng.normal(0, 0.3, n))
+
+        # Price conditioned on carat and quality
+        intercept, slope, noise = self.price_model[cell].T
+        log_price = intercept + slope * np.log(carat) + rng.normal(0, 1, n) * noise
+        price = np.clip(np.round(np.exp(log_price)), *self.price_range)
+
+        # Dimensions consistent with carat and depth
+        x = np.exp(np.log(carat) / 3 + rng.normal(self.x_model[0], self.x_model[1], n))
+        y = x * np.exp(rng.normal(self.y_model[0], self.y_model[1], n))
+        z = depth / 100 * (x + y) / 2
+
+        return pd.DataFrame({
+            'carat': carat,
+            'cut': np.array(da.CUT_ORDER, dtype=object)[cut],
+            'color': np.array(da.COLOR_ORDER, dtype=object)[color],
+            'clarity': np.array(da.CLARITY_ORDER, dtype=object)[clarity],
+            'depth': depth,
+            'table': table,
+            'price': price,
+            'x': np.round(x, 2),
+            'y': np.round(y, 2),
+            'z': np.round(z, 2),
+        })
+
+
+def generate_chunks(model, n_rows, chunk_size=100000, seed=0):
+    """
+    Generate a synthetic dataset in chunks, so any size fits in memory.
+    Args:
+        model (SyntheticDiamondModel): The fitted model
+        n_rows (int): Total number of diamonds
+        chunk_size (int): Diamonds per chunk
+        seed (int): Seed for reproducible output
+    Yields:
+        pandas.DataFrame: One chunk, indexed from 1 continuing across chunks like the bundled CSV
+    """
+    rng = np.random.default_rng(seed)
+    start = 0
+    while start < n_rows:
+        size = min(chunk_size, n_rows - start)
+        chunk = model.sample(size, rng)
+        chunk.index = pd.RangeIndex(start + 1, start + size + 1)
+        yield chunk
+        start += size
+
+
+def generate(df, n_rows, seed=0):
+    """
+    Generate a synthetic dataset in memory.
+    Returns:
+        pandas.DataFrame: n_rows synthetic diamonds
+    """
+    return pd.concat(generate_chunks(SyntheticDiamondModel(df), n_rows, seed=seed))
@@ -0,0 +1,211 @@
+# Background warm-up of the dashboard's data and figures.
+#
+# Streamlit has no startup hook, so the app starts the pipeline from a cached resource
+# on the first script run of the server process. From then on the dataset, the
+# aggregates and the figures are computed in a thread pool, independent tasks in
+# parallel, while pages render what is ready and show placeholders for the rest.
+
+# Import required libraries
+import logging  # For reporting failed tasks
+import threading  # For the task state lock
+import time  # For timing the tasks
+from concurrent.futures import ThreadPoolExecutor, as_completed  # For running tasks in the background
+
+import pandas as pd  # For the shared outlier fences
+
+import aggregates  # Aggregate cube over the quality combinations
+import diamond_analysis as da  # Shared analysis logic
+import price_curves  # Price-per-carat curves for the appraisals
+import profiling  # Counts the cached computations
+import shared_store  # Aggregates shared between worker processes
+
+logger = logging.getLogger('diamonds.warmup')
+
+
+class TaskGraph:
+    """
+    Named tasks with dependencies, run in a thread pool. Each task receives the
+    results of its dependencies as keyword arguments.
+    """
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self._tasks = {}
+        self._futures = {}
+        self._seconds = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def add(self, name, func, deps=()):
+        """
+        Register a task. Dependencies must be registered before the tasks that use them.
+        Args:
+            name (str): Name of the task and its result
+            func (callable): Called with the dependency results as keyword arguments
+            deps (iterable): Names of the tasks whose results func needs
+        """
+        if name in self._tasks:
+            raise ValueError(f"Task {name!r} is already registered")
+        missing = [dep for dep in deps if dep not in self._tasks]
+        if missing:
+            raise ValueError(f"Task {name!r} depends on unknown tasks: {', '.join(missing)}")
+        self._tasks[name] = (func, tuple(deps))
+
+    def start(self):
+        """
+        Submit all tasks. Tasks are submitted in registration order, so a task only
+        waits for dependencies that are already running or done.
+        Returns:
+            TaskGraph: self, for chaining
+        """
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='warmup')
+        for name, (func, deps) in self._tasks.items():
+            self._futures[name] = self._executor.submit(self._run, name, func, deps)
+        self._executor.shutdown(wait=False)
+        return self
+
+    def _run(self, name, func, deps):
+        """
+        Wait for the dependencies of a task and run it.
+        """
+        kwargs = {dep: self._futures[dep].result() for dep in deps}
+        start = time.perf_counter()
+        try:
+            return func(**kwargs)
+        except Exception:
+            logger.exception("Warm-up task %s failed", name)
+            raise
+        finally:
+            with self._lock:
+                self._seconds[name] = time.perf_counter() - start
+
+    def ready(self, name):
+        """
+        Check whether a task has finished.
+        """
+        return self._futures[name].done()
+
+    def result(self, name, timeout=None):
+        """
+        The result of a task, waiting for it if it is still running.
+        Raises the task's exception if it failed.
+        """
+        return self._futures[name].result(timeout)
+
+    def wait(self):
+        """
+        Wait for all tasks. Raises the exception of the first failed task.
+        """
+        for future in self._futures.values():
+            future.result()
+
+    def as_completed(self, names):
+        """
+        Yield the names of the given tasks as they finish.
+        """
+        by_future = {self._futures[name]: name for name in names}
+        for future in as_completed(by_future):
+            yield by_future[future]
+
+    def status(self):
+        """
+        State and run time of every task.
+        Returns:
+            dict: {'task': {'state': 'pending'|'running'|'done'|'failed', 'seconds': float or None}}
+        """
+        states = {}
+        with self._lock:
+            seconds = dict(self._seconds)
+        for name, future in self._futures.items():
+            if future.done():
+                state = 'failed' if future.exception() else 'done'
+            else:
+                state = 'running' if future.running() else 'pending'
+            states[name] = {'state': state, 'seconds': seconds.get(name)}
+        return states
+
+
+def comparables_index(dataset):
+    """
+    Build the search index for comparable diamonds.
+    """
+    from comparables import ComparablesIndex  # Loads scikit-learn, so only imported when needed
+    return ComparablesIndex(dataset)
+
+
+def reference_stats(dataset):
+    """
+    Reference values for price per carat, counted as a cache miss like the cached function it replaces.
+    """
+    profiling.record_cache_miss('get_reference_stats')
+    return da.get_reference_stats(dataset)
+
+
+def category_stats(dataset):
+    """
+    Mean and median of price and carat per quality category (section 6).
+    Returns:
+        dict: {(category column, value column): (mean, median)}
+    """
+    return {(col, value_col): da.mean_median_by(dataset, col, value_col)
+            for col in da.CATEGORY_ORDERS for value_col in ['price', 'carat']}
+
+
+def shared_fences(store, dataset):
+    """
+    Outlier fences of the dataset, published in the shared store by the first worker.
+    Returns:
+        pandas.DataFrame: Output of da.outlier_fences(), backed by the shared arrays
+    """
+    arrays = shared_store.share_arrays(store, 'fences', lambda: {
+        bound: values.to_numpy() for bound, values in da.outlier_fences(dataset).items()})
+    return pd.DataFrame(arrays, index=da.NUMERICAL_COLS, copy=False)
+
+
+def add_data_tasks(graph, load_dataset, precomputed=None, shared=None):
+    """
+    Register the data tasks shared by the dashboard sections.
+    Args:
+        graph (TaskGraph): The graph to add the tasks to
+        load_dataset (callable): Returns the cleaned diamonds dataset
+        precomputed (dict): Results of 'dataset', 'cube', 'reference_stats' and/or 'fences' that
+            are already known, e.g. updated incrementally by the data watcher
+        shared (shared_store.SharedStore): Store of the dataset; if given, the cube, fences
+            and reference values are attached from it, computed only by the first worker
+    """
+    precomputed = precomputed or {}
+
+    def known(name, func, deps=()):
+        # Use the precomputed result if there is one
+        if name in precomputed:
+            graph.add(name, lambda: precomputed[name])
+        else:
+            graph.add(name, func, deps)
+
+    def cube(dataset):
+        return aggregates.build_cube(dataset)
+
+    def shared_task(name, share, compute):
+        # Attached from the shared store; a precomputed value is published as it is
+        graph.add(name, lambda dataset: share(
+            shared, name, lambda: precomputed[name] if name in precomputed else compute(dataset)), ['dataset'])
+
+    known('dataset', load_dataset)
+    if shared is not None:
+        known('fences', lambda dataset: shared_fences(shared, dataset), ['dataset'])
+        shared_task('reference_stats', shared_store.share_frame, reference_stats)
+        shared_task('cube', shared_store.share_arrays, cube)
+    else:
+        known('fences', lambda dataset: da.outlier_fences(dataset), ['dataset'])
+        known('reference_stats', reference_stats, ['dataset'])
+        known('cube', cube, ['dataset'])
+    graph.add('outlier_counts', lambda dataset, fences: da.outlier_counts(dataset, fences), ['dataset', 'fences'])
+    graph.add('missing_counts', lambda dataset: da.missing_counts(dataset), ['dataset'])
+    graph.add('geometry_flags', lambda dataset: da.geometry_flags(dataset), ['dataset'])
+    graph.add('correlation', lambda dataset: da.correlation_matrix(dataset), ['dataset'])
+    graph.add('category_stats', category_stats, ['dataset'])
+    graph.add('category_counts', lambda dataset: {col: da.category_counts(dataset, col) for col in da.CATEGORY_ORDERS},
+              ['dataset'])
+    graph.add('price_std', lambda dataset: da.price_std_by_carat_group(dataset), ['dataset'])
+    graph.add('comparables', comparables_index, ['dataset'])
+    graph.add('price_curves', lambda dataset: price_curves.PriceCurveIndex(dataset), ['dataset'])